@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Load test of the API with a configurable request mix, with JSON baselines.
+
+Drives the app from speech2action/api/main.py with a fixed number of requests
+in flight (--concurrency) over one or both transports:
+
+- asgi: in process through httpx's ASGI transport (no sockets, no server);
+  the response returns once background tasks finish, so voice commands
+  include their dispatch
+- socket: over a local TCP connection to uvicorn in a separate process
+
+Requests cycle through a weighted mix (--mix: a preset, or weights such as
+health=4,workout=1) of /health, /automations, /workout, /daily-note and
+/voice-command. Vault automations are replaced by fakes that take --action-ms
+on their lane, and the agent fallback of the command parser returns nothing,
+so runs measure the API rather than the disk or OpenAI. Rate limits are off.
+
+Reports throughput and p50/p95/p99 latency per endpoint and overall. --save
+writes the results as a JSON baseline; --compare checks a run against one,
+and --diff compares two saved baselines without running anything. A drop in
+throughput, or a rise in a latency percentile, beyond --threshold counts as a
+regression (latencies must also rise by more than --min-ms) and makes the
+exit status 1.
+
+Usage:
+    python benchmarks/bench_api.py [--mix mixed] [--concurrency 16] [--requests 2000]
+    python benchmarks/bench_api.py --save baseline.json
+    python benchmarks/bench_api.py --compare baseline.json
+    python benchmarks/bench_api.py --diff old.json new.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+for var in ("OBSIDIAN_EXERCISE_VAULT_PATH", "OBSIDIAN_MAIN_VAULT_PATH"):
+    os.environ.setdefault(var, tempfile.mkdtemp(prefix="bench-vault-"))
+# Measure the endpoints, not the rate limiter
+for var in ("ORCHESTRA_RATE_LIMIT", "ORCHESTRA_CLIENT_RATE_LIMIT"):
+    os.environ.setdefault(var, "0")
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+
+from speech2action.actions import registry  # noqa: E402
+from speech2action.api.main import app  # noqa: E402
+from speech2action.core import command_parser  # noqa: E402
+
+REQUESTS = {
+    "health": ("GET", "/api/v1/health", None),
+    "automations": ("GET", "/api/v1/automations", None),
+    "workout": ("POST", "/api/v1/workout", {"workout_type": "running"}),
+    "daily_note": ("POST", "/api/v1/daily-note", {"note_type": "today"}),
+    "voice_command": ("POST", "/api/v1/voice-command", {"command": "create gym note"}),
+}
+MIXES = {
+    "read": "health=1,automations=1",
+    "write": "workout=2,daily_note=1",
+    "mixed": "health=4,automations=2,workout=2,daily_note=1,voice_command=1",
+}
+WARMUP = 100  # requests sent before measuring
+METRICS = ("rps", "p50_ms", "p95_ms", "p99_ms")
+
+
+def parse_mix(mix: str) -> dict:
+    """ "health=4,workout=1" (or a preset name) -> {"health": 4, "workout": 1}."""
+    weights = {}
+    for part in MIXES.get(mix, mix).split(","):
+        name, _, weight = part.partition("=")
+        if name not in REQUESTS:
+            raise SystemExit(f"Unknown request {name!r}; choose from {list(REQUESTS)}")
+        weights[name] = int(weight or 1)
+    return weights
+
+
+def install_fakes(action_seconds: float):
+    """Replace vault automations with fakes and disable the agent fallback."""
+
+    def fake_action(name: str):
+        def fake(settings=None):
+            if action_seconds:
+                time.sleep(action_seconds)
+            return f"{name} done"
+
+        fake.__name__ = name
+        return fake
+
+    for name, (func, lane_kind) in list(registry.ACTION_REGISTRY.items()):
+        if lane_kind in ("exercise", "main"):
+            registry.ACTION_REGISTRY[name] = (fake_action(name), lane_kind)
+    command_parser.get_command_from_text = lambda transcript, settings=None: None
+
+
+# Transports
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve(port: int, action_seconds: float):
+    """Server process for the socket transport."""
+    # Drop access records (uvicorn's logging setup re-enables disabled loggers)
+    logging.getLogger("speech2action.access").addFilter(lambda record: False)
+    install_fakes(action_seconds)
+    # Automations print progress from worker threads; keep the output readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+@contextlib.asynccontextmanager
+async def asgi_client(concurrency: int, action_seconds: float):
+    install_fakes(action_seconds)
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+            yield client
+
+
+@contextlib.asynccontextmanager
+async def socket_client(concurrency: int, action_seconds: float):
+    port = free_port()
+    server = multiprocessing.get_context("spawn").Process(
+        target=serve, args=(port, action_seconds), daemon=True
+    )
+    server.start()
+    base = f"http://127.0.0.1:{port}"
+    try:
+        while True:
+            try:
+                httpx.get(f"{base}/api/v1/health")
+                break
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+        limits = httpx.Limits(max_connections=concurrency)
+        async with httpx.AsyncClient(base_url=base, limits=limits) as client:
+            yield client
+    finally:
+        server.terminate()
+        server.join()
+
+
+TRANSPORTS = {"asgi": asgi_client, "socket": socket_client}
+
+
+# Load
+
+
+async def run_load(client, weights: dict, concurrency: int, total: int) -> dict:
+    """Send total requests (after a warmup) with concurrency in flight."""
+    order = [name for name, weight in weights.items() for _ in range(weight)]
+    latencies = {name: [] for name in weights}
+    errors = {name: 0 for name in weights}
+
+    async def worker(queue):
+        for name in queue:
+            method, path, body = REQUESTS[name]
+            start = time.perf_counter()
+            response = await client.request(method, path, json=body)
+            if response.status_code == 200:
+                latencies[name].append(time.perf_counter() - start)
+            else:
+                errors[name] += 1
+
+    async def send(count: int):
+        names = list(itertools.islice(itertools.cycle(order), count))
+        await asyncio.gather(
+            *(worker(names[i::concurrency]) for i in range(concurrency))
+        )
+
+    await send(WARMUP)
+    for samples in latencies.values():
+        samples.clear()
+    errors.update((name, 0) for name in errors)
+    start = time.perf_counter()
+    await send(total)
+    elapsed = time.perf_counter() - start
+
+    endpoints = {
+        name: summarize(latencies[name], errors[name], elapsed) for name in weights
+    }
+    everything = [t for samples in latencies.values() for t in samples]
+    return {
+        "overall": summarize(everything, sum(errors.values()), elapsed),
+        "endpoints": endpoints,
+    }
+
+
+def summarize(samples, errors: int, elapsed: float) -> dict:
+    samples = sorted(samples)
+
+    def percentile(q: float) -> float:
+        if not samples:
+            return float("nan")
+        return round(samples[min(len(samples) - 1, int(len(samples) * q))] * 1000, 3)
+
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "rps": round(len(samples) / elapsed, 1),
+        "p50_ms": percentile(0.5),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+    }
+
+
+# Reports and baselines
+
+
+def print_results(transport: str, results: dict):
+    print(f"\n{transport}")
+    print(
+        f"{'endpoint':<15} {'requests':>8} {'errors':>6} {'req/s':>9} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    )
+    rows = [*results["endpoints"].items(), ("overall", results["overall"])]
+    for name, r in rows:
+        print(
+            f"{name:<15} {r['requests']:>8} {r['errors']:>6} {r['rps']:>9.1f} "
+            f"{r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f}"
+        )
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(base: dict, new: dict, threshold: float, min_ms: float) -> int:
+    """Print the change of every metric; return the number of regressions."""
+    if base["config"] != new["config"]:
+        print(f"Warning: configs differ: {base['config']} vs {new['config']}")
+    print(
+        f"\n{base['commit']} -> {new['commit']} "
+        f"(regression: >{threshold:.0%} worse, and >{min_ms} ms for latencies)"
+    )
+    print(
+        f"{'transport':<9} {'endpoint':<15} {'metric':<7} {'base':>9} "
+        f"{'new':>9} {'change':>8}"
+    )
+    regressions = 0
+    for transport, results in new["results"].items():
+        base_results = base["results"].get(transport)
+        if base_results is None:
+            continue
+        rows = {**results["endpoints"], "overall": results["overall"]}
+        base_rows = {**base_results["endpoints"], "overall": base_results["overall"]}
+        for name, row in rows.items():
+            if name not in base_rows:
+                continue
+            for metric in METRICS:
+                old, value = base_rows[name][metric], row[metric]
+                change = (value - old) / old if old else 0.0
+                # Throughput should not drop; latency should not rise, by more
+                # than timer noise on sub-millisecond requests
+                if metric == "rps":
+                    worse = -change > threshold
+                else:
+                    worse = change > threshold and value - old > min_ms
+                flag = "  REGRESSION" if worse else ""
+                regressions += bool(flag)
+                print(
+                    f"{transport:<9} {name:<15} {metric:<7} {old:>9.2f} "
+                    f"{value:>9.2f} {change:>+8.1%}{flag}"
+                )
+    print(f"\n{regressions} regression(s)")
+    return regressions
+
+
+def load_baseline(path: str) -> dict:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mix", default="mixed", help=f"{list(MIXES)} or weights")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--transport", choices=[*TRANSPORTS, "both"], default="both")
+    parser.add_argument("--action-ms", type=float, default=0, help="fake vault work")
+    parser.add_argument("--save", metavar="FILE", help="write results as a baseline")
+    parser.add_argument("--compare", metavar="FILE", help="baseline to compare with")
+    parser.add_argument("--diff", nargs=2, metavar=("OLD", "NEW"))
+    parser.add_argument("--threshold", type=float, default=0.10)
+    parser.add_argument(
+        "--min-ms", type=float, default=1.0, help="ignore smaller latency changes"
+    )
+    args = parser.parse_args()
+
+    if args.diff:
+        old, new = (load_baseline(path) for path in args.diff)
+        sys.exit(1 if compare(old, new, args.threshold, args.min_ms) else 0)
+
+    logging.getLogger("speech2action.access").addFilter(lambda record: False)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    weights = parse_mix(args.mix)
+    transports = list(TRANSPORTS) if args.transport == "both" else [args.transport]
+    config = {
+        "mix": weights,
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "action_ms": args.action_ms,
+    }
+    print(f"mix {weights}, {args.concurrency} in flight, {args.requests} requests")
+
+    async def measure(transport: str) -> dict:
+        client_factory = TRANSPORTS[transport]
+        async with client_factory(args.concurrency, args.action_ms / 1000) as client:
+            return await run_load(client, weights, args.concurrency, args.requests)
+
+    results = {}
+    for transport in transports:
+        with contextlib.redirect_stdout(io.StringIO()):
+            results[transport] = asyncio.run(measure(transport))
+        print_results(transport, results[transport])
+
+    run = {
+        "commit": git_commit(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "config": config,
+        "results": results,
+    }
+    if args.save:
+        Path(args.save).write_text(json.dumps(run, indent=2) + "\n", encoding="utf-8")
+        print(f"\nSaved baseline to {args.save}")
+    if args.compare:
+        baseline = load_baseline(args.compare)
+        sys.exit(1 if compare(baseline, run, args.threshold, args.min_ms) else 0)
+
+
+if __name__ == "__main__":
+    main()
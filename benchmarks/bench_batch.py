@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Throughput of POST /batch versus the equivalent individual calls.
+
+Starts the API on a local port and triggers the same set of vault
+automations (a "morning dashboard": gym, running and mobility notes plus
+today's and tomorrow's daily notes) through:
+
+- individual: one POST /workout or /daily-note per automation on a reused
+  connection, each awaited before the next
+- individual concurrent: the same calls sent concurrently
+- batch queued: one POST /batch with wait=false (returns once queued, like
+  the individual endpoints)
+- batch completed: one POST /batch that waits for every automation to finish
+
+Vault paths default to temporary directories.
+
+Usage:
+    python benchmarks/bench_batch.py [--rounds 100]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import logging
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+for var in ("OBSIDIAN_EXERCISE_VAULT_PATH", "OBSIDIAN_MAIN_VAULT_PATH"):
+    os.environ.setdefault(var, tempfile.mkdtemp(prefix="bench-vault-"))
+# Measure the endpoints, not the rate limiter
+for var in ("ORCHESTRA_RATE_LIMIT", "ORCHESTRA_CLIENT_RATE_LIMIT"):
+    os.environ.setdefault(var, "0")
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+
+from speech2action.api.main import app  # noqa: E402
+
+CALLS = [
+    ("/api/v1/workout", {"workout_type": "gym"}),
+    ("/api/v1/workout", {"workout_type": "running"}),
+    ("/api/v1/workout", {"workout_type": "mobility"}),
+    ("/api/v1/daily-note", {"note_type": "today"}),
+    ("/api/v1/daily-note", {"note_type": "tomorrow"}),
+]
+ITEMS = [
+    {"kind": "workout" if path.endswith("workout") else "daily_note", **body}
+    for path, body in CALLS
+]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int) -> uvicorn.Server:
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+async def individual(client: httpx.AsyncClient):
+    for path, body in CALLS:
+        (await client.post(path, json=body)).raise_for_status()
+
+
+async def individual_concurrent(client: httpx.AsyncClient):
+    responses = await asyncio.gather(
+        *(client.post(path, json=body) for path, body in CALLS)
+    )
+    for response in responses:
+        response.raise_for_status()
+
+
+async def batch_queued(client: httpx.AsyncClient):
+    response = await client.post("/api/v1/batch", json={"items": ITEMS, "wait": False})
+    response.raise_for_status()
+
+
+async def batch_completed(client: httpx.AsyncClient):
+    response = await client.post("/api/v1/batch", json={"items": ITEMS})
+    assert response.json()["success"], response.text
+
+
+async def measure(base: str, scenario, rounds: int):
+    samples = []
+    async with httpx.AsyncClient(base_url=base) as client:
+        for _ in range(5):
+            await scenario(client)
+        for _ in range(rounds):
+            start = time.perf_counter()
+            await scenario(client)
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=100)
+    args = parser.parse_args()
+
+    logging.getLogger("speech2action.access").disabled = True
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    scenarios = {
+        "individual": individual,
+        "individual concurrent": individual_concurrent,
+        "batch queued": batch_queued,
+        "batch completed": batch_completed,
+    }
+    out = sys.stdout
+    # Automations print progress from worker threads; keep the table readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        server = start_server(port)
+        results = {
+            name: asyncio.run(measure(base, scenario, args.rounds))
+            for name, scenario in scenarios.items()
+        }
+        server.should_exit = True
+
+    print(f"{len(CALLS)} automations per round, {args.rounds} rounds", file=out)
+    print(f"{'path':<22} {'p50 ms':>8} {'p95 ms':>8} {'automations/s':>14}", file=out)
+    for name, samples in results.items():
+        samples.sort()
+        p50 = statistics.median(samples)
+        p95 = samples[int(len(samples) * 0.95) - 1]
+        rate = len(CALLS) / p50
+        print(
+            f"{name:<22} {p50 * 1000:>8.2f} {p95 * 1000:>8.2f} {rate:>14.0f}",
+            file=out,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+How much earlier commands start with early dispatch on partial transcripts.
+
+Replays a transcript corpus through StreamingIntentMatcher: every utterance
+is a timed series of partial hypotheses from a streaming recognizer and the
+final transcript with the time it arrived. Reports, per stable_updates
+setting:
+
+- early: utterances whose action fired before the final transcript and was
+  never revoked, and the time saved (final transcript - fire)
+- revoked: fired actions that later words took back
+- missed: utterances with a trigger phrase that only the final one caught
+- chars: characters scanned incrementally versus rescanning every hypothesis
+
+It also checks that the stream agrees with the parser on every utterance:
+the action the matcher ends with, and the one it has fired if any, must be
+match_trigger(final). Any disagreement is listed and the exit status is 1.
+
+A corpus is JSON lines of {"partials": [[seconds, text], ...], "final":
+text, "final_at": seconds}. Without --corpus a corpus is simulated from
+command phrases: words arrive at speaking pace, the word in progress shows
+up truncated, some words are first misheard and then corrected, hypotheses
+repeat through the 500 ms VAD hangover, and the final transcript comes
+300 ms of ASR after that.
+
+Usage:
+    python benchmarks/bench_intents.py [--corpus partials.jsonl] [--save-corpus out.jsonl]
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from speech2action.core.command_parser import match_trigger  # noqa: E402
+from speech2action.core.intent_stream import (  # noqa: E402
+    FIRE,
+    StreamingIntentMatcher,
+)
+
+PHRASES = [
+    "create a running note for today",
+    "start my running log please",
+    "log a gym session",
+    "time for a muscle up workout",
+    "open the daily note",
+    "make a note for tomorrow morning",
+    "show spells",
+    "open the spell book",
+    "i went cycling on my bike",
+    "log my mobility routine",
+    "stairs workout done",
+    "open fl studio and load the drums",
+    "start the music studio",
+    "i went running yesterday",
+    "run the numbers for tomorrow",
+    "open the studio today and load drums",
+    "start a run today please",
+    "create running note yesterday ok",
+    "start the brunch playlist",
+    "what is the weather like",
+    "remind me to call mom",
+    "play some relaxing music",
+]
+
+# Words a streaming recognizer tends to get wrong first
+MISHEARD = {
+    "running": "ruining",
+    "run": "ran",
+    "bike": "bite",
+    "gym": "jim",
+    "day": "they",
+    "daily": "daley",
+    "stairs": "stares",
+    "studio": "stereo",
+    "cycling": "recycling",
+    "tomorrow": "to borrow",
+}
+
+PARTIAL_INTERVAL = 0.15  # seconds between partial hypotheses
+HANGOVER = 0.5
+FINAL_ASR = 0.3
+
+
+def simulate(phrase: str, rng: random.Random, mishear: float = 0.2):
+    words, times, now = phrase.split(), [], 0.0
+    for word in words:
+        duration = 0.12 + 0.05 * len(word) * rng.uniform(0.8, 1.2)
+        times.append((now, now + duration))
+        now += duration + rng.uniform(0.03, 0.1)
+    speech_end = times[-1][1]
+    misheard = {
+        i for i, w in enumerate(words) if w in MISHEARD and rng.random() < mishear
+    }
+    # Hypotheses keep coming until the VAD ends the utterance
+    partials, tick = [], PARTIAL_INTERVAL
+    while tick < speech_end + HANGOVER:
+        spoken = []
+        for i, (start, end) in enumerate(times):
+            if start >= tick:
+                break
+            word = words[i]
+            # A misheard word is corrected once the next word has started
+            if i in misheard and (i + 1 == len(words) or times[i + 1][0] >= tick):
+                word = MISHEARD[word]
+            if end > tick:
+                word = word[: max(1, int(len(word) * (tick - start) / (end - start)))]
+            spoken.append(word)
+        partials.append([round(tick, 3), " ".join(spoken)])
+        tick += PARTIAL_INTERVAL
+    return {
+        "partials": partials,
+        "final": phrase,
+        "final_at": round(speech_end + HANGOVER + FINAL_ASR, 3),
+    }
+
+
+def replay(corpus, stable_updates: int):
+    early, revoked, missed, saved = 0, 0, 0, []
+    for utterance in corpus:
+        matcher = StreamingIntentMatcher(stable_updates=stable_updates)
+        fired_at = None
+        for at, text in utterance["partials"]:
+            for event in matcher.update(text):
+                if event.kind == FIRE:
+                    fired_at = at
+                else:
+                    revoked += 1
+                    fired_at = None
+        final = matcher.finish(utterance["final"])
+        if matcher.fired is None and fired_at is not None:
+            revoked += 1  # the final transcript took it back
+            fired_at = None
+        if final and fired_at is not None and matcher.fired == final:
+            early += 1
+            saved.append(utterance["final_at"] - fired_at)
+        elif final:
+            missed += 1
+    return early, revoked, missed, saved
+
+
+def disagreements(corpus):
+    """Utterances whose streamed action differs from the final parse."""
+    found = []
+    for utterance in corpus:
+        matcher = StreamingIntentMatcher()
+        for _, text in utterance["partials"]:
+            matcher.update(text)
+        expected = match_trigger(utterance["final"])
+        streamed = matcher.finish(utterance["final"])
+        if streamed != expected or matcher.fired not in (None, expected):
+            found.append((utterance["final"], expected, streamed, matcher.fired))
+    return found
+
+
+def scan_cost(corpus):
+    """Characters and time to match every hypothesis: incremental vs rescanning."""
+    updates = [(u["partials"], u["final"]) for u in corpus]
+    start = time.perf_counter()
+    incremental = 0
+    for partials, final in updates:
+        matcher = StreamingIntentMatcher()
+        for _, text in partials:
+            matcher.update(text)
+        matcher.finish(final)
+        incremental += matcher.scanned
+    incremental_time = time.perf_counter() - start
+    start = time.perf_counter()
+    rescanned = 0
+    for partials, final in updates:
+        for text in [t for _, t in partials] + [final]:
+            matcher = StreamingIntentMatcher()
+            matcher.update(text)
+            rescanned += matcher.scanned
+    rescan_time = time.perf_counter() - start
+    count = sum(len(p) + 1 for p, _ in updates)
+    return incremental, rescanned, incremental_time / count, rescan_time / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus", help="JSON lines of recorded partial transcripts")
+    parser.add_argument("--save-corpus", help="write the simulated corpus here")
+    parser.add_argument(
+        "--repeat", type=int, default=20, help="simulated takes per phrase"
+    )
+    args = parser.parse_args()
+
+    if args.corpus:
+        with open(args.corpus, encoding="utf-8") as f:
+            corpus = [json.loads(line) for line in f if line.strip()]
+    else:
+        rng = random.Random(42)
+        corpus = [simulate(p, rng) for p in PHRASES for _ in range(args.repeat)]
+        if args.save_corpus:
+            with open(args.save_corpus, "w", encoding="utf-8") as f:
+                f.writelines(json.dumps(u) + "\n" for u in corpus)
+
+    with_trigger = sum(1 for u in corpus if match_trigger(u["final"]))
+    print(f"{len(corpus)} utterances, {with_trigger} with a trigger phrase")
+    print(
+        f"{'stable':>6} {'early':>7} {'revoked':>8} {'missed':>7} "
+        f"{'saved p50':>10} {'saved mean':>11}"
+    )
+    for stable_updates in (0, 1, 2, 3):
+        early, revoked, missed, saved = replay(corpus, stable_updates)
+        saved.sort()
+        p50 = saved[len(saved) // 2] * 1000 if saved else 0
+        mean = sum(saved) / len(saved) * 1000 if saved else 0
+        print(
+            f"{stable_updates:>6} {early:>7} {revoked:>8} {missed:>7} "
+            f"{p50:>8.0f}ms {mean:>9.0f}ms"
+        )
+    incremental, rescanned, per_update, per_rescan = scan_cost(corpus)
+    print(
+        f"chars scanned: {incremental} incremental vs {rescanned} rescanning "
+        f"({per_update * 1e6:.1f} vs {per_rescan * 1e6:.1f} us per hypothesis)"
+    )
+    wrong = disagreements(corpus)
+    print(f"stream vs final parse: {len(corpus) - len(wrong)}/{len(corpus)} agree")
+    for final, expected, streamed, fired in wrong:
+        print(f"  {final!r}: parser {expected}, stream {streamed} (fired {fired})")
+    return 1 if wrong else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
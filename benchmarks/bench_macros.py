@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Dry-run cost of the FL Studio macros.
+
+Runs every studio automation against the virtual input backend and reports
+the simulated wall-clock cost of each, split into input time (pyautogui's
+per-call pause) and wait time (settles, sleeps and polling), plus the real
+time the engine itself took.
+
+Usage:
+    python benchmarks/bench_macros.py
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# The automations read FL Studio settings, which need vault paths to load
+for var in ("OBSIDIAN_EXERCISE_VAULT_PATH", "OBSIDIAN_MAIN_VAULT_PATH"):
+    os.environ.setdefault(var, tempfile.mkdtemp(prefix="bench-vault-"))
+
+from speech2action.actions.flstudio_automation import (  # noqa: E402
+    dry_run,
+    launch_fl_studio,
+    open_drum_project_pyautogui,
+    open_drum_session,
+    switch_audio_device,
+)
+
+AUTOMATIONS = {
+    "open_project": launch_fl_studio,
+    "open_drum_project": open_drum_project_pyautogui,
+    "switch_audio": switch_audio_device,
+    "open_session": open_drum_session,
+}
+
+
+def main():
+    print(
+        f"{'macro':<18} {'total':>8} {'input':>8} {'wait':>8} "
+        f"{'events':>7} {'engine':>9}"
+    )
+    for name, func in AUTOMATIONS.items():
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            report = dry_run(func)
+        engine_ms = (time.perf_counter() - start) * 1000
+        print(
+            f"{name:<18} {report['total']:>7.2f}s {report['input']:>7.2f}s "
+            f"{report['wait']:>7.2f}s {report['events']:>7} {engine_ms:>7.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Hot-path cost of the metrics layer.
+
+Times each recording call in a tight loop and subtracts the cost of the
+empty loop, then times a /metrics render with every stage recorded for a
+realistic number of actions.
+
+Usage:
+    python benchmarks/bench_metrics.py [--iterations 200000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from speech2action.actions.registry import ACTION_REGISTRY  # noqa: E402
+from speech2action.core.metrics import Metrics  # noqa: E402
+
+STAGES = ("parse", "agent", "queue_wait", "execute", "vault_io")
+
+
+def per_call_ns(func, iterations: int) -> float:
+    start = time.perf_counter_ns()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter_ns() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=200_000)
+    args = parser.parse_args()
+    n = args.iterations
+
+    metrics = Metrics()
+
+    def baseline():
+        pass
+
+    def observe():
+        metrics.observe("execute", "create_daily_note", 0.0042)
+
+    def timed():
+        with metrics.timed("parse", "create_daily_note"):
+            pass
+
+    def timed_late_action():
+        with metrics.timed("agent") as timer:
+            timer.action = "create_daily_note"
+
+    def inc():
+        metrics.inc("orchestra_actions_total", action="create_daily_note", status="ok")
+
+    empty = per_call_ns(baseline, n)
+    print(f"{'operation':<22} {'ns/call':>8}")
+    for name, func in [
+        ("observe", observe),
+        ("timed block", timed),
+        ("timed, late action", timed_late_action),
+        ("counter inc", inc),
+    ]:
+        print(f"{name:<22} {per_call_ns(func, n) - empty:>8.0f}")
+
+    for stage in STAGES:
+        for action in ACTION_REGISTRY:
+            metrics.observe(stage, action, 0.01)
+            metrics.inc("orchestra_actions_total", action=action, status="ok")
+    renders = 200
+    start = time.perf_counter()
+    for _ in range(renders):
+        text = metrics.render()
+    render_ms = (time.perf_counter() - start) / renders * 1000
+    print(
+        f"\nrender: {render_ms:.2f} ms for {len(text.splitlines())} lines "
+        f"({len(STAGES) * len(ACTION_REGISTRY)} histograms)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Request throughput of the access-log middleware.
+
+Drives GET /api/v1/health straight through the ASGI stack (no sockets, so the
+middleware is the only thing that differs) with:
+
+- none: the router alone
+- legacy: the previous BaseHTTPMiddleware logging synchronous f-strings
+- asgi: the pure ASGI AccessLogMiddleware with queued JSON records
+
+Log output goes to os.devnull for both middlewares.
+
+Usage:
+    python benchmarks/bench_middleware.py [--requests 5000] [--rounds 3]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi import FastAPI, Request  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+
+from speech2action.api.middleware import (  # noqa: E402
+    AccessLogMiddleware,
+    start_access_log,
+    stop_access_log,
+)
+from speech2action.api.routes import router  # noqa: E402
+
+legacy_logger = logging.getLogger("bench.legacy")
+
+
+class LegacyLoggingMiddleware(BaseHTTPMiddleware):
+    """The middleware as it was before the pure ASGI rewrite."""
+
+    async def dispatch(self, request: Request, call_next):
+        start_time = time.time()
+        legacy_logger.info(f"Request: {request.method} {request.url}")
+        response = await call_next(request)
+        process_time = time.time() - start_time
+        legacy_logger.info(
+            f"Response: {response.status_code} | "
+            f"Processing time: {process_time:.4f}s"
+        )
+        response.headers["X-Process-Time"] = str(process_time)
+        return response
+
+
+def build_app(middleware=None) -> FastAPI:
+    app = FastAPI()
+    app.include_router(router, prefix="/api/v1")
+    if middleware is not None:
+        app.add_middleware(middleware)
+    return app
+
+
+SCOPE = {
+    "type": "http",
+    "asgi": {"version": "3.0"},
+    "http_version": "1.1",
+    "method": "GET",
+    "scheme": "http",
+    "path": "/api/v1/health",
+    "raw_path": b"/api/v1/health",
+    "root_path": "",
+    "query_string": b"",
+    "headers": [(b"host", b"bench")],
+    "client": ("127.0.0.1", 50000),
+    "server": ("bench", 80),
+}
+
+
+async def drive(app, requests: int) -> float:
+    """Send requests one after another and return requests per second."""
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    # Warm up routing and pydantic caches
+    for _ in range(50):
+        await app(dict(SCOPE), receive, send)
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(SCOPE), receive, send)
+    return requests / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    devnull = open(os.devnull, "w")
+    legacy_logger.addHandler(logging.StreamHandler(devnull))
+    legacy_logger.setLevel(logging.INFO)
+    legacy_logger.propagate = False
+    start_access_log(devnull)
+
+    variants = {
+        "none": build_app(),
+        "legacy": build_app(LegacyLoggingMiddleware),
+        "asgi": build_app(AccessLogMiddleware),
+    }
+    best = {name: 0.0 for name in variants}
+    for _ in range(args.rounds):
+        for name, app in variants.items():
+            best[name] = max(best[name], asyncio.run(drive(app, args.requests)))
+    stop_access_log()
+
+    print(f"{'middleware':<10} {'req/s':>10} {'us/req':>8}")
+    for name, rps in best.items():
+        print(f"{name:<10} {rps:>10.0f} {1e6 / rps:>8.1f}")
+    print(f"\nasgi vs legacy: {best['asgi'] / best['legacy']:.2f}x requests/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Load test: latency under overload with and without admission control.
+
+Starts the API on a local port and sends an open-loop stream of requests
+(a fixed arrival rate, independent of how fast the server answers) that is
+higher than one vault lane can absorb. Each request is a single-item
+POST /batch that waits for the automation to finish, so its latency includes
+the time spent queued on the lane. The running-note automation is slowed by
+a simulated vault latency (a synced or network drive) so the lane saturates
+at a known rate: 1 / --io-ms jobs per second.
+
+- no admission: every request is queued; the lane backlog and latency grow
+  for as long as the overload lasts
+- admission: lane depth capped at --max-depth; extra requests get an
+  immediate 503 and admitted ones keep a bounded latency
+
+Each configuration runs in a fresh server process. Vault paths default to
+temporary directories.
+
+Usage:
+    python benchmarks/bench_overload.py [--rate 150] [--seconds 5] [--io-ms 20]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import logging
+import multiprocessing
+import os
+import socket
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+for var in ("OBSIDIAN_EXERCISE_VAULT_PATH", "OBSIDIAN_MAIN_VAULT_PATH"):
+    os.environ.setdefault(var, tempfile.mkdtemp(prefix="bench-vault-"))
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+
+from speech2action.actions import registry  # noqa: E402
+from speech2action.api.main import app  # noqa: E402
+from speech2action.core import admission  # noqa: E402
+
+ACTION = "create_today_running_note"
+BODY = {"items": [{"kind": "workout", "workout_type": "running"}]}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve(port: int, io_seconds: float, max_depth: int):
+    """Server process: slow vault, the given lane depth limit, no rate limits."""
+    logging.getLogger("speech2action.access").disabled = True
+    slow_vault(io_seconds)
+    admission._controller = admission.AdmissionController(max_lane_depth=max_depth)
+    # Automations print progress from worker threads; keep the output readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def start_server(port: int, io_seconds: float, max_depth: int):
+    process = multiprocessing.get_context("spawn").Process(
+        target=serve, args=(port, io_seconds, max_depth), daemon=True
+    )
+    process.start()
+    while True:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/api/v1/health")
+            return process
+        except httpx.TransportError:
+            time.sleep(0.1)
+
+
+def slow_vault(io_seconds: float):
+    """Make ACTION take io_seconds longer, as on a slow vault drive."""
+    func, lane_kind = registry.ACTION_REGISTRY[ACTION]
+
+    def slow(**kwargs):
+        time.sleep(io_seconds)
+        return func(**kwargs)
+
+    slow.__name__ = func.__name__
+    registry.ACTION_REGISTRY[ACTION] = (slow, lane_kind)
+
+
+async def open_loop(base: str, rate: float, seconds: float):
+    """Send rate requests per second for seconds; return (status, latency) pairs."""
+    results = []
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=120) as client:
+
+        async def one():
+            start = time.perf_counter()
+            response = await client.post("/api/v1/batch", json=BODY)
+            results.append((response.status_code, time.perf_counter() - start))
+
+        tasks = []
+        start = time.perf_counter()
+        for i in range(int(rate * seconds)):
+            delay = start + i / rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(one()))
+        await asyncio.gather(*tasks)
+    return results
+
+
+def percentile(samples, q: float) -> float:
+    if not samples:
+        return float("nan")
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q))] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rate", type=float, default=150, help="requests/s")
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--io-ms", type=float, default=20, help="simulated vault I/O")
+    parser.add_argument("--max-depth", type=int, default=8)
+    args = parser.parse_args()
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    configs = {"no admission": 0, "admission": args.max_depth}
+    print(
+        f"{args.rate:.0f} req/s for {args.seconds:.0f}s against a lane that "
+        f"absorbs {1000 / args.io_ms:.0f} jobs/s"
+    )
+    print(
+        f"{'config':<14} {'ok':>6} {'503':>6} {'ok p50':>9} {'ok p99':>9} "
+        f"{'503 p99':>9}   ms"
+    )
+    for name, max_depth in configs.items():
+        port = free_port()
+        server = start_server(port, args.io_ms / 1000, max_depth)
+        try:
+            results = asyncio.run(
+                open_loop(f"http://127.0.0.1:{port}", args.rate, args.seconds)
+            )
+        finally:
+            server.terminate()
+            server.join()
+        ok = [t for status, t in results if status == 200]
+        shed = [t for status, t in results if status == 503]
+        print(
+            f"{name:<14} {len(ok):>6} {len(shed):>6} "
+            f"{percentile(ok, 0.5):>9.1f} {percentile(ok, 0.99):>9.1f} "
+            f"{percentile(shed, 0.99):>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
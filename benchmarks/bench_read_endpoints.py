@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Throughput of the read endpoints before and after precomputing them.
+
+Drives each endpoint straight through the ASGI stack (no middleware, no
+sockets) and reports requests per second for:
+
+- before: the response rebuilt and serialized on every request
+- after: the precomputed body
+- 304: a revalidation with a matching If-None-Match
+
+It also compares FastAPI's default serialization of AutomationResponse (the
+pydantic-core fast path) with ORJSONResponse.
+
+Usage:
+    python benchmarks/bench_read_endpoints.py [--requests 5000]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+import warnings
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.responses import HTMLResponse, ORJSONResponse  # noqa: E402
+
+from speech2action.api import main as api_main  # noqa: E402
+from speech2action.api import routes  # noqa: E402
+from speech2action.api.models import AutomationResponse  # noqa: E402
+
+warnings.simplefilter("ignore")  # ORJSONResponse is deprecated in recent FastAPI
+
+ROOT_HTML = api_main.ROOT_PAGE.body.decode("utf-8")
+API_INFO = {
+    "name": "Command Orchestra API",
+    "version": "1.0.0",
+    "description": "Speech-2-Reality Automation Hub Backend",
+    "docs_url": "/docs",
+    "automations_url": "/api/v1/automations",
+    "health_url": "/api/v1/health",
+}
+
+
+def before_app() -> FastAPI:
+    """The read endpoints as they were: rebuilt on every request."""
+    app = FastAPI()
+
+    @app.get("/", response_class=HTMLResponse)
+    async def root():
+        return ROOT_HTML
+
+    @app.get("/api/v1")
+    async def api_info():
+        return dict(API_INFO)
+
+    @app.get("/api/v1/automations")
+    async def automations():
+        return routes.build_automations_catalog()
+
+    return app
+
+
+def after_app() -> FastAPI:
+    app = FastAPI()
+    app.add_api_route("/", api_main.root, response_class=HTMLResponse)
+    app.add_api_route("/api/v1", api_main.api_info)
+    app.add_api_route("/api/v1/automations", routes.list_available_automations)
+    return app
+
+
+def automation_app(response_class=None) -> FastAPI:
+    app = FastAPI()
+    kwargs = {"response_class": response_class} if response_class else {}
+
+    @app.post("/api/v1/workout", response_model=AutomationResponse, **kwargs)
+    async def workout():
+        return routes.create_automation_response(
+            success=True,
+            message="Running automation triggered successfully",
+            automation_type="workout_running",
+        )
+
+    return app
+
+
+def scope(method: str, path: str, headers=()):
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench"), *headers],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+
+async def drive(app, request_scope, requests: int) -> float:
+    """Send requests one after another and return requests per second."""
+    statuses = set()
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.add(message["status"])
+
+    for _ in range(50):
+        await app(dict(request_scope), receive, send)
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(request_scope), receive, send)
+    rps = requests / (time.perf_counter() - start)
+    assert statuses <= {200, 304}, statuses
+    return rps
+
+
+def best_of(app, request_scope, requests: int, rounds: int = 3) -> float:
+    return max(asyncio.run(drive(app, request_scope, requests)) for _ in range(rounds))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+    n = args.requests
+
+    before, after = before_app(), after_app()
+    etags = {
+        "/": api_main.ROOT_PAGE.etag,
+        "/api/v1": api_main.API_INFO.etag,
+        "/api/v1/automations": routes.AUTOMATIONS_CATALOG.etag,
+    }
+
+    print(f"{'endpoint':<22} {'before':>9} {'after':>9} {'304':>9}   req/s")
+    for path, etag in etags.items():
+        cached = scope("GET", path, [(b"if-none-match", etag.encode())])
+        print(
+            f"{path:<22} {best_of(before, scope('GET', path), n):>9.0f} "
+            f"{best_of(after, scope('GET', path), n):>9.0f} "
+            f"{best_of(after, cached, n):>9.0f}"
+        )
+
+    post = scope("POST", "/api/v1/workout")
+    default_rps = best_of(automation_app(), post, n)
+    orjson_rps = best_of(automation_app(ORJSONResponse), post, n)
+    print(
+        f"\nAutomationResponse: default {default_rps:.0f} req/s, "
+        f"ORJSONResponse {orjson_rps:.0f} req/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
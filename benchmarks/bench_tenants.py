@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Per-tenant throughput benchmark for the vault lanes.
+
+Creates one temporary vault pair per tenant, seeded with a history of running
+notes, and pushes running-note jobs through the lane executor, once with every tenant on its own vaults and once
+with every tenant sharing a single vault. Reports jobs/s per tenant.
+
+Usage:
+    python benchmarks/bench_tenants.py --tenants 4 --jobs 200 --history 365
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from speech2action.actions.registry import submit_action  # noqa: E402
+from speech2action.config.profiles import Profile  # noqa: E402
+from speech2action.core.lanes import LaneExecutor  # noqa: E402
+import speech2action.core.lanes as lanes  # noqa: E402
+
+
+def make_profile(root: Path, name: str, history: int) -> Profile:
+    exercise = root / name / "exercise"
+    main = root / name / "main"
+    main.mkdir(parents=True)
+    day = date.today()
+    for _ in range(history):
+        day -= timedelta(days=1)
+        note_dir = exercise / "Running" / day.strftime("%Y") / day.strftime("%Y-%m")
+        note_dir.mkdir(parents=True, exist_ok=True)
+        (note_dir / f"Running - {day:%Y-%m-%d}.md").write_text(
+            f"date:: {day:%Y-%m-%d}\ndistance:: 5km\n", encoding="utf-8"
+        )
+    return Profile(
+        name=name,
+        OBSIDIAN_EXERCISE_VAULT_PATH=str(exercise),
+        OBSIDIAN_MAIN_VAULT_PATH=str(main),
+    )
+
+
+def run(profiles, jobs: int):
+    lanes._executor = LaneExecutor()
+    per_tenant = {}
+    start = time.perf_counter()
+
+    def finished(name):
+        def record(_future):
+            per_tenant[name] = time.perf_counter() - start
+
+        return record
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        futures = []
+        for _ in range(jobs):
+            for p in profiles:
+                future = submit_action("create_today_running_note", p)
+                future.add_done_callback(finished(p.name))
+                futures.append(future)
+        for future in futures:
+            future.result()
+    total = time.perf_counter() - start
+    lanes._executor.shutdown()
+    return total, per_tenant
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tenants", type=int, default=4)
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--history", type=int, default=365)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        isolated = [
+            make_profile(root, f"tenant{i}", args.history) for i in range(args.tenants)
+        ]
+        shared_vault = make_profile(root, "shared", args.history)
+        shared = [
+            shared_vault.model_copy(update={"name": f"tenant{i}"})
+            for i in range(args.tenants)
+        ]
+
+        for label, profiles in (
+            ("separate vaults", isolated),
+            ("shared vault", shared),
+        ):
+            total, per_tenant = run(profiles, args.jobs)
+            print(
+                f"\n{label}: {args.tenants * args.jobs} jobs in {total:.3f}s "
+                f"({args.tenants * args.jobs / total:.0f} jobs/s)"
+            )
+            for name, elapsed in per_tenant.items():
+                print(f"  {name}: {args.jobs / elapsed:.0f} jobs/s")
+
+
+if __name__ == "__main__":
+    main()
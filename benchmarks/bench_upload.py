@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Memory high-water mark and speed of audio uploads by upload size.
+
+Streams raw PCM to POST /api/v1/voice-audio in 64 KB chunks (chunked
+transfer encoding, no Content-Length) through httpx's ASGI transport, with
+the scripted ASR backend so only ingestion, spooling and VAD are measured.
+The audio is a synthesized minute of speech-like bursts in noise (see
+bench_audio.py), repeated to the requested size.
+
+For each size it reports the Python heap high-water mark while the request
+ran (tracemalloc: the spool's RAM part, the ring buffer, chunks in flight),
+the endpoint's own memory_peak_bytes, whether the upload was spooled to a
+file, and audio seconds processed per wall second. The spool file's pages
+are file-backed page cache, not heap, so they do not count. For
+comparison, the same audio is also read into one bytes object first (what
+`await request.body()` would do) and then run through the pipeline.
+
+Usage:
+    python benchmarks/bench_upload.py [--sizes 1,10,100] [--chunk-kb 64]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+for var in ("OBSIDIAN_EXERCISE_VAULT_PATH", "OBSIDIAN_MAIN_VAULT_PATH"):
+    os.environ.setdefault(var, tempfile.mkdtemp(prefix="bench-vault-"))
+for var in ("ORCHESTRA_RATE_LIMIT", "ORCHESTRA_CLIENT_RATE_LIMIT"):
+    os.environ.setdefault(var, "0")
+os.environ["ORCHESTRA_ASR_BACKEND"] = "scripted"
+os.environ["ORCHESTRA_MAX_AUDIO_UPLOAD_MB"] = "0"
+
+import httpx  # noqa: E402
+import numpy as np  # noqa: E402
+
+from bench_audio import RATE, synthesize  # noqa: E402
+from speech2action.api.main import app  # noqa: E402
+from speech2action.audio.asr import ScriptedASR  # noqa: E402
+from speech2action.audio.pipeline import AudioPipeline  # noqa: E402
+
+MB = 1024 * 1024
+
+
+def chunks(clip: bytes, size: int, chunk_size: int):
+    """size bytes of clip, repeated, in chunk_size pieces."""
+    sent = 0
+    while sent < size:
+        offset = sent % len(clip)
+        piece = clip[offset : offset + min(chunk_size, size - sent)]
+        sent += len(piece)
+        yield piece
+
+
+async def stream(clip: bytes, size: int, chunk_size: int):
+    for piece in chunks(clip, size, chunk_size):
+        yield piece
+
+
+async def upload(client: httpx.AsyncClient, clip: bytes, size: int, chunk_size: int):
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    response = await client.post(
+        "/api/v1/voice-audio",
+        content=stream(clip, size, chunk_size),
+        headers={"Content-Type": "audio/pcm"},
+    )
+    wall = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1] - before
+    response.raise_for_status()
+    return response.json(), peak, wall
+
+
+def buffered(clip: bytes, size: int, chunk_size: int):
+    """The whole body in memory first, then the pipeline over it."""
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    body = b"".join(chunks(clip, size, chunk_size))
+    pipeline = AudioPipeline(ScriptedASR(), RATE)
+    pipeline.write(np.frombuffer(body, dtype="<i2"))
+    pipeline.flush()
+    peak = tracemalloc.get_traced_memory()[1] - before
+    del body, pipeline
+    return peak
+
+
+async def run(sizes, chunk_size: int):
+    samples, _ = synthesize(60, -50)
+    clip = samples.astype("<i2").tobytes()
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench", timeout=None
+        ) as client:
+            await upload(client, clip, MB, chunk_size)  # warm up
+            tracemalloc.start()
+            print(
+                f"{'upload':>8} {'audio':>8} {'heap peak':>10} {'reported':>9} "
+                f"{'spooled':>8} {'speed':>8} {'buffered':>10}"
+            )
+            for size_mb in sizes:
+                size = int(size_mb * MB)
+                result, peak, wall = await upload(client, clip, size, chunk_size)
+                baseline = buffered(clip, size, chunk_size)
+                print(
+                    f"{size_mb:>6g}MB {result['audio_seconds'] / 60:>6.1f}min "
+                    f"{peak / MB:>8.2f}MB {result['memory_peak_bytes'] / MB:>7.2f}MB "
+                    f"{'yes' if result['spooled_to_disk'] else 'no':>8} "
+                    f"{result['audio_seconds'] / wall:>7.0f}x {baseline / MB:>8.2f}MB"
+                )
+            tracemalloc.stop()
+    print(
+        "heap peak: Python heap high-water mark during the request; reported: "
+        "memory_peak_bytes; speed: audio seconds per wall second; buffered: "
+        "heap peak when the body is read whole first"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="1,10,100", help="upload sizes in MB")
+    parser.add_argument("--chunk-kb", type=int, default=64)
+    args = parser.parse_args()
+    sizes = [float(s) for s in args.sizes.split(",")]
+    asyncio.run(run(sizes, args.chunk_kb * 1024))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+False accepts, false rejects and CPU cost of the wake-phrase gate.
+
+Scores a clip set with KeywordSpotter and sweeps the sensitivity:
+
+- FR: positive clips (the wake phrase, alone or followed by a command)
+  that were rejected
+- FA: negative clips (other speech, including words that sound alike,
+  such as "orchard" and "extra") that were accepted, also per hour of
+  negative audio
+- cpu: spotter CPU time per utterance and per second of audio
+
+Then it runs the whole clip set as one stream through the audio pipeline
+with the gate and counts how many utterances still reach ASR.
+
+The clip set is a clip directory with templates/, positive/ and negative/
+subdirectories of 16-bit WAV files. Without --clips a set is generated
+(the same one every run): formant-synthesized words spoken by an enrolled
+user, who also recorded the templates, and by other voices, in background
+noise at 5-25 dB SNR. --save-clips writes it out in the same layout.
+
+Usage:
+    python benchmarks/bench_wake.py [--clips DIR] [--save-clips DIR]
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from speech2action.audio.asr import ScriptedASR  # noqa: E402
+from speech2action.audio.pipeline import AudioPipeline  # noqa: E402
+from speech2action.audio.wake import (  # noqa: E402
+    MAX_DISTANCE,
+    KeywordSpotter,
+    WakeGate,
+    read_wav,
+)
+
+RATE = 16000
+WAKE_WORD = "orchestra"
+SENSITIVITIES = (0.3, 0.4, 0.5, 0.6, 0.7)
+
+# Formants (F1, F2, F3 in Hz) of voiced sounds, for an average adult voice
+VOICED = {
+    "aa": (730, 1090, 2440),
+    "ae": (660, 1720, 2410),
+    "ah": (640, 1190, 2390),
+    "ao": (570, 840, 2410),
+    "eh": (530, 1840, 2480),
+    "ey": (480, 1900, 2500),
+    "ih": (390, 1990, 2550),
+    "iy": (270, 2290, 3010),
+    "ow": (500, 880, 2300),
+    "uw": (300, 870, 2240),
+    "er": (490, 1350, 1690),
+    "r": (310, 1060, 1380),
+    "l": (360, 1300, 2700),
+    "w": (300, 610, 2200),
+    "y": (260, 2070, 3020),
+    "m": (280, 1000, 2200),
+    "n": (280, 1700, 2600),
+    "ng": (280, 2300, 2750),
+}
+NASALS = {"m", "n", "ng"}
+# Noise band (center Hz, width Hz, level) of fricatives; voiced ones add a buzz
+FRICATIVES = {
+    "s": (6000, 1500, 0.5),
+    "z": (6000, 1500, 0.3),
+    "sh": (3000, 1000, 0.6),
+    "f": (4500, 3000, 0.15),
+    "v": (4500, 3000, 0.1),
+    "th": (5000, 3000, 0.1),
+    "h": (2000, 2500, 0.15),
+}
+# Burst center Hz of stops; ch and j are a stop into a fricative
+STOPS = {"p": 900, "b": 900, "t": 4500, "d": 4000, "k": 2500, "g": 2200}
+AFFRICATES = {"ch": ("t", "sh"), "j": ("d", "sh")}
+
+WORDS = {
+    "orchestra": "ao r k ih s t r ah",
+    "orchard": "ao r ch er d",
+    "extra": "eh k s t r ah",
+    "chest": "ch eh s t",
+    "restore": "r iy s t ao r",
+    "orange": "ao r ih n j",
+    "sister": "s ih s t er",
+    "create": "k r iy ey t",
+    "gym": "j ih m",
+    "note": "n ow t",
+    "running": "r ah n ih ng",
+    "daily": "d ey l iy",
+    "open": "ow p ah n",
+    "studio": "s t uw d iy ow",
+    "spells": "s p eh l z",
+    "tomorrow": "t ah m aa r ow",
+    "log": "l aa g",
+    "start": "s t aa r t",
+    "music": "m y uw z ih k",
+    "show": "sh ow",
+    "bike": "b aa iy k",
+    "stairs": "s t eh r z",
+    "the": "th ah",
+    "a": "ah",
+    "for": "f ao r",
+    "today": "t ah d ey",
+    "please": "p l iy z",
+    "weather": "w eh th er",
+    "dinner": "d ih n er",
+    "kitchen": "k ih ch ah n",
+    "later": "l ey t er",
+    "call": "k ao l",
+    "mom": "m aa m",
+    "yes": "y eh s",
+    "okay": "ow k ey",
+    "water": "w ao t er",
+    "really": "r iy l iy",
+}
+CONFUSABLE = ["orchard", "extra", "chest", "restore", "orange", "sister"]
+COMMAND = [
+    "create",
+    "gym",
+    "note",
+    "running",
+    "daily",
+    "open",
+    "studio",
+    "spells",
+    "tomorrow",
+    "log",
+    "start",
+    "music",
+    "show",
+    "bike",
+    "stairs",
+    "the",
+    "a",
+    "for",
+    "today",
+    "please",
+]
+CHATTER = COMMAND + [
+    "weather",
+    "dinner",
+    "kitchen",
+    "later",
+    "call",
+    "mom",
+    "yes",
+    "okay",
+    "water",
+    "really",
+]
+
+
+class Voice:
+    """Speaker: pitch, vocal tract length (formant scale) and speaking rate."""
+
+    def __init__(self, rng, f0=None, scale=None, rate=None):
+        self.f0 = f0 or rng.uniform(90, 230)
+        self.scale = scale or rng.uniform(0.88, 1.15)
+        self.rate = rate or rng.uniform(0.8, 1.25)
+
+    def session(self, rng) -> "Voice":
+        """The same speaker on another occasion."""
+        return Voice(
+            rng,
+            self.f0 * rng.uniform(0.92, 1.08),
+            self.scale * rng.uniform(0.98, 1.02),
+            self.rate * rng.uniform(0.88, 1.12),
+        )
+
+
+def _band_noise(count: int, center: float, width: float, rng) -> np.ndarray:
+    spectrum = np.fft.rfft(rng.standard_normal(count))
+    freqs = np.fft.rfftfreq(count, 1.0 / RATE)
+    spectrum *= np.exp(-0.5 * ((freqs - center) / width) ** 2)
+    noise = np.fft.irfft(spectrum, count)
+    return noise / (np.std(noise) + 1e-9)
+
+
+def _formant_gains(harmonics: np.ndarray, formants) -> np.ndarray:
+    gains = np.zeros_like(harmonics)
+    for index, formant in enumerate(formants):
+        bandwidth = 60 + 40 * index
+        gains += 1.0 / (1.0 + ((harmonics - formant) / bandwidth) ** 2) / (index + 1)
+    return gains
+
+
+def speak(word: str, voice: Voice, rng) -> np.ndarray:
+    """Additive formant synthesis of one word."""
+    phones = []
+    for phone in WORDS[word].split():
+        phones += AFFRICATES.get(phone, (phone,))
+    harmonics = voice.f0 * np.arange(1, int(4000 / voice.f0) + 1)
+    pieces, phase = [], 0.0
+    for phone in phones:
+        if phone in VOICED:
+            duration = 0.06 if phone in NASALS or len(phone) == 1 else 0.11
+        elif phone in FRICATIVES:
+            duration = 0.09
+        else:
+            duration = 0.07
+        count = int(duration / voice.rate * rng.uniform(0.85, 1.15) * RATE)
+        t = np.arange(count) / RATE
+        piece = np.zeros(count)
+        if phone in VOICED or phone in ("z", "v"):
+            formants = VOICED.get(phone, (300, 1400, 2500))
+            gains = _formant_gains(harmonics, [f * voice.scale for f in formants])
+            angles = phase + 2 * np.pi * voice.f0 * t
+            piece += np.sin(np.outer(angles, np.arange(1, len(harmonics) + 1))) @ gains
+            phase = angles[-1] + 2 * np.pi * voice.f0 / RATE
+            if phone in NASALS or phone in ("z", "v"):
+                piece *= 0.35
+        if phone in FRICATIVES:
+            center, width, level = FRICATIVES[phone]
+            center = min(center * voice.scale, RATE / 2 * 0.9)
+            piece += level * 3 * _band_noise(count, center, width, rng)
+        if phone in STOPS:
+            closure = int(count * 0.6)
+            burst = _band_noise(count - closure, STOPS[phone], 1500, rng)
+            piece[closure:] += 2 * burst * np.exp(-np.arange(count - closure) / 80)
+        pieces.append(piece)
+    signal = np.concatenate(pieces)
+    fade = np.minimum(
+        1, np.minimum(np.arange(len(signal)), np.arange(len(signal))[::-1]) / 160
+    )
+    return signal * fade
+
+
+def utterance(words, voice: Voice, rng, snr_db: float) -> np.ndarray:
+    """Words with short pauses, at a random level, in noise, padded like a VAD segment."""
+    session = voice.session(rng)
+    parts = [np.zeros(int(0.2 * RATE))]
+    for word in words:
+        parts += [
+            speak(word, session, rng),
+            np.zeros(int(rng.uniform(0.03, 0.12) * RATE)),
+        ]
+    parts.append(np.zeros(int(0.1 * RATE)))
+    speech = np.concatenate(parts)
+    level_db = rng.uniform(-30, -18)
+    speech *= 32768 * 10 ** (level_db / 20) / (np.sqrt(np.mean(speech**2)) + 1e-9)
+    noise_db = level_db - snr_db
+    noise = rng.standard_normal(len(speech)) * 32768 * 10 ** (noise_db / 20)
+    return np.clip(speech + noise, -32768, 32767).astype(np.int16)
+
+
+def generate(seed: int = 11):
+    rng = np.random.default_rng(seed)
+    user = Voice(rng)
+    templates = [utterance([WAKE_WORD], user, rng, 30) for _ in range(3)]
+    positive, negative = [], []
+    for _ in range(120):
+        command = list(rng.choice(COMMAND, rng.integers(0, 5)))
+        positive.append(utterance([WAKE_WORD] + command, user, rng, rng.uniform(5, 25)))
+    for index in range(240):
+        voice = user if index % 2 == 0 else Voice(rng)
+        words = [
+            rng.choice(CONFUSABLE) if rng.random() < 0.3 else rng.choice(CHATTER)
+            for _ in range(rng.integers(1, 7))
+        ]
+        negative.append(utterance(words, voice, rng, rng.uniform(5, 25)))
+    return templates, positive, negative
+
+
+def write_wav(path: str, samples: np.ndarray):
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(RATE)
+        wav.writeframes(samples.astype("<i2").tobytes())
+
+
+def save_clips(directory: str, templates, positive, negative):
+    for name, clips in (
+        ("templates", templates),
+        ("positive", positive),
+        ("negative", negative),
+    ):
+        os.makedirs(os.path.join(directory, name), exist_ok=True)
+        for index, clip in enumerate(clips):
+            write_wav(os.path.join(directory, name, f"{index:03d}.wav"), clip)
+
+
+def load_clips(directory: str):
+    def load(name):
+        clips = []
+        for path in sorted(glob.glob(os.path.join(directory, name, "*.wav"))):
+            samples, rate = read_wav(path)
+            if rate != RATE:
+                raise SystemExit(f"{path}: expected {RATE} Hz, got {rate}")
+            clips.append(samples)
+        return clips
+
+    return load("templates"), load("positive"), load("negative")
+
+
+def score_clips(spotter: KeywordSpotter, clips):
+    started = time.process_time()
+    scores = np.array([spotter.search(clip)[0] for clip in clips])
+    return scores, time.process_time() - started
+
+
+def gated_stream(spotter: KeywordSpotter, positive, negative, rng):
+    """Run every clip through the pipeline with the gate; utterances reaching ASR."""
+    clips = [(clip, True) for clip in positive] + [(clip, False) for clip in negative]
+    order = rng.permutation(len(clips))
+    pieces = []
+    for index in order:
+        pieces += [clips[index][0], np.zeros(int(1.5 * RATE), dtype=np.int16)]
+    gate = WakeGate(spotter, follow_up=0.0)
+    pipeline = AudioPipeline(ScriptedASR(), RATE, gate=gate)
+    pipeline.write(np.concatenate(pieces))
+    pipeline.flush()
+    return pipeline.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--clips", help="directory with templates/, positive/, negative/"
+    )
+    parser.add_argument("--save-clips", help="write the generated clip set here")
+    args = parser.parse_args()
+
+    if args.clips:
+        templates, positive, negative = load_clips(args.clips)
+    else:
+        templates, positive, negative = generate()
+        if args.save_clips:
+            save_clips(args.save_clips, templates, positive, negative)
+
+    spotter = KeywordSpotter(RATE)
+    for template in templates:
+        spotter.enroll(template)
+    positive_scores, positive_cpu = score_clips(spotter, positive)
+    negative_scores, negative_cpu = score_clips(spotter, negative)
+    negative_hours = sum(len(c) for c in negative) / RATE / 3600
+    audio = sum(min(len(c), spotter.search_seconds * RATE) for c in positive + negative)
+
+    print(
+        f"{len(templates)} templates, {len(positive)} positive and "
+        f"{len(negative)} negative clips ({negative_hours * 60:.1f} min of negatives)"
+    )
+    print(f"{'sensitivity':>11} {'threshold':>9} {'FR':>7} {'FA':>7} {'FA/hour':>8}")
+    for sensitivity in SENSITIVITIES:
+        threshold = MAX_DISTANCE * sensitivity
+        rejected = np.mean(positive_scores > threshold)
+        accepted = negative_scores <= threshold
+        print(
+            f"{sensitivity:>11.1f} {threshold:>9.2f} {rejected:>7.1%} "
+            f"{np.mean(accepted):>7.1%} {accepted.sum() / negative_hours:>8.0f}"
+        )
+    cpu = positive_cpu + negative_cpu
+    count = len(positive) + len(negative)
+    print(
+        f"cpu: {cpu / count * 1000:.2f} ms per utterance, "
+        f"{cpu / (audio / RATE) * 1000:.1f} ms per audio second searched"
+    )
+
+    stats = gated_stream(spotter, positive, negative, np.random.default_rng(3))
+    print(
+        f"pipeline at sensitivity {spotter.sensitivity}: {stats['utterances']} of "
+        f"{stats['utterances'] + stats['gated']} utterances reached ASR "
+        f"({len(positive)} started with the wake phrase), gate cpu "
+        f"{stats['gate_cpu_per_audio_second'] * 1000:.2f} ms per audio second"
+    )
+
+
+if __name__ == "__main__":
+    main()
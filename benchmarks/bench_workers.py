@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Throughput and latency of the production server with 1 versus N workers.
+
+Starts `run_server.py --production` on a local port for each worker count and
+drives it from several client processes, each keeping --concurrency requests
+in flight for --seconds:
+
+- info: GET /api/v1, a precomputed response (pure HTTP and framework cost)
+- workout: POST /api/v1/workout, which queues a vault write on its lane
+
+Vault paths default to temporary directories and rate limits are disabled.
+The client processes share the machine with the server, so the gain from
+more workers is bounded by the cores left over for them.
+
+Usage:
+    python benchmarks/bench_workers.py [--workers N] [--seconds 5]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SCENARIOS = {
+    "info": ("GET", "/api/v1", None),
+    "workout": ("POST", "/api/v1/workout", {"workout_type": "running"}),
+}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int, workers: int) -> subprocess.Popen:
+    env = dict(os.environ, ORCHESTRA_RATE_LIMIT="0", ORCHESTRA_CLIENT_RATE_LIMIT="0")
+    for var in ("OBSIDIAN_EXERCISE_VAULT_PATH", "OBSIDIAN_MAIN_VAULT_PATH"):
+        env.setdefault(var, tempfile.mkdtemp(prefix="bench-vault-"))
+    server = subprocess.Popen(
+        [sys.executable, str(ROOT / "run_server.py"), "--production"]
+        + ["--workers", str(workers), "--host", "127.0.0.1", "--port", str(port)],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    while True:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/api/v1/health")
+            break
+        except httpx.TransportError:
+            time.sleep(0.1)
+    # Let every worker finish starting before measuring
+    time.sleep(2)
+    return server
+
+
+async def drive(base: str, scenario: str, concurrency: int, seconds: float):
+    method, path, body = SCENARIOS[scenario]
+    latencies, errors = [], 0
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base, limits=limits) as client:
+
+        async def loop(deadline: float):
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                response = await client.request(method, path, json=body)
+                if response.status_code == 200:
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    errors += 1
+
+        deadline = time.perf_counter() + seconds
+        await asyncio.gather(*(loop(deadline) for _ in range(concurrency)))
+    return latencies, errors
+
+
+def client_process(args):
+    return asyncio.run(drive(*args))
+
+
+def percentile(samples, q: float) -> float:
+    return samples[min(len(samples) - 1, int(len(samples) * q))] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--workers", type=int, default=max(2, os.cpu_count() or 1), help="N"
+    )
+    parser.add_argument("--clients", type=int, default=2, help="client processes")
+    parser.add_argument("--concurrency", type=int, default=16, help="per client")
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    print(
+        f"{os.cpu_count()} CPU(s); {args.clients} client processes x "
+        f"{args.concurrency} requests in flight, {args.seconds:.0f}s per run"
+    )
+    print(
+        f"{'scenario':<10} {'workers':>7} {'req/s':>9} {'p50 ms':>8} "
+        f"{'p95 ms':>8} {'p99 ms':>8} {'errors':>7}"
+    )
+    ctx = multiprocessing.get_context("spawn")
+    for workers in (1, args.workers):
+        port = free_port()
+        server = start_server(port, workers)
+        try:
+            with ctx.Pool(args.clients) as pool:
+                for scenario in SCENARIOS:
+                    job = (
+                        f"http://127.0.0.1:{port}",
+                        scenario,
+                        args.concurrency,
+                        args.seconds,
+                    )
+                    results = pool.map(client_process, [job] * args.clients)
+                    latencies = sorted(t for samples, _ in results for t in samples)
+                    errors = sum(e for _, e in results)
+                    print(
+                        f"{scenario:<10} {workers:>7} "
+                        f"{len(latencies) / args.seconds:>9.0f} "
+                        f"{percentile(latencies, 0.5):>8.2f} "
+                        f"{percentile(latencies, 0.95):>8.2f} "
+                        f"{percentile(latencies, 0.99):>8.2f} {errors:>7}"
+                    )
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
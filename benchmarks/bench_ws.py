@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Round-trip latency of the WebSocket command channel versus REST.
+
+Starts the API on a local port and sends the same voice command ("create gym
+note", parsed by keyword, no agent) through:
+
+- rest keep-alive: POST /voice-command on a reused connection
+- rest cold: new connection + CORS preflight + POST, as a browser does when
+  the preflight is not cached
+- ws queued / ws done: one /ws connection; time until the command is queued,
+  and until its final outcome (which REST never reports)
+- ws ping: bare round trip on the open connection
+
+Vault paths default to temporary directories.
+
+Usage:
+    python benchmarks/bench_ws.py [--requests 200]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+for var in ("OBSIDIAN_EXERCISE_VAULT_PATH", "OBSIDIAN_MAIN_VAULT_PATH"):
+    os.environ.setdefault(var, tempfile.mkdtemp(prefix="bench-vault-"))
+# Measure the endpoints, not the rate limiter
+for var in ("ORCHESTRA_RATE_LIMIT", "ORCHESTRA_CLIENT_RATE_LIMIT"):
+    os.environ.setdefault(var, "0")
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+from websockets.sync.client import connect  # noqa: E402
+
+from speech2action.api.main import app  # noqa: E402
+
+COMMAND = "create gym note"
+ORIGIN = "http://localhost:5173"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int) -> uvicorn.Server:
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    return statistics.median(samples) * 1000, p95 * 1000
+
+
+def rest_keepalive(base: str, n: int):
+    samples = []
+    with httpx.Client(base_url=base) as client:
+        for _ in range(n):
+            start = time.perf_counter()
+            client.post("/api/v1/voice-command", json={"command": COMMAND})
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+def rest_cold(base: str, n: int):
+    samples = []
+    # No keep-alive: every request opens a new TCP connection
+    no_reuse = httpx.Limits(max_keepalive_connections=0)
+    with httpx.Client(base_url=base, limits=no_reuse) as client:
+        for _ in range(n):
+            start = time.perf_counter()
+            client.options(
+                "/api/v1/voice-command",
+                headers={
+                    "Origin": ORIGIN,
+                    "Access-Control-Request-Method": "POST",
+                    "Access-Control-Request-Headers": "content-type",
+                },
+            )
+            client.post(
+                "/api/v1/voice-command",
+                json={"command": COMMAND},
+                headers={"Origin": ORIGIN},
+            )
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+def websocket_rounds(url: str, n: int):
+    queued, done, pings = [], [], []
+    with connect(url) as ws:
+        for i in range(n):
+            start = time.perf_counter()
+            ws.send(json.dumps({"type": "command", "id": str(i), "command": COMMAND}))
+            while True:
+                message = json.loads(ws.recv())
+                if message["type"] == "queued":
+                    queued.append(time.perf_counter() - start)
+                elif message["type"] in ("done", "error"):
+                    done.append(time.perf_counter() - start)
+                    break
+        for i in range(n):
+            start = time.perf_counter()
+            ws.send(json.dumps({"type": "ping", "id": str(i)}))
+            ws.recv()
+            pings.append(time.perf_counter() - start)
+    return queued, done, pings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+    n = args.requests
+
+    logging.getLogger("speech2action.access").disabled = True
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    out = sys.stdout
+    # Automations print progress from worker threads; keep the table readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        server = start_server(port)
+        results = {
+            "rest keep-alive": rest_keepalive(base, n),
+            "rest cold": rest_cold(base, n),
+        }
+        queued, done, pings = websocket_rounds(f"ws://127.0.0.1:{port}/api/v1/ws", n)
+        results.update({"ws queued": queued, "ws done": done, "ws ping": pings})
+        server.should_exit = True
+
+    print(f"{'path':<16} {'p50 ms':>8} {'p95 ms':>8}", file=out)
+    for name, samples in results.items():
+        p50, p95 = summarize(samples)
+        print(f"{name:<16} {p50:>8.2f} {p95:>8.2f}", file=out)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,20 +2,24 @@
 """
 Command Orchestra Backend Server
 Launch script for the FastAPI automation backend.
+
+    python run_server.py                 # development: auto-reload
+    python run_server.py --production    # uvloop/httptools, one worker per CPU
 """
 
-import os
 import sys
-import uvicorn
 from pathlib import Path
 
 # Add the project root to Python path
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
+from speech2action.api.server import default_workers, parse_args, serve  # noqa: E402
+
 
 def main():
     """Launch the FastAPI server."""
+    args = parse_args()
 
     # Check if .env file exists
     env_file = project_root / ".env"
@@ -28,20 +32,16 @@ def main():
         print()
 
     print("🎻 Starting Command Orchestra Backend...")
-    print("🚀 Server will be available at: http://localhost:8000")
-    print("📚 API docs available at: http://localhost:8000/docs")
-    print("🔄 Auto-reload enabled for development")
+    print(f"🚀 Server will be available at: http://localhost:{args.port}")
+    print(f"📚 API docs available at: http://localhost:{args.port}/docs")
+    if args.production:
+        print(f"🏭 Production mode: {args.workers or default_workers()} worker(s)")
+    else:
+        print("🔄 Auto-reload enabled for development")
     print()
 
     try:
-        uvicorn.run(
-            "speech2action.api.main:app",
-            host="0.0.0.0",
-            port=8000,
-            reload=True,
-            log_level="info",
-            access_log=True,
-        )
+        serve(**vars(args))
     except KeyboardInterrupt:
         print("\n🛑 Server stopped by user")
     except Exception as e:
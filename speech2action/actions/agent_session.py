@@ -0,0 +1,256 @@
+"""
+A long-lived agent runtime for the interactive CLI's agent mode.
+
+process_command() goes through Runner.run_sync, so every command pays for
+client setup and a new HTTPS connection before the model sees a token, and
+the CLI does nothing while the user is typing. AgentSession keeps one event
+loop running on a background thread for the whole session, with one OpenAI
+client whose connection pool lives on that loop:
+
+- start() creates the client and warms it with a models.retrieve request
+  (DNS, TCP and TLS) while the user reads the prompt;
+- while idle, a keep-alive request every ORCHESTRA_AGENT_KEEPALIVE seconds
+  stops the server from closing the connection;
+- speculate(text) starts resolving a command while it is still being typed
+  (see core/voice_listener.py), and resolve(text) takes over that run when
+  the line sent matches the text it was started on.
+
+A run started on text that may still change must not touch the vaults, so
+the tools only record the actions they would run (see
+manager_agent.deferred_actions) and resolve() runs them once the command is
+final. Every run is resolved this way, speculative or not.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import httpx
+from agents import RunConfig, Runner
+from agents.models import get_default_model
+from agents.models.openai_provider import OpenAIProvider
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+from speech2action.actions.manager_agent import (
+    _record_run,
+    deferred_actions,
+    manager_agent,
+)
+from speech2action.actions.registry import metric_action, run_action
+from speech2action.config.settings import get_settings
+from speech2action.core.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+MIN_SPECULATE_CHARS = 4  # shorter partial input is not worth a model call
+PING_TIMEOUT = 10.0  # seconds
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split())
+
+
+@dataclass
+class _Run:
+    text: str
+    future: Future  # (final output, deferred actions)
+
+
+class AgentSession:
+    def __init__(self, settings=None, keepalive: float = 30.0, speculate: bool = True):
+        self.settings = settings  # profile whose vaults the tools use
+        self.keepalive = keepalive
+        self.speculate_enabled = speculate
+        self.model = (
+            manager_agent.model
+            if isinstance(manager_agent.model, str)
+            else get_default_model()
+        )
+        self.warm_up_seconds: Optional[float] = None
+        self.warm_up_error: Optional[str] = None
+        self.keepalives = 0
+        self.times_to_result: List[float] = []
+        self.speculated = 0  # commands whose run started while being typed
+        self._client: Optional[AsyncOpenAI] = None
+        self._run_config: Optional[RunConfig] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._tasks: List[Future] = []
+        self._speculation: Optional[_Run] = None
+        self._lock = threading.Lock()
+        self._last_request = time.monotonic()
+
+    def start(self) -> "AgentSession":
+        try:
+            # Idle connections outlive the keep-alive interval
+            limits = httpx.Limits(
+                max_keepalive_connections=4,
+                keepalive_expiry=max(2 * self.keepalive, 5.0),
+            )
+            self._client = AsyncOpenAI(
+                http_client=DefaultAsyncHttpxClient(limits=limits)
+            )
+            self._run_config = RunConfig(
+                model_provider=OpenAIProvider(openai_client=self._client)
+            )
+        except Exception as e:
+            # No API key: runs use the SDK's default client and fail as before
+            self.warm_up_error = str(e)
+            logger.warning(f"Agent session not warmed: {str(e)}")
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="agent-session", daemon=True
+        )
+        self._thread.start()
+        if self._client is not None:
+            self._tasks.append(self._submit(self._warm_up()))
+            if self.keepalive > 0:
+                self._tasks.append(self._submit(self._keep_alive()))
+        return self
+
+    def _submit(self, coroutine) -> Future:
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    async def _ping(self):
+        self._last_request = time.monotonic()
+        await self._client.with_options(timeout=PING_TIMEOUT).models.retrieve(
+            self.model
+        )
+
+    async def _warm_up(self):
+        started = time.perf_counter()
+        try:
+            await self._ping()
+            self.warm_up_seconds = time.perf_counter() - started
+        except Exception as e:
+            self.warm_up_error = str(e)
+            logger.warning(f"Agent warm-up failed: {str(e)}")
+
+    async def _keep_alive(self):
+        while True:
+            idle = time.monotonic() - self._last_request
+            if idle < self.keepalive:
+                await asyncio.sleep(self.keepalive - idle)
+                continue
+            try:
+                await self._ping()
+                self.keepalives += 1
+            except Exception as e:
+                logger.debug(f"Agent keep-alive failed: {str(e)}")
+
+    async def _resolve(self, text: str):
+        actions: List[str] = []
+        deferred_actions.set(actions)  # local to this run's task
+        self._last_request = time.monotonic()
+        with get_metrics().timed("agent") as timer:
+            result = await Runner.run(
+                manager_agent,
+                text,
+                context=self.settings,
+                run_config=self._run_config,
+            )
+            if result and result.final_output:
+                timer.action = metric_action(result.final_output.action)
+        return result.final_output if result else None, actions
+
+    def speculate(self, text: str):
+        """Start resolving text, the command typed so far, in the background."""
+        text = _normalize(text)
+        if not self.speculate_enabled or len(text) < MIN_SPECULATE_CHARS:
+            return
+        with self._lock:
+            current = self._speculation
+            if current is not None:
+                if current.text == text:
+                    return
+                current.future.cancel()  # superseded; it has run nothing
+            self._speculation = _Run(text, self._submit(self._resolve(text)))
+
+    def resolve(self, text: str) -> Dict[str, Any]:
+        """
+        Resolve and run a final command, like process_command(), reusing the
+        speculative run if it was started on the same text. The result also
+        has the time to result in seconds and whether the run was speculative.
+        """
+        started = time.perf_counter()
+        text = _normalize(text)
+        with self._lock:
+            run, self._speculation = self._speculation, None
+        if run is not None and run.text != text:
+            run.future.cancel()
+            run = None
+        speculative = run is not None
+        if run is None:
+            run = _Run(text, self._submit(self._resolve(text)))
+        try:
+            output, actions = run.future.result()
+            for action in actions:
+                run_action(action, self.settings)
+            _record_run()
+            if output:
+                outcome = {
+                    "success": True,
+                    "action": output.action,
+                    "message": output.explanation,
+                }
+            else:
+                outcome = {
+                    "success": False,
+                    "action": None,
+                    "message": "Failed to process command",
+                }
+        except Exception as e:
+            _record_run(str(e))
+            outcome = {"success": False, "action": None, "message": f"Error: {str(e)}"}
+        seconds = time.perf_counter() - started
+        self.times_to_result.append(seconds)
+        self.speculated += speculative
+        return {**outcome, "seconds": seconds, "speculative": speculative}
+
+    def report(self) -> Dict[str, Any]:
+        """Time to result of the first command and of the later ones."""
+        later = sorted(self.times_to_result[1:])
+        return {
+            "commands": len(self.times_to_result),
+            "first_seconds": (
+                self.times_to_result[0] if self.times_to_result else None
+            ),
+            "later_p50_seconds": later[len(later) // 2] if later else None,
+            "later_max_seconds": later[-1] if later else None,
+            "speculated": self.speculated,
+            "warm_up_seconds": self.warm_up_seconds,
+            "keepalives": self.keepalives,
+        }
+
+    def close(self):
+        if self._loop is None:
+            return
+        for task in self._tasks:
+            task.cancel()
+        with self._lock:
+            if self._speculation is not None:
+                self._speculation.future.cancel()
+                self._speculation = None
+        if self._client is not None:
+            try:
+                self._submit(self._client.close()).result(timeout=5)
+            except Exception as e:
+                logger.debug(f"Could not close the agent client: {str(e)}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop.close()
+        self._loop = None
+
+
+def open_agent_session(settings=None) -> AgentSession:
+    """A started session configured from the ORCHESTRA_AGENT_* settings."""
+    config = get_settings()
+    return AgentSession(
+        settings,
+        keepalive=config.ORCHESTRA_AGENT_KEEPALIVE,
+        speculate=config.ORCHESTRA_AGENT_SPECULATE,
+    ).start()
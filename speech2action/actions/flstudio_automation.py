@@ -1,132 +1,104 @@
-"""Automate FL Studio to open a drum project before starting a drumming session"""
+"""
+Automate FL Studio to open a drum project before starting a drumming session.
+
+The FL_* settings are read when an automation runs, so changes to .env apply
+to the next one.
+"""
 
 import os
-import subprocess
 import time
-import pyautogui
-import sys
-
-
-ASSETS_DIR = os.getenv("FL_ASSETS_DIR", "assets")  # Directory for reference images
-FL_STUDIO_PATH = os.getenv("FL_STUDIO_PATH", "FL Studio 2024")
-PROJECT_NAME = os.getenv("FL_PROJECT_NAME", "DRUMS.flp")
-AUDIO_DEVICE = os.getenv("FL_AUDIO_DEVICE", "AIR 192 4")
-WAIT_BETWEEN_TIME = int(
-    os.getenv("WAIT_BETWEEN_TIME", "5")
-)  # seconds to wait for FL Studio to launch
-
-
-def launch_fl_studio():
-    """Launch FL Studio using the configured path."""
-    print("[INFO] Launching FL Studio...")
-    subprocess.Popen(["open", "-a", FL_STUDIO_PATH])
-    print("[INFO] FL Studio should be running now.")
 
+from speech2action.config.settings import get_settings
+from speech2action.gui.backends import VirtualBackend
+from speech2action.gui.engine import run_macro
+from speech2action.gui.locator import get_locator
+from speech2action.gui.readiness import FakeAppBackend, ensure_app_ready
+
+
+def launch_fl_studio(input_backend=None, app_backend=None):
+    """Launch FL Studio unless it is running, then wait until its window is up."""
+    settings = get_settings()
+    print("[INFO] Making sure FL Studio is running...")
+    result = ensure_app_ready(
+        settings.FL_STUDIO_PATH,
+        window_title="FL Studio",
+        deadline=settings.FL_LAUNCH_TIMEOUT,
+        backend=app_backend,
+        sleep=input_backend.sleep if input_backend else time.sleep,
+    )
+    if result.already_running:
+        print("[INFO] FL Studio is already running.")
+    else:
+        print(f"[INFO] FL Studio ready after {result.elapsed:.1f}s.")
+
+
+def _macro_variables(settings):
+    """Variables available to the FL Studio macros."""
+    return {
+        "PROJECT_NAME": settings.FL_PROJECT_NAME,
+        "PROJECT_TITLE": os.path.splitext(settings.FL_PROJECT_NAME)[0],
+        "AUDIO_DEVICE": settings.FL_AUDIO_DEVICE,
+        "LAUNCH_TIMEOUT": settings.FL_LAUNCH_TIMEOUT,
+    }
+
+
+def _run_macro(name, input_backend=None, app_backend=None):
+    settings = get_settings()
+    return run_macro(
+        name,
+        _macro_variables(settings),
+        backend=input_backend,
+        locator=get_locator(settings.FL_ASSETS_DIR),
+        app_backend=app_backend,
+    )
+
+
+def open_drum_project_pyautogui(input_backend=None, app_backend=None):
+    """Open the drum project and the latest EZD3 save (macros/open_drum_project.json)."""
+    print("Opening drum project...")
+    _run_macro("open_drum_project", input_backend, app_backend)
+    print("[INFO] Drum project opened.")
 
-def open_drum_project_pyautogui():
 
-    print("Opening drum project...")
-    # Open drum projet by clicking opt+1
-    pyautogui.keyDown("command")
-    pyautogui.press("o")
-    pyautogui.keyUp("command")
-    time.sleep(1)
-
-    # Click search
-    pyautogui.keyDown("command")
-    pyautogui.press("f")
-    pyautogui.keyUp("command")
-    time.sleep(1)
-
-    # Type project name
-    pyautogui.typewrite(PROJECT_NAME)
-    time.sleep(2)
-
-    # Click project icon
-    pyautogui.moveTo(568, 217)
-    time.sleep(0.5)
-    pyautogui.click()
-    time.sleep(0.2)
-
-    # Open project
-    pyautogui.moveTo(1080, 900)
-    pyautogui.click()
-    time.sleep(5)
-
-    print("Opening EZD3...")
-    # Open file in EZD3
-    pyautogui.moveTo(190, 240)
-    pyautogui.click()
-    time.sleep(0.5)
-
-    # Hoover open recent
-    pyautogui.moveTo(200, 350)
-    time.sleep(0.5)
-
-    # Open most recent save
-    pyautogui.moveTo(520, 350)
-    pyautogui.click()
-    time.sleep(0.5)
-
-    # Dont save
-    pyautogui.moveTo(785, 640)
-    pyautogui.click()
-
-    print("Done")
-
-    print("[INFO] Drum project opened using screenshots.")
-
-
-def switch_audio_device():
+def switch_audio_device(input_backend=None, app_backend=None):
     """Switch audio device to the one specified in the environment variable FL_AUDIO_DEVICE."""
 
-    print(f"[INFO] Switching audio device to {AUDIO_DEVICE}...")
+    print(f"[INFO] Switching audio device to {get_settings().FL_AUDIO_DEVICE}...")
+    _run_macro("switch_audio_device", input_backend, app_backend)
 
-    # Move to and click on 265, 60 options
-    pyautogui.moveTo(265, 60)
-    pyautogui.click()
-    time.sleep(1)
 
-    # Move to and click on 295 120 audio settings
-    pyautogui.moveTo(295, 120)
-    pyautogui.click()
-    time.sleep(1)
+def open_drum_session(input_backend=None, app_backend=None):
+    # Readiness probes and macro conditions replace fixed sleeps between stages
+    launch_fl_studio(input_backend, app_backend)
+    open_drum_project_pyautogui(input_backend, app_backend)
+    switch_audio_device(input_backend, app_backend)
 
-    # Move to and click on 640 160 Device
-    pyautogui.moveTo(640, 160)
-    pyautogui.click()
-    time.sleep(1)
 
-    # Move to and click on 640 230 Select
-    pyautogui.moveTo(640, 230)
-    pyautogui.click()
-    time.sleep(1)
+# Studio actions by API name
+STUDIO_ACTIONS = {
+    "open_session": open_drum_session,
+    "switch_audio": switch_audio_device,
+    "open_project": launch_fl_studio,
+}
 
-    # Move to and click on 640 230 Close
-    pyautogui.moveTo(1078, 64)
-    pyautogui.click()
-    time.sleep(1)
 
-
-def open_drum_session():
-    launch_fl_studio()
-    time.sleep(WAIT_BETWEEN_TIME)
-    open_drum_project_pyautogui()
-    time.sleep(WAIT_BETWEEN_TIME)
-    switch_audio_device()
+def dry_run(automation_func):
+    """
+    Run a studio automation against the virtual input backend and a fake,
+    already running FL Studio. Returns the simulated cost report.
+    """
+    settings = get_settings()
+    project_title = os.path.splitext(settings.FL_PROJECT_NAME)[0]
+    backend = VirtualBackend()
+    app_backend = FakeAppBackend(
+        running=True,
+        window_title=f"{project_title} - {settings.FL_STUDIO_PATH}",
+        clock=backend.monotonic,
+    )
+    automation_func(input_backend=backend, app_backend=app_backend)
+    return backend.report()
 
 
 if __name__ == "__main__":
+    # Record new steps with: python -m speech2action.gui.recorder record <file>
     open_drum_session()
-
-    print("Move your mouse to the desired location. Press Ctrl+C to exit.\n")
-
-    try:
-        while True:
-            x, y = pyautogui.position()
-            # Print coordinates on the same line
-            print(f"\rMouse position: X={x} Y={y}   ", end="")
-            sys.stdout.flush()
-            time.sleep(0.05)  # Update every 50ms
-    except KeyboardInterrupt:
-        print("\n[INFO] Exiting mouse coordinate tracker.")
@@ -3,106 +3,132 @@ Manager Agent using OpenAI Agents SDK for Command Orchestra.
 This module implements a manager agent that processes commands and routes them to the appropriate actions.
 """
 
+from contextvars import ContextVar
 from typing import Dict, Any, List, Optional
 import os
 import asyncio
+import time
 
-from agents import Agent, Runner, function_tool
+from agents import Agent, Runner, RunContextWrapper, function_tool
 from pydantic import BaseModel, Field
 
-from speech2action.actions.obsidian_automation import (
-    create_gym_dir,
-    create_daily_note,
-    create_tomorrow_note,
-    create_today_running_note,
-    create_today_stairclimbing_note,
-    create_today_mobility_note,
-    create_today_cycling_note,
+from speech2action.actions.registry import metric_action, run_action
+from speech2action.actions.spell_book import SPELLS
+from speech2action.core.metrics import get_metrics
+from speech2action.core.profiling import bind_profile
+
+# Set while the agent resolves a command that may still change (see
+# agent_session.py): the tools then only record the actions they would run
+deferred_actions: ContextVar[Optional[List[str]]] = ContextVar(
+    "deferred_actions", default=None
 )
-from speech2action.actions.spell_book import list_spells, SPELLS
 
 
-# Define our function tools that the agent will use
+def _run_tool_action(action: str, settings=None):
+    deferred = deferred_actions.get()
+    if deferred is None:
+        run_action(action, settings)
+    else:
+        deferred.append(action)
+
+
+# Define our function tools that the agent will use.
+# The run context is the profile whose vaults the tools write to.
 @function_tool
-def create_gym_directory() -> str:
+def create_gym_directory(ctx: RunContextWrapper[Any]) -> str:
     """
     Creates a new gym directory for workout tracking.
     Use this when the user wants to create a gym directory or track workouts.
     """
-    create_gym_dir()
+    _run_tool_action("create_gym_dir", ctx.context)
     return "✅ Created a new gym directory for today's workout"
 
 
 @function_tool
-def create_today_note() -> str:
+def create_today_note(ctx: RunContextWrapper[Any]) -> str:
     """
     Creates a daily note for today.
     Use this when the user wants to create a note for today.
     """
-    create_daily_note()
+    _run_tool_action("create_daily_note", ctx.context)
     return "✅ Created a daily note for today"
 
 
 @function_tool
-def create_note_for_tomorrow() -> str:
+def create_note_for_tomorrow(ctx: RunContextWrapper[Any]) -> str:
     """
     Creates a daily note for tomorrow.
     Use this when the user wants to create a note for tomorrow.
     """
-    create_tomorrow_note()
+    _run_tool_action("create_tomorrow_note", ctx.context)
     return "✅ Created a daily note for tomorrow"
 
 
 @function_tool
-def create_today_running_note_tool() -> str:
+def create_today_running_note_tool(ctx: RunContextWrapper[Any]) -> str:
     """
     Creates a new running note for today.
     Use this when the user wants to log a run or create a running note.
     """
-    create_today_running_note()
+    _run_tool_action("create_today_running_note", ctx.context)
     return "✅ Created a new running note for today"
 
 
 @function_tool
-def create_today_stairclimbing_note_tool() -> str:
+def create_today_stairclimbing_note_tool(ctx: RunContextWrapper[Any]) -> str:
     """
     Creates a new stairclimbing note for today.
     Use this when the user wants to log stairclimbing or create a stairclimbing note.
     """
-    create_today_stairclimbing_note()
+    _run_tool_action("create_today_stairclimbing_note", ctx.context)
     return "✅ Created a new stairclimbing note for today"
 
 
 @function_tool
-def create_today_mobility_note_tool() -> str:
+def create_today_mobility_note_tool(ctx: RunContextWrapper[Any]) -> str:
     """
     Creates a new mobility note for today.
     Use this when the user wants to log mobility or create a mobility note.
     """
-    create_today_mobility_note()
+    _run_tool_action("create_today_mobility_note", ctx.context)
     return "✅ Created a new mobility note for today"
 
 
 @function_tool
-def create_today_cycling_note_tool() -> str:
+def create_today_cycling_note_tool(ctx: RunContextWrapper[Any]) -> str:
     """
     Creates a new cycling note for today.
     Use this when the user wants to log a cycling session or create a cycling note.
     """
-    create_today_cycling_note()
+    _run_tool_action("create_today_cycling_note", ctx.context)
     return "✅ Created a new cycling note for today"
 
 
 @function_tool
-def show_all_spells() -> str:
+def show_all_spells(ctx: RunContextWrapper[Any]) -> str:
     """
     Shows all available spells and their descriptions.
     Use this when the user wants to see a list of available commands or spells.
     """
-    list_spells()
+    _run_tool_action("list_spells", ctx.context)
     return "✅ Displayed all available spells"
 
 
+# Outcome of the latest agent runs, reported by the readiness probe
+agent_health: Dict[str, Any] = {
+    "last_success_at": None,
+    "last_error_at": None,
+    "last_error": None,
+}
+
+
+def _record_run(error: Optional[str] = None):
+    if error is None:
+        agent_health["last_success_at"] = time.time()
+    else:
+        agent_health.update(last_error_at=time.time(), last_error=error)
+
+
 # Create a class for structured output
 class CommandResult(BaseModel):
     """Structured output for the manager agent's command processing"""
@@ -143,19 +169,24 @@ manager_agent = Agent(
 )
 
 
-def process_command(command: str) -> Dict[str, Any]:
+def process_command(command: str, settings=None) -> Dict[str, Any]:
     """
     Process a user command using the manager agent.
 
     Args:
         command: The user command text
+        settings: Profile whose vaults the tools use (defaults to .env)
 
     Returns:
         Dict with the result information including success status, action, and message
     """
     try:
         # Run the agent with the user command
-        result = Runner.run_sync(manager_agent, command)
+        with get_metrics().timed("agent") as timer:
+            result = Runner.run_sync(manager_agent, command, context=settings)
+            if result and result.final_output:
+                timer.action = metric_action(result.final_output.action)
+        _record_run()
 
         # Extract the result information
         if result and result.final_output:
@@ -171,15 +202,17 @@ def process_command(command: str) -> Dict[str, Any]:
                 "message": "Failed to process command",
             }
     except Exception as e:
+        _record_run(str(e))
         return {"success": False, "action": None, "message": f"Error: {str(e)}"}
 
 
-async def process_command_async(command: str) -> Dict[str, Any]:
+async def process_command_async(command: str, settings=None) -> Dict[str, Any]:
     """
     Async version of process_command that runs the agent in a separate thread.
 
     Args:
         command: The user command text
+        settings: Profile whose vaults the tools use (defaults to .env)
 
     Returns:
         Dict with the result information including success status, action, and message
@@ -187,18 +220,24 @@ async def process_command_async(command: str) -> Dict[str, Any]:
     try:
         # Run the sync agent in a thread pool to avoid event loop conflicts
         loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(None, _run_agent_sync, command)
+        result = await loop.run_in_executor(
+            None, bind_profile(_run_agent_sync), command, settings
+        )
         return result
     except Exception as e:
         return {"success": False, "action": None, "message": f"Error: {str(e)}"}
 
 
-def _run_agent_sync(command: str) -> Dict[str, Any]:
+def _run_agent_sync(command: str, settings=None) -> Dict[str, Any]:
     """
     Helper function to run the agent synchronously in a new thread.
     """
     try:
-        result = Runner.run_sync(manager_agent, command)
+        with get_metrics().timed("agent") as timer:
+            result = Runner.run_sync(manager_agent, command, context=settings)
+            if result and result.final_output:
+                timer.action = metric_action(result.final_output.action)
+        _record_run()
         if result and result.final_output:
             return {
                 "success": True,
@@ -212,22 +251,24 @@ def _run_agent_sync(command: str) -> Dict[str, Any]:
                 "message": "Failed to process command",
             }
     except Exception as e:
+        _record_run(str(e))
         return {"success": False, "action": None, "message": f"Error: {str(e)}"}
 
 
 # Update command parser to use manager agent
-def get_command_from_text(text: str) -> Dict[str, Any]:
+def get_command_from_text(text: str, settings=None) -> Dict[str, Any]:
     """
     Process a text command and return the corresponding action.
     This function serves as a bridge between the existing system and our new agent.
 
     Args:
         text: The user's text command
+        settings: Profile whose vaults the tools use (defaults to .env)
 
     Returns:
         Dict with action information
     """
-    result = process_command(text)
+    result = process_command(text, settings)
 
     if result["success"]:
         # Map the agent's action to the existing action format
@@ -1,7 +1,10 @@
+import functools
 import shutil
 from datetime import datetime, timedelta
 from pathlib import Path
 from speech2action.config.settings import get_settings
+from speech2action.core.events import get_event_bus
+from speech2action.core.metrics import get_metrics
 import sys
 import os
 
@@ -29,12 +32,25 @@ def update_date_in_content(content, new_date):
     return "\n".join(lines)
 
 
-def create_gym_dir():
+def timed_vault_io(func):
+    """Record the time func spends on vault file operations."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with get_metrics().timed("vault_io", func.__name__):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+@timed_vault_io
+def create_gym_dir(settings=None):
     """
     Create a new gym directory for today in the Weightlifting vault, cycling exercise groups.
     Copy .md files from the previous same-group directory (if exists), updating the date:: line.
+    Uses the given profile's vault, or the .env settings if none is given.
     """
-    settings = get_settings()
+    settings = settings or get_settings()
     obsidian_vault_path = settings.OBSIDIAN_EXERCISE_VAULT_PATH
     if not obsidian_vault_path:
         print(
@@ -83,12 +99,20 @@ def create_gym_dir():
             print(
                 f"[INFO] Copied .md files from {prev_group_dir} to {new_dir} (date updated)"
             )
+            get_event_bus().publish(
+                "vault.files_copied",
+                source=str(prev_group_dir),
+                target=str(new_dir),
+                files=[f.name for f in md_files],
+                count=len(md_files),
+            )
         else:
             print(f"[INFO] No .md files to copy from {prev_group_dir}")
     else:
         print(f"[INFO] No previous {next_group} directory found. No files copied.")
 
 
+@timed_vault_io
 def create_note_for_date(
     date_obj,
     note_type: str,
@@ -96,6 +120,7 @@ def create_note_for_date(
     base_dir: str = None,  # e.g., "Running", "Mobility", "📆"
     note_prefix: str = None,  # e.g., "Running -", "Mobility -"
     label: str = None,
+    settings=None,
 ):
     """
     Generic function to create notes for any type in Obsidian vault.
@@ -106,8 +131,9 @@ def create_note_for_date(
         base_dir: Base directory name in the vault
         note_prefix: Prefix for the note filename
         label: Label for logging purposes
+        settings: Profile or settings holding the vault paths (defaults to .env)
     """
-    settings = get_settings()
+    settings = settings or get_settings()
     vault_path = (
         settings.OBSIDIAN_EXERCISE_VAULT_PATH
         if vault_type == "exercise"
@@ -136,11 +162,16 @@ def create_note_for_date(
             print(
                 f"[INFO] Created {label}'s note {note_path} from template {template_path}"
             )
+            source = str(template_path)
         else:
             note_path.touch(exist_ok=True)
             print(
                 f"[INFO] Created blank {label}'s note {note_path} (no template found)"
             )
+            source = None
+        get_event_bus().publish(
+            "vault.note_created", path=str(note_path), source=source
+        )
         return
 
     # For exercise notes
@@ -167,32 +198,37 @@ def create_note_for_date(
         print(
             f"[INFO] Created {note_type} note: {note_path} (copied from {latest_note}, date updated)"
         )
+        source = str(latest_note)
     else:
         note_path.write_text(f"date:: {date_str}\n", encoding="utf-8")
         print(f"[INFO] Created blank {note_type} note: {note_path}")
+        source = None
+    get_event_bus().publish("vault.note_created", path=str(note_path), source=source)
 
 
-def create_daily_note():
+def create_daily_note(settings=None):
     create_note_for_date(
         date_obj=datetime.today().date(),
         note_type="daily",
         vault_type="main",
         base_dir="\U0001f4c6",  # 📆
         label="today",
+        settings=settings,
     )
 
 
-def create_tomorrow_note():
+def create_tomorrow_note(settings=None):
     create_note_for_date(
         date_obj=datetime.today().date() + timedelta(days=1),
         note_type="daily",
         vault_type="main",
         base_dir="\U0001f4c6",  # 📆
         label="tomorrow",
+        settings=settings,
     )
 
 
-def create_today_running_note():
+def create_today_running_note(settings=None):
     create_note_for_date(
         date_obj=datetime.today().date(),
         note_type="running",
@@ -200,10 +236,11 @@ def create_today_running_note():
         base_dir="Running",
         note_prefix="Running -",
         label="running",
+        settings=settings,
     )
 
 
-def create_today_stairclimbing_note():
+def create_today_stairclimbing_note(settings=None):
     create_note_for_date(
         date_obj=datetime.today().date(),
         note_type="stairclimbing",
@@ -211,10 +248,11 @@ def create_today_stairclimbing_note():
         base_dir="Stairclimbing",
         note_prefix="Stair climbing",
         label="stairclimbing",
+        settings=settings,
     )
 
 
-def create_today_mobility_note():
+def create_today_mobility_note(settings=None):
     create_note_for_date(
         date_obj=datetime.today().date(),
         note_type="mobility",
@@ -222,10 +260,11 @@ def create_today_mobility_note():
         base_dir="Mobility",
         note_prefix="Mobility -",
         label="mobility",
+        settings=settings,
     )
 
 
-def create_today_cycling_note():
+def create_today_cycling_note(settings=None):
     create_note_for_date(
         date_obj=datetime.today().date(),
         note_type="cycling",
@@ -233,4 +272,5 @@ def create_today_cycling_note():
         base_dir="Cycling",
         note_prefix="Cycling -",
         label="cycling",
+        settings=settings,
     )
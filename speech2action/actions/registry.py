@@ -0,0 +1,197 @@
+"""
+Registry of parsed actions and the lane each one runs on.
+
+Vault automations are serialized per vault path, GUI automations run as jobs
+in the out-of-process GUI worker, and console actions run inline.
+"""
+
+import functools
+import time
+import uuid
+from concurrent.futures import Future
+from typing import Callable, Dict, Mapping, Optional, Tuple, Union
+
+from speech2action.actions.obsidian_automation import (
+    create_gym_dir,
+    create_daily_note,
+    create_tomorrow_note,
+    create_today_running_note,
+    create_today_stairclimbing_note,
+    create_today_mobility_note,
+    create_today_cycling_note,
+)
+from speech2action.actions.spell_book import list_spells
+from speech2action.config.settings import get_settings
+from speech2action.core.admission import get_admission_controller
+from speech2action.core.events import get_event_bus, job_context
+from speech2action.core.lanes import get_lane_executor, vault_lane
+from speech2action.core.metrics import get_metrics
+from speech2action.gui.worker import get_gui_worker
+
+# Maps action name -> (automation, lane kind).
+# Lane kind is the vault type ("exercise"/"main"), "gui", or None for inline.
+# GUI automations are named by their studio action, run by the GUI worker.
+ACTION_REGISTRY: Dict[str, Tuple[Union[Callable, str], Optional[str]]] = {
+    "list_spells": (list_spells, None),
+    "create_gym_dir": (create_gym_dir, "exercise"),
+    "create_daily_note": (create_daily_note, "main"),
+    "create_tomorrow_note": (create_tomorrow_note, "main"),
+    "create_today_running_note": (create_today_running_note, "exercise"),
+    "create_today_stairclimbing_note": (create_today_stairclimbing_note, "exercise"),
+    "create_today_mobility_note": (create_today_mobility_note, "exercise"),
+    "create_today_cycling_note": (create_today_cycling_note, "exercise"),
+    "spell_studio": ("open_session", "gui"),
+    "open_drum_session": ("open_session", "gui"),
+}
+
+
+def metric_action(action: Optional[str]) -> str:
+    """
+    The action as a metrics label: registered actions as they are, anything
+    else (such as an action name the agent made up) as "other", so labels
+    stay few and never carry model output.
+    """
+    return action if action in ACTION_REGISTRY else "other"
+
+
+def resolve_action(action: str, settings=None) -> Tuple[Optional[str], Callable, dict]:
+    """
+    Resolve a vault or inline action to (lane key, function, kwargs).
+    The lane key is None for actions that run inline.
+    Raises KeyError for unknown actions.
+    """
+    func, lane_kind = ACTION_REGISTRY[action]
+    if lane_kind is None:
+        return None, func, {}
+    settings = settings or get_settings()
+    return vault_lane(settings, lane_kind), func, {"settings": settings}
+
+
+def action_lane(action: str, settings=None) -> Optional[str]:
+    """The lane key an action is queued on: a vault lane, "gui", or None."""
+    _, lane_kind = ACTION_REGISTRY[action]
+    if lane_kind in (None, "gui"):
+        return lane_kind
+    return vault_lane(settings or get_settings(), lane_kind)
+
+
+def check_capacity(jobs: Mapping[str, int]):
+    """
+    Raise AdmissionRejected unless every lane key in jobs has room for that
+    many more automations.
+    """
+    controller = get_admission_controller()
+    for lane, count in jobs.items():
+        if lane == "gui":
+            depth = get_gui_worker().queue_depth()
+        else:
+            depth = get_lane_executor().depth(lane)
+        controller.check_lane(lane, depth, count)
+
+
+def _instrumented(action: str, func: Callable, lane: str) -> Callable:
+    """
+    Wrap func to record its queue wait, run time and outcome, and to publish
+    its progress events. The wrapper's job_id identifies those events.
+    """
+    submitted = time.perf_counter()
+    job_id = uuid.uuid4().hex[:12]
+    bus = get_event_bus()
+    bus.publish("job.queued", job_id=job_id, action=action, lane=lane)
+
+    @functools.wraps(func)
+    def run(**kwargs):
+        metrics = get_metrics()
+        started = time.perf_counter()
+        metrics.observe("queue_wait", action, started - submitted)
+        status, message = "failed", ""
+        with job_context(job_id):
+            bus.publish("job.started", action=action, lane=lane)
+            try:
+                result = func(**kwargs)
+                status, message = "succeeded", f"{action} completed"
+                return result
+            except Exception as e:
+                message = f"{action} failed: {str(e)}"
+                raise
+            finally:
+                duration = time.perf_counter() - started
+                metrics.observe("execute", action, duration)
+                metrics.inc(
+                    "orchestra_actions_total",
+                    action=action,
+                    status="ok" if status == "succeeded" else "error",
+                )
+                bus.publish(
+                    "job.finished",
+                    action=action,
+                    lane=lane,
+                    status=status,
+                    duration=round(duration, 6),
+                    message=message,
+                )
+
+    run.job_id = job_id
+    return run
+
+
+def submit_action(action: str, settings=None) -> Future:
+    """
+    Queue an action on its lane (or the GUI worker) and return the future.
+    The future's job_id attribute tags the job's progress events.
+    Raises AdmissionRejected if the lane is full.
+    """
+    studio_action, lane_kind = ACTION_REGISTRY[action]
+    lane = action_lane(action, settings)
+    if lane is not None:
+        check_capacity({lane: 1})
+    if lane_kind == "gui":
+        job = get_gui_worker().submit(studio_action)
+        job.future.job_id = job.job_id
+        return job.future
+    lane, func, kwargs = resolve_action(action, settings)
+    func = _instrumented(action, func, lane_kind or "inline")
+    if lane is None:
+        future = Future()
+        future.set_result(func(**kwargs))
+    else:
+        future = get_lane_executor().submit(lane, func, **kwargs)
+    future.job_id = func.job_id
+    return future
+
+
+def cancel_action(action: str, future: Future) -> bool:
+    """
+    Cancel an action returned by submit_action(). Vault actions can only be
+    cancelled while queued, GUI jobs also while running. Returns False if it
+    was too late.
+    """
+    _, lane_kind = ACTION_REGISTRY[action]
+    if lane_kind == "gui":
+        return get_gui_worker().cancel(future.job_id)
+    if not future.cancel():
+        return False
+    get_event_bus().publish(
+        "job.finished",
+        job_id=future.job_id,
+        action=action,
+        lane=lane_kind or "inline",
+        status="cancelled",
+        duration=0.0,
+        message=f"{action} cancelled",
+    )
+    return True
+
+
+def run_action(action: str, settings=None):
+    """Run an action on its lane (or the GUI worker) and wait for it to finish."""
+    studio_action, lane_kind = ACTION_REGISTRY[action]
+    if lane_kind == "gui":
+        job = get_gui_worker().submit(studio_action).future.result()
+        print(f"[INFO] {job.message}")
+        return job
+    lane, func, kwargs = resolve_action(action, settings)
+    func = _instrumented(action, func, lane_kind or "inline")
+    if lane is None:
+        return func(**kwargs)
+    return get_lane_executor().call(lane, func, **kwargs)
@@ -0,0 +1,68 @@
+"""Debug routes: request profiles recorded by the profiling middleware."""
+
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse, Response
+from starlette.concurrency import run_in_threadpool
+
+from speech2action.core.profiling import ProfileStore, get_profile_store
+
+router = APIRouter(prefix="/debug")
+
+
+def _require_store() -> ProfileStore:
+    store = get_profile_store()
+    if store is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Profiling is disabled (set ORCHESTRA_PROFILING=true)",
+        )
+    return store
+
+
+def _require_profile(store: ProfileStore, profile_id: str) -> Dict[str, Any]:
+    meta = store.get(profile_id)
+    if meta is None:
+        raise HTTPException(status_code=404, detail=f"Unknown profile: {profile_id}")
+    return meta
+
+
+@router.get("/profiles")
+async def list_profiles() -> List[Dict[str, Any]]:
+    """List retained request profiles, newest first."""
+    return _require_store().list()
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile_summary(profile_id: str) -> Dict[str, Any]:
+    """Segments and top functions (by cumulative time) of one profile."""
+    store = _require_store()
+    return _require_profile(store, profile_id)
+
+
+@router.get("/profiles/{profile_id}/pstats")
+async def download_pstats(profile_id: str):
+    """Download the profile for `python -m pstats` or snakeviz."""
+    store = _require_store()
+    _require_profile(store, profile_id)
+    return FileResponse(
+        store.stats_path(profile_id),
+        media_type="application/octet-stream",
+        filename=f"{profile_id}.pstats",
+    )
+
+
+@router.get("/profiles/{profile_id}/speedscope")
+async def download_speedscope(profile_id: str):
+    """Download the profile for https://www.speedscope.app."""
+    store = _require_store()
+    _require_profile(store, profile_id)
+    body = await run_in_threadpool(store.speedscope, profile_id)
+    return Response(
+        body,
+        media_type="application/json",
+        headers={
+            "Content-Disposition": f'attachment; filename="{profile_id}.speedscope.json"'
+        },
+    )
@@ -0,0 +1,51 @@
+"""FastAPI dependencies shared by the API routes."""
+
+from typing import Optional
+
+from fastapi import HTTPException, Request, WebSocket, WebSocketException, status
+
+from speech2action.config.profiles import (
+    Profile,
+    ProfileAuthError,
+    UnknownProfileError,
+    get_profile_registry,
+)
+
+PROFILE_HEADER = "X-Orchestra-Profile"
+
+
+def _bearer_token(headers) -> Optional[str]:
+    auth = headers.get("Authorization")
+    if auth and auth.lower().startswith("bearer "):
+        return auth[7:].strip()
+    return None
+
+
+def get_profile(request: Request) -> Profile:
+    """Resolve the caller's vault profile from the profile header or bearer token."""
+    name = request.headers.get(PROFILE_HEADER)
+    try:
+        return get_profile_registry().resolve(name, _bearer_token(request.headers))
+    except ProfileAuthError as e:
+        raise HTTPException(status_code=401, detail=str(e))
+    except UnknownProfileError:
+        raise HTTPException(status_code=404, detail=f"Unknown profile: {name}")
+
+
+def get_ws_profile(websocket: WebSocket) -> Profile:
+    """
+    Resolve the vault profile of a WebSocket client.
+    Browsers cannot set headers on WebSockets, so the profile name and token
+    may also be given as ?profile= and ?token= query parameters.
+    """
+    params = websocket.query_params
+    name = websocket.headers.get(PROFILE_HEADER) or params.get("profile")
+    token = _bearer_token(websocket.headers) or params.get("token")
+    try:
+        return get_profile_registry().resolve(name, token)
+    except ProfileAuthError as e:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason=str(e))
+    except UnknownProfileError:
+        raise WebSocketException(
+            code=status.WS_1008_POLICY_VIOLATION, reason=f"Unknown profile: {name}"
+        )
@@ -0,0 +1,78 @@
+"""
+Server-Sent Events stream of automation progress.
+
+GET /api/v1/events streams every event published on the event bus:
+
+    id: 42
+    event: macro.step
+    data: {"id": 42, "type": "macro.step", "job_id": "3f2a...", "step": ...}
+
+`?types=job.,macro.` limits the stream to event types with those prefixes.
+Browsers reconnect with the Last-Event-ID header and receive the buffered
+events they missed. If a client reads too slowly its oldest events are
+dropped, and the next message is a `dropped` event with the count.
+"""
+
+from typing import AsyncIterator, Optional
+
+from fastapi import APIRouter, Header, Query
+from fastapi.responses import StreamingResponse
+
+from .responses import dumps
+from speech2action.core.events import Event, Subscription, get_event_bus
+
+router = APIRouter()
+
+KEEPALIVE_INTERVAL = 15.0  # seconds between comments on an idle stream
+RETRY_MS = 3000  # client reconnect delay
+
+
+def format_event(event: Event) -> bytes:
+    return (
+        f"id: {event.id}\nevent: {event.type}\ndata: ".encode()
+        + dumps(event.to_dict())
+        + b"\n\n"
+    )
+
+
+async def stream_events(subscription: Subscription) -> AsyncIterator[bytes]:
+    reported = 0
+    try:
+        yield f"retry: {RETRY_MS}\n\n".encode()
+        while True:
+            event = await subscription.get(timeout=KEEPALIVE_INTERVAL)
+            if subscription.dropped != reported:
+                count = subscription.dropped - reported
+                reported = subscription.dropped
+                yield b"event: dropped\ndata: " + dumps(
+                    {"dropped": count, "total_dropped": reported}
+                ) + b"\n\n"
+            if event is None:
+                yield b": keep-alive\n\n"
+                continue
+            yield format_event(event)
+    finally:
+        subscription.close()
+
+
+@router.get("/events")
+async def automation_events(
+    types: Optional[str] = Query(
+        None, description="Comma-separated event type prefixes, e.g. job.,macro."
+    ),
+    last_event_id: Optional[int] = Header(None),
+):
+    """Stream automation progress events (text/event-stream)."""
+    prefixes = [t.strip() for t in types.split(",") if t.strip()] if types else None
+    subscription = get_event_bus().subscribe(prefixes, last_event_id=last_event_id)
+    return StreamingResponse(
+        stream_events(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/events/stats")
+async def event_stream_stats():
+    """Events published and dropped, overall and per connected subscriber."""
+    return get_event_bus().stats()
@@ -3,11 +3,29 @@
 import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 
 from .routes import router
-from .middleware import setup_cors_middleware
+from .debug import router as debug_router
+from .events import router as events_router
+from .websocket import router as websocket_router
+from .voice_audio import router as voice_audio_router
+from .responses import PrecomputedResponse
+from .middleware import (
+    admission_response,
+    setup_cors_middleware,
+    start_access_log,
+    stop_access_log,
+)
+from speech2action.config.settings import get_settings_service
+from speech2action.core.admission import AdmissionRejected
+from speech2action.core.events import get_event_bus
+from speech2action.core.lanes import get_lane_executor
+from speech2action.core.metrics import get_metrics
+from speech2action.core.readiness import get_readiness_monitor
+from speech2action.core.shared_state import get_shared_state
+from speech2action.gui.worker import get_gui_worker, shutdown_gui_worker
 
 # Configure logging
 logging.basicConfig(
@@ -20,8 +38,23 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """Application lifespan manager."""
     logger.info("🎻 Command Orchestra backend starting up...")
+    start_access_log()
+    state = get_shared_state()
+    if state is not None:
+        # One of several worker processes: share jobs, events and metrics
+        state.start(get_metrics())
+        get_event_bus().share(state)
+        get_lane_executor().share(state)
+        get_gui_worker().share(state)
+    get_settings_service().start()
+    get_readiness_monitor().start()
     yield
     logger.info("🎻 Command Orchestra backend shutting down...")
+    get_readiness_monitor().stop()
+    get_settings_service().stop()
+    get_lane_executor().shutdown(wait=False)
+    shutdown_gui_worker()
+    stop_access_log()
 
 
 # Create FastAPI application
@@ -37,14 +70,23 @@ app = FastAPI(
 # Setup middleware
 setup_cors_middleware(app)
 
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    """Lanes or dispatch slots are full: 503 with Retry-After."""
+    return admission_response(exc)
+
+
 # Include routes
 app.include_router(router, prefix="/api/v1", tags=["automations"])
+app.include_router(debug_router, prefix="/api/v1", tags=["debug"])
+app.include_router(websocket_router, prefix="/api/v1", tags=["automations"])
+app.include_router(events_router, prefix="/api/v1", tags=["automations"])
+app.include_router(voice_audio_router, prefix="/api/v1", tags=["automations"])
 
 
-@app.get("/", response_class=HTMLResponse)
-async def root():
-    """Root endpoint with API information."""
-    return """
+# Landing page, encoded once and served with an ETag
+ROOT_PAGE = PrecomputedResponse.html("""
     <!DOCTYPE html>
     <html>
     <head>
@@ -150,6 +192,12 @@ async def root():
                 <div class="description">Process natural language voice commands</div>
             </div>
             
+            <div class="endpoint">
+                <span class="method">POST</span>
+                <span class="path">/api/v1/voice-audio</span>
+                <div class="description">Transcribe an audio recording and run the commands in it</div>
+            </div>
+            
             <div class="endpoint">
                 <span class="method">GET</span>
                 <span class="path">/api/v1/automations</span>
@@ -161,6 +209,12 @@ async def root():
                 <span class="path">/api/v1/health</span>
                 <div class="description">Health check endpoint</div>
             </div>
+            
+            <div class="endpoint">
+                <span class="method">GET</span>
+                <span class="path">/api/v1/ready</span>
+                <div class="description">Readiness of vaults, agent, lanes and GUI worker</div>
+            </div>
         </div>
         
         <div class="endpoints">
@@ -181,29 +235,44 @@ async def root():
         </div>
     </body>
     </html>
-    """
+    """)
 
-
-@app.get("/api/v1")
-async def api_info():
-    """API information endpoint."""
-    return {
+API_INFO = PrecomputedResponse.json(
+    {
         "name": "Command Orchestra API",
         "version": "1.0.0",
         "description": "Speech-2-Reality Automation Hub Backend",
         "docs_url": "/docs",
         "automations_url": "/api/v1/automations",
         "health_url": "/api/v1/health",
+        "ready_url": "/api/v1/ready",
     }
+)
 
 
-if __name__ == "__main__":
-    import uvicorn
-
-    uvicorn.run(
-        "speech2action.api.main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info",
+@app.get("/", response_class=HTMLResponse)
+async def root(request: Request):
+    """Root endpoint with API information."""
+    return ROOT_PAGE.respond(request)
+
+
+@app.get("/api/v1")
+async def api_info(request: Request):
+    """API information endpoint."""
+    return API_INFO.respond(request)
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Prometheus metrics: per-stage latency histograms and counters."""
+    state = get_shared_state()
+    text = (
+        get_metrics().render() if state is None else state.render_metrics(get_metrics())
     )
+    return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
+
+
+if __name__ == "__main__":
+    from .server import main
+
+    main()
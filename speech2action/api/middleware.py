@@ -1,44 +1,225 @@
 """Middleware for FastAPI application."""
 
-import time
+import json
 import logging
-from fastapi import Request, Response
+import queue
+import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi.responses import JSONResponse
+
+from speech2action.core.admission import AdmissionRejected, get_admission_controller
+from speech2action.core.metrics import get_metrics
+from speech2action.core.profiling import (
+    activate_profile,
+    deactivate_profile,
+    get_profile_store,
+    profiling_requested,
+)
 
 logger = logging.getLogger(__name__)
 
+# Access records go to their own logger so they can be shipped as JSON lines
+access_logger = logging.getLogger("speech2action.access")
+access_logger.propagate = False
+
+ACCESS_QUEUE_SIZE = 10000  # records kept while the listener catches up
+
+
+class JSONFormatter(logging.Formatter):
+    """Formats access records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {"ts": round(record.created, 6), "level": record.levelname}
+        entry.update(getattr(record, "access", {}))
+        return json.dumps(entry, separators=(",", ":"))
+
+
+class AccessQueueHandler(QueueHandler):
+    """
+    Hands records to the listener thread without formatting them.
+    Records are dropped (and counted) when the queue is full, so logging
+    never blocks the event loop.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_access_handler: Optional[AccessQueueHandler] = None
+_access_listener: Optional[QueueListener] = None
+
+
+def start_access_log(stream=None):
+    """Start writing access records as JSON lines (stderr by default)."""
+    global _access_handler, _access_listener
+    if _access_listener is not None:
+        return
+    log_queue: queue.Queue = queue.Queue(ACCESS_QUEUE_SIZE)
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JSONFormatter())
+    _access_handler = AccessQueueHandler(log_queue)
+    _access_listener = QueueListener(log_queue, output)
+    access_logger.addHandler(_access_handler)
+    access_logger.setLevel(logging.INFO)
+    _access_listener.start()
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware to log API requests and responses."""
 
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
+def stop_access_log():
+    """Flush pending access records and stop the listener thread."""
+    global _access_handler, _access_listener
+    if _access_listener is None:
+        return
+    access_logger.removeHandler(_access_handler)
+    _access_listener.stop()
+    _access_handler = _access_listener = None
 
-        # Log request
-        logger.info(f"Request: {request.method} {request.url}")
 
-        # Process request
-        response = await call_next(request)
+class AccessLogMiddleware:
+    """
+    Pure ASGI middleware that times requests and logs structured access records.
+
+    Adds the X-Process-Time header (seconds until the response started) and
+    logs method, path, status and duration once the response is complete.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter_ns()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                process_time = (time.perf_counter_ns() - start) / 1e9
+                headers = list(message.get("headers", []))
+                headers.append((b"x-process-time", str(process_time).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            get_metrics().inc(
+                "orchestra_http_requests_total",
+                method=scope["method"],
+                status=str(status),
+            )
+            if access_logger.handlers:
+                duration_ms = (time.perf_counter_ns() - start) / 1e6
+                access_logger.info(
+                    "access",
+                    extra={
+                        "access": {
+                            "method": scope["method"],
+                            "path": scope["path"],
+                            "status": status,
+                            "duration_ms": round(duration_ms, 3),
+                            "client": (
+                                scope["client"][0] if scope.get("client") else None
+                            ),
+                        }
+                    },
+                )
+
+
+class ProfilingMiddleware:
+    """
+    Profiles requests that ask for it (X-Debug-Profile header or
+    ?debug_profile=1) when profiling is enabled, and returns the profile id in
+    the X-Profile-Id header. Other requests pass straight through.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not profiling_requested(scope):
+            await self.app(scope, receive, send)
+            return
+        store = get_profile_store()
+        if store is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile = store.start(scope["method"], scope["path"])
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", profile.id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = activate_profile(profile)
+        try:
+            with profile.segment("request"):
+                await self.app(scope, receive, send_with_profile_id)
+        finally:
+            deactivate_profile(token)
+            profile.release()
+
+
+def admission_response(exc: AdmissionRejected) -> JSONResponse:
+    """429/503 response for a request refused by admission control."""
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.detail},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
 
-        # Calculate processing time
-        process_time = time.time() - start_time
+class AdmissionMiddleware:
+    """
+    Rate-limits requests that trigger work (anything but GET, HEAD and
+    OPTIONS) per client IP and globally, answering 429 with Retry-After
+    before the request reaches a route. Lane depth and dispatch limits are
+    checked where the work is queued.
+    """
 
-        # Log response
-        logger.info(
-            f"Response: {response.status_code} | "
-            f"Processing time: {process_time:.4f}s"
-        )
+    EXEMPT_METHODS = ("GET", "HEAD", "OPTIONS")
 
-        # Add processing time header
-        response.headers["X-Process-Time"] = str(process_time)
+    def __init__(self, app):
+        self.app = app
 
-        return response
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in self.EXEMPT_METHODS:
+            await self.app(scope, receive, send)
+            return
+        client = scope["client"][0] if scope.get("client") else "unknown"
+        try:
+            get_admission_controller().admit(client)
+        except AdmissionRejected as e:
+            await admission_response(e)(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
 
 
 def setup_cors_middleware(app):
     """Setup CORS middleware for the FastAPI app."""
 
+    # Admission control sits inside CORS so rejections carry CORS headers
+    app.add_middleware(AdmissionMiddleware)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=[
@@ -55,5 +236,6 @@ def setup_cors_middleware(app):
         allow_headers=["*"],
     )
 
-    # Add logging middleware
-    app.add_middleware(LoggingMiddleware)
+    # Add profiling and access log middleware (access log outermost)
+    app.add_middleware(ProfilingMiddleware)
+    app.add_middleware(AccessLogMiddleware)
@@ -1,9 +1,11 @@
 """Pydantic models for API request and response schemas."""
 
-from pydantic import BaseModel
-from typing import Optional, Literal
+from pydantic import BaseModel, Field
+from typing import Annotated, List, Optional, Literal, Union
 from datetime import datetime
 
+MAX_BATCH_ITEMS = 50
+
 
 class AutomationResponse(BaseModel):
     """Standard response model for automation triggers."""
@@ -12,6 +14,7 @@ class AutomationResponse(BaseModel):
     message: str
     timestamp: datetime
     automation_type: str
+    job_id: Optional[str] = None  # Set when the automation runs as a tracked job
 
 
 class WorkoutRequest(BaseModel):
@@ -32,6 +35,7 @@ class StudioModeRequest(BaseModel):
     """Request model for FL Studio automation."""
 
     action: Literal["open_session", "switch_audio", "open_project"] = "open_session"
+    dry_run: bool = False  # Simulate input and time instead of driving the GUI
 
 
 class VoiceCommandRequest(BaseModel):
@@ -41,6 +45,105 @@ class VoiceCommandRequest(BaseModel):
     use_agent: bool = False
 
 
+class BatchWorkoutItem(WorkoutRequest):
+    kind: Literal["workout"]
+
+
+class BatchDailyNoteItem(DailyNoteRequest):
+    kind: Literal["daily_note"]
+
+
+class BatchStudioItem(StudioModeRequest):
+    kind: Literal["studio"]
+
+
+BatchItem = Annotated[
+    Union[BatchWorkoutItem, BatchDailyNoteItem, BatchStudioItem],
+    Field(discriminator="kind"),
+]
+
+
+class BatchRequest(BaseModel):
+    """Request model for running several automations in one call."""
+
+    items: List[BatchItem] = Field(min_length=1, max_length=MAX_BATCH_ITEMS)
+    wait: bool = True  # Wait for each automation to finish, not just be queued
+    stream: bool = False  # Stream results as NDJSON lines as they complete
+
+
+class BatchItemResult(BaseModel):
+    """Outcome of one batch item."""
+
+    index: int  # Position of the item in the request
+    automation_type: str
+    status: Literal["queued", "succeeded", "failed", "cancelled"]
+    success: bool
+    message: str
+    job_id: Optional[str] = None
+    duration: Optional[float] = None  # Seconds from scheduling to outcome
+
+
+class BatchResponse(BaseModel):
+    """Response model for a batch of automations."""
+
+    success: bool  # True if every item succeeded (or was queued)
+    timestamp: datetime
+    results: List[BatchItemResult]
+
+
+class VoiceAudioCommand(BaseModel):
+    """One utterance of an audio upload and what was done with it."""
+
+    text: str  # Transcript
+    start: float  # Seconds into the audio
+    end: float
+    status: Literal["queued", "completed", "unrecognized", "rejected", "failed"]
+    message: str
+    action: Optional[str] = None
+    job_id: Optional[str] = None  # Set when the automation was queued
+
+
+class VoiceAudioResponse(BaseModel):
+    """Response model for audio uploads."""
+
+    success: bool  # True if every utterance was queued or completed
+    timestamp: datetime
+    commands: List[VoiceAudioCommand]
+    audio_seconds: float
+    bytes_received: int
+    spooled_to_disk: bool  # The upload outgrew the in-memory spool
+    memory_peak_bytes: int  # Upload data held in memory at most
+
+
+class WsCommandMessage(BaseModel):
+    """Command sent by a client over the /ws command channel."""
+
+    type: Literal["command"] = "command"
+    id: str  # Echoed on every reply for this command
+    command: str
+    use_agent: bool = False
+
+
+class WsPartialMessage(BaseModel):
+    """Partial transcript of a command still being spoken, sent over /ws."""
+
+    type: Literal["partial"]
+    id: str  # The id the final command message will carry
+    text: str
+
+
+class GuiJobResponse(BaseModel):
+    """Status of a GUI worker job."""
+
+    job_id: str
+    action: str
+    status: Literal["queued", "running", "succeeded", "failed", "cancelled"]
+    message: str
+    submitted_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+
 class HealthCheckResponse(BaseModel):
     """Health check response model."""
 
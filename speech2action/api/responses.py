@@ -0,0 +1,79 @@
+"""
+Precomputed responses for read-only endpoints.
+
+Bodies that only change on deploy (the landing page, API info and the
+automation catalogue) are encoded once at import and served as bytes with an
+ETag, so clients that send If-None-Match get an empty 304.
+
+JSON is encoded with orjson when it is installed, falling back to the
+standard library.
+"""
+
+import hashlib
+import json
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+DEFAULT_CACHE_CONTROL = "public, max-age=300"
+
+
+def _default(value: Any):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode content as compact JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(
+        content, default=_default, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class PrecomputedResponse:
+    """A response body encoded once and served with ETag revalidation."""
+
+    def __init__(
+        self,
+        body: bytes,
+        media_type: str,
+        cache_control: str = DEFAULT_CACHE_CONTROL,
+    ):
+        self.body = body
+        self.media_type = media_type
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        self.headers: Dict[str, str] = {
+            "ETag": self.etag,
+            "Cache-Control": cache_control,
+        }
+
+    @classmethod
+    def json(cls, content: Any, **kwargs) -> "PrecomputedResponse":
+        return cls(dumps(content), "application/json", **kwargs)
+
+    @classmethod
+    def html(cls, content: str, **kwargs) -> "PrecomputedResponse":
+        return cls(content.encode("utf-8"), "text/html; charset=utf-8", **kwargs)
+
+    def not_modified(self, if_none_match: Optional[str]) -> bool:
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        tags = (tag.strip() for tag in if_none_match.split(","))
+        return any(tag.removeprefix("W/") == self.etag for tag in tags)
+
+    def respond(self, request: Request) -> Response:
+        """Full response, or 304 if the client already has this body."""
+        if self.not_modified(request.headers.get("if-none-match")):
+            return Response(status_code=304, headers=self.headers)
+        return Response(self.body, media_type=self.media_type, headers=self.headers)
@@ -1,11 +1,16 @@
 """FastAPI routes for automation triggers."""
 
+import asyncio
 import logging
+import time
+from collections import Counter
+from concurrent.futures import Future
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple, Union
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
 from .models import (
     AutomationResponse,
@@ -14,24 +19,29 @@ from .models import (
     StudioModeRequest,
     VoiceCommandRequest,
     HealthCheckResponse,
+    GuiJobResponse,
+    BatchRequest,
+    BatchResponse,
+    BatchItem,
+    BatchItemResult,
 )
+from .dependencies import get_profile
+from .responses import PrecomputedResponse
 
 # Import automation functions
-from speech2action.actions.obsidian_automation import (
-    create_gym_dir,
-    create_today_running_note,
-    create_today_cycling_note,
-    create_today_mobility_note,
-    create_daily_note,
-    create_tomorrow_note,
-)
-from speech2action.actions.flstudio_automation import (
-    open_drum_session,
-    launch_fl_studio,
-    switch_audio_device,
+from speech2action.actions.flstudio_automation import STUDIO_ACTIONS, dry_run
+from speech2action.actions.registry import (
+    ACTION_REGISTRY,
+    action_lane,
+    check_capacity,
+    submit_action,
 )
+from speech2action.config.profiles import Profile
+from speech2action.core.admission import get_admission_controller
 from speech2action.core.command_parser import parse_command
+from speech2action.core.readiness import get_readiness_monitor
 from speech2action.core.action_dispatcher import dispatch_action
+from speech2action.gui.worker import GuiJob, get_gui_worker
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -40,9 +50,23 @@ logger = logging.getLogger(__name__)
 # Create router
 router = APIRouter()
 
+# Map workout types to registry actions
+WORKOUT_ACTIONS = {
+    "running": "create_today_running_note",
+    "cycling": "create_today_cycling_note",
+    "mobility": "create_today_mobility_note",
+    "gym": "create_gym_dir",
+}
+
+# Map note types to registry actions
+NOTE_ACTIONS = {
+    "today": "create_daily_note",
+    "tomorrow": "create_tomorrow_note",
+}
+
 
 def create_automation_response(
-    success: bool, message: str, automation_type: str
+    success: bool, message: str, automation_type: str, job_id: str = None
 ) -> AutomationResponse:
     """Helper function to create standardized automation responses."""
     return AutomationResponse(
@@ -50,6 +74,16 @@ def create_automation_response(
         message=message,
         timestamp=datetime.now(),
         automation_type=automation_type,
+        job_id=job_id,
+    )
+
+
+def dry_run_message(action: str, report: Dict[str, Any]) -> str:
+    return (
+        f"FL Studio {action.replace('_', ' ')} dry run completed: "
+        f"{report['total']:.2f}s simulated "
+        f"(input {report['input']:.2f}s, wait {report['wait']:.2f}s, "
+        f"{report['events']} events)"
     )
 
 
@@ -86,111 +120,265 @@ async def health_check():
     )
 
 
+@router.get("/ready", responses={503: {"description": "A dependency probe failed"}})
+async def readiness_check():
+    """
+    Readiness of the vaults, profiles, agent, lanes and GUI worker, from the
+    last background check (503 if a probe failed).
+    """
+    ready, body = get_readiness_monitor().current()
+    return Response(
+        body,
+        status_code=200 if ready else 503,
+        media_type="application/json",
+        headers={"Cache-Control": "no-store"},
+    )
+
+
 @router.post("/workout", response_model=AutomationResponse)
 async def trigger_workout_automation(
-    request: WorkoutRequest, background_tasks: BackgroundTasks
+    request: WorkoutRequest, profile: Profile = Depends(get_profile)
 ):
     """Trigger workout-related Obsidian automations."""
 
     workout_type = request.workout_type.lower()
 
-    # Map workout types to automation functions
-    workout_functions = {
-        "running": create_today_running_note,
-        "cycling": create_today_cycling_note,
-        "mobility": create_today_mobility_note,
-        "gym": create_gym_dir,
-    }
-
-    if workout_type not in workout_functions:
+    if workout_type not in WORKOUT_ACTIONS:
         raise HTTPException(
             status_code=400, detail=f"Invalid workout type: {workout_type}"
         )
 
-    automation_func = workout_functions[workout_type]
-
-    # Execute automation in background for better responsiveness
-    background_tasks.add_task(automation_func)
+    # Execute automation on the profile's vault lane for better responsiveness
+    future = submit_action(WORKOUT_ACTIONS[workout_type], profile)
 
     return create_automation_response(
         success=True,
         message=f"{workout_type.title()} automation triggered successfully",
         automation_type=f"workout_{workout_type}",
+        job_id=future.job_id,
     )
 
 
 @router.post("/daily-note", response_model=AutomationResponse)
 async def trigger_daily_note_automation(
-    request: DailyNoteRequest, background_tasks: BackgroundTasks
+    request: DailyNoteRequest, profile: Profile = Depends(get_profile)
 ):
     """Trigger daily note creation in Obsidian."""
 
     note_type = request.note_type.lower()
 
-    # Map note types to automation functions
-    note_functions = {
-        "today": create_daily_note,
-        "tomorrow": create_tomorrow_note,
-    }
-
-    if note_type not in note_functions:
+    if note_type not in NOTE_ACTIONS:
         raise HTTPException(status_code=400, detail=f"Invalid note type: {note_type}")
 
-    automation_func = note_functions[note_type]
-
-    # Execute automation in background
-    background_tasks.add_task(automation_func)
+    # Execute automation on the profile's vault lane
+    future = submit_action(NOTE_ACTIONS[note_type], profile)
 
     return create_automation_response(
         success=True,
         message=f"{note_type.title()} note automation triggered successfully",
         automation_type=f"daily_note_{note_type}",
+        job_id=future.job_id,
     )
 
 
 @router.post("/studio", response_model=AutomationResponse)
-async def trigger_studio_automation(
-    request: StudioModeRequest, background_tasks: BackgroundTasks
-):
+async def trigger_studio_automation(request: StudioModeRequest):
     """Trigger FL Studio automation."""
 
     action = request.action.lower()
 
-    # Map actions to automation functions
-    studio_functions = {
-        "open_session": open_drum_session,
-        "switch_audio": switch_audio_device,
-        "open_project": launch_fl_studio,
-    }
-
-    if action not in studio_functions:
+    if action not in STUDIO_ACTIONS:
         raise HTTPException(status_code=400, detail=f"Invalid studio action: {action}")
 
-    automation_func = studio_functions[action]
+    if request.dry_run:
+        # Simulated run: no GUI input, returns the macro's simulated cost
+        report = await run_in_threadpool(dry_run, STUDIO_ACTIONS[action])
+        return create_automation_response(
+            success=True,
+            message=dry_run_message(action, report),
+            automation_type=f"studio_{action}",
+        )
 
-    # Execute automation in background
-    background_tasks.add_task(automation_func)
+    # Execute automation in the out-of-process GUI worker. With several API
+    # workers the GUI queue is an SQLite table, so keep it off the event loop
+    await run_in_threadpool(check_capacity, {"gui": 1})
+    job = await run_in_threadpool(get_gui_worker().submit, action)
 
     return create_automation_response(
         success=True,
         message=f"FL Studio {action.replace('_', ' ')} automation triggered successfully",
         automation_type=f"studio_{action}",
+        job_id=job.job_id,
+    )
+
+
+@router.get("/studio/jobs/{job_id}", response_model=GuiJobResponse)
+async def get_studio_job(job_id: str):
+    """Get the status of a studio automation job."""
+    job = await run_in_threadpool(get_gui_worker().get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job.to_dict()
+
+
+@router.delete("/studio/jobs/{job_id}", response_model=GuiJobResponse)
+async def cancel_studio_job(job_id: str):
+    """Cancel a queued or running studio automation job."""
+    worker = get_gui_worker()
+    job = await run_in_threadpool(worker.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    if not await run_in_threadpool(worker.cancel, job_id):
+        raise HTTPException(status_code=409, detail=f"Job {job_id} already finished")
+    return job.to_dict()
+
+
+# A scheduled batch item: (automation type, job id, pending outcome)
+ScheduledItem = Tuple[str, Optional[str], Union[Future, str]]
+
+
+def batch_action(item: BatchItem) -> Tuple[str, str]:
+    """(automation type, registry action) of a workout or daily-note item."""
+    if item.kind == "workout":
+        return f"workout_{item.workout_type}", WORKOUT_ACTIONS[item.workout_type]
+    return f"daily_note_{item.note_type}", NOTE_ACTIONS[item.note_type]
+
+
+def schedule_batch(items: List[BatchItem], profile: Profile) -> List[ScheduledItem]:
+    """
+    Queue every batch item in request order: vault automations on their
+    profile's vault lane and studio actions in the GUI worker, so items that
+    share a vault or the GUI run one after another in the order given.
+    Dry runs are returned as their studio action, to be simulated by the caller.
+
+    Raises AdmissionRejected, before anything is queued, if a lane has no
+    room for its share of the batch.
+    """
+    jobs = Counter()
+    for item in items:
+        if item.kind != "studio":
+            jobs[action_lane(batch_action(item)[1], profile)] += 1
+        elif not item.dry_run:
+            jobs["gui"] += 1
+    check_capacity(jobs)
+
+    scheduled = []
+    for item in items:
+        if item.kind == "studio":
+            automation_type = f"studio_{item.action}"
+            if item.dry_run:
+                scheduled.append((automation_type, None, item.action))
+                continue
+            job = get_gui_worker().submit(item.action)
+            scheduled.append((automation_type, job.job_id, job.future))
+            continue
+        automation_type, action = batch_action(item)
+        future = submit_action(action, profile)
+        scheduled.append((automation_type, future.job_id, future))
+    return scheduled
+
+
+async def batch_item_result(
+    index: int, scheduled: ScheduledItem, wait: bool, started: float
+) -> BatchItemResult:
+    """Await one scheduled item (unless only queuing) and describe its outcome."""
+    automation_type, job_id, pending = scheduled
+    if not wait and job_id is not None:
+        return BatchItemResult(
+            index=index,
+            automation_type=automation_type,
+            status="queued",
+            success=True,
+            message=f"{automation_type} queued",
+            job_id=job_id,
+        )
+    try:
+        if isinstance(pending, str):
+            report = await run_in_threadpool(dry_run, STUDIO_ACTIONS[pending])
+            status, message = "succeeded", dry_run_message(pending, report)
+        else:
+            result = await asyncio.wrap_future(pending)
+            status, message = "succeeded", f"{automation_type} completed"
+            if isinstance(result, GuiJob):
+                status, message = result.status, result.message
+    except Exception as e:
+        logger.error(f"Batch item {index} ({automation_type}) failed: {str(e)}")
+        status, message = "failed", f"{automation_type} failed: {str(e)}"
+    return BatchItemResult(
+        index=index,
+        automation_type=automation_type,
+        status=status,
+        success=status == "succeeded",
+        message=message,
+        job_id=job_id,
+        duration=round(time.perf_counter() - started, 6),
+    )
+
+
+@router.post("/batch", response_model=BatchResponse)
+async def run_batch(request: BatchRequest, profile: Profile = Depends(get_profile)):
+    """
+    Run several workout, daily-note and studio automations in one request.
+
+    The whole batch is validated before anything runs. Items run concurrently
+    where their resources allow; results come back in request order, or as
+    NDJSON lines in completion order with `stream: true`.
+    """
+    started = time.perf_counter()
+    scheduled = await run_in_threadpool(schedule_batch, request.items, profile)
+    outcomes = [
+        batch_item_result(index, item, request.wait, started)
+        for index, item in enumerate(scheduled)
+    ]
+
+    if request.stream:
+
+        async def stream_results():
+            for outcome in asyncio.as_completed(outcomes):
+                result = await outcome
+                yield result.model_dump_json().encode("utf-8") + b"\n"
+
+        return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+    results = await asyncio.gather(*outcomes)
+    return BatchResponse(
+        success=all(r.success or r.status == "queued" for r in results),
+        timestamp=datetime.now(),
+        results=results,
     )
 
 
+def dispatch_in_slot(command, use_agent: bool, settings: Profile):
+    """Run dispatch_action, then free the dispatch slot reserved for it."""
+    try:
+        dispatch_action(command, use_agent=use_agent, settings=settings)
+    finally:
+        get_admission_controller().release_dispatch()
+
+
 @router.post("/voice-command", response_model=AutomationResponse)
 async def process_voice_command(
-    request: VoiceCommandRequest, background_tasks: BackgroundTasks
+    request: VoiceCommandRequest,
+    background_tasks: BackgroundTasks,
+    profile: Profile = Depends(get_profile),
 ):
     """Process voice commands through the existing speech2action system."""
 
+    # Reserve a dispatch slot (503 when too many commands are in progress);
+    # the background task frees it once the command has been handled
+    admission = get_admission_controller()
+    admission.acquire_dispatch()
+    queued = False
     try:
         if request.use_agent:
             # For agent mode, pass the raw command text directly
-            background_tasks.add_task(dispatch_action, request.command, use_agent=True)
+            background_tasks.add_task(
+                dispatch_in_slot, request.command, use_agent=True, settings=profile
+            )
+            queued = True
         else:
             # For traditional mode, parse the command first
-            parsed_command = parse_command(request.command)
+            parsed_command = parse_command(request.command, profile)
 
             if not parsed_command:
                 raise HTTPException(
@@ -198,7 +386,10 @@ async def process_voice_command(
                 )
 
             # Dispatch action using existing dispatcher
-            background_tasks.add_task(dispatch_action, parsed_command, use_agent=False)
+            background_tasks.add_task(
+                dispatch_in_slot, parsed_command, use_agent=False, settings=profile
+            )
+            queued = True
 
         return create_automation_response(
             success=True,
@@ -207,44 +398,66 @@ async def process_voice_command(
         )
 
     except Exception as e:
+        if not queued:
+            admission.release_dispatch()
         logger.error(f"Error processing voice command: {str(e)}")
         raise HTTPException(
             status_code=500, detail=f"Failed to process voice command: {str(e)}"
         )
 
 
-@router.get("/automations")
-async def list_available_automations():
-    """List all available automation endpoints and their descriptions."""
+def build_automations_catalog() -> Dict[str, Any]:
+    """Describe the automation endpoints from the action maps and registry."""
 
     automations = {
         "workout_automations": {
             "endpoint": "/workout",
             "method": "POST",
             "description": "Trigger workout-related Obsidian note automations",
-            "supported_types": ["running", "cycling", "mobility", "gym"],
+            "supported_types": list(WORKOUT_ACTIONS),
             "example": {"workout_type": "running", "date": "2024-01-15"},  # Optional
         },
         "daily_note_automations": {
             "endpoint": "/daily-note",
             "method": "POST",
             "description": "Create daily notes in Obsidian vault",
-            "supported_types": ["today", "tomorrow"],
+            "supported_types": list(NOTE_ACTIONS),
             "example": {"note_type": "today", "date": "2024-01-15"},  # Optional
         },
         "studio_automations": {
             "endpoint": "/studio",
             "method": "POST",
             "description": "Trigger FL Studio automation workflows",
-            "supported_actions": ["open_session", "switch_audio", "open_project"],
+            "supported_actions": list(STUDIO_ACTIONS),
             "example": {"action": "open_session"},
         },
+        "batch": {
+            "endpoint": "/batch",
+            "method": "POST",
+            "description": "Run several workout, daily-note and studio automations",
+            "supported_kinds": ["workout", "daily_note", "studio"],
+            "example": {
+                "items": [
+                    {"kind": "workout", "workout_type": "gym"},
+                    {"kind": "daily_note", "note_type": "today"},
+                    {"kind": "studio", "action": "open_session"},
+                ]
+            },
+        },
         "voice_commands": {
             "endpoint": "/voice-command",
             "method": "POST",
             "description": "Process natural language voice commands",
+            "supported_actions": list(ACTION_REGISTRY),
             "example": {"command": "create gym note", "use_agent": False},
         },
+        "voice_audio": {
+            "endpoint": "/voice-audio",
+            "method": "POST",
+            "description": "Transcribe a WAV or raw PCM recording and run its commands",
+            "content_types": ["audio/wav", "audio/pcm", "multipart/form-data"],
+            "supported_actions": list(ACTION_REGISTRY),
+        },
     }
 
     return {
@@ -252,3 +465,13 @@ async def list_available_automations():
         "timestamp": datetime.now(),
         "total_endpoints": len(automations),
     }
+
+
+# Built once at startup; the timestamp is when the catalogue was generated
+AUTOMATIONS_CATALOG = PrecomputedResponse.json(build_automations_catalog())
+
+
+@router.get("/automations")
+async def list_available_automations(request: Request):
+    """List all available automation endpoints and their descriptions."""
+    return AUTOMATIONS_CATALOG.respond(request)
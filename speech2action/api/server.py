@@ -0,0 +1,97 @@
+"""
+Server profiles for running the API with uvicorn.
+
+- development (default): one process with auto-reload
+- production: no reload, uvloop and httptools where available, and one worker
+  process per CPU. With
+  more than one worker, state that must be shared between them (the GUI job
+  queue, progress events, lane locks and metrics) lives in
+  ORCHESTRA_STATE_DIR, a fresh temporary directory unless set.
+
+Both log requests through the JSON access log middleware, so uvicorn's own
+access log is off.
+"""
+
+import argparse
+import importlib.util
+import os
+import tempfile
+from typing import List, Optional
+
+import uvicorn
+
+APP = "speech2action.api.main:app"
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def _available(module: str, implementation: str) -> str:
+    """The implementation if its module is installed (uvloop has no Windows build)."""
+    return implementation if importlib.util.find_spec(module) else "auto"
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the Command Orchestra API.")
+    parser.add_argument(
+        "--production",
+        action="store_true",
+        help="no reload, uvloop/httptools, several worker processes",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help=f"production worker processes (default: CPU count, {default_workers()})",
+    )
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    return parser.parse_args(argv)
+
+
+def prepare_shared_state(workers: int, port: int):
+    """Tell the workers how many they are and give them an empty state directory."""
+    from dotenv import load_dotenv
+
+    from speech2action.core.shared_state import SharedState
+
+    load_dotenv()  # so a state directory set in .env is the one reset here
+    os.environ["ORCHESTRA_WORKERS"] = str(workers)
+    if workers > 1:
+        directory = os.environ.setdefault(
+            "ORCHESTRA_STATE_DIR",
+            os.path.join(tempfile.gettempdir(), f"orchestra-state-{port}"),
+        )
+        SharedState(directory).reset()
+
+
+def serve(
+    production: bool = False,
+    workers: Optional[int] = None,
+    host: str = "0.0.0.0",
+    port: int = 8000,
+):
+    """Run the API in the development or production profile."""
+    if not production:
+        uvicorn.run(
+            APP, host=host, port=port, reload=True, log_level="info", access_log=False
+        )
+        return
+    workers = workers or default_workers()
+    prepare_shared_state(workers, port)
+    uvicorn.run(
+        APP,
+        host=host,
+        port=port,
+        workers=workers,
+        loop=_available("uvloop", "uvloop"),
+        http=_available("httptools", "httptools"),
+        reload=False,
+        log_level="info",
+        access_log=False,
+    )
+
+
+def main(argv: Optional[List[str]] = None):
+    serve(**vars(parse_args(argv)))
@@ -0,0 +1,311 @@
+"""
+Spoken commands as audio uploads.
+
+POST /api/v1/voice-audio takes a recording instead of a transcript: a WAV
+file or raw 16-bit mono PCM (?sample_rate=, default
+ORCHESTRA_AUDIO_SAMPLE_RATE) as the request body, or as the file field of a
+multipart form. The body is read chunk by chunk as it arrives, including
+chunked transfer encoding, and goes through the audio pipeline (VAD and the
+ORCHESTRA_ASR_BACKEND backend) while it is still uploading; see
+audio/upload.py. Each utterance is parsed and dispatched like a
+/voice-command, and the response lists them with their job ids.
+
+Each upload is transcribed on a thread of its own pool, sized by
+ORCHESTRA_MAX_AUDIO_UPLOADS, rather than on the shared threadpool that sync
+endpoints and dependencies run on: an upload holds its thread for as long as
+the client takes to send it. When every thread is busy the upload is refused
+with 503 before its body is read.
+
+Multipart bodies are parsed incrementally with python-multipart's streaming
+parser rather than request.form(), which would spool the whole file before
+the handler sees any of it.
+"""
+
+import asyncio
+import contextvars
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+
+try:
+    import python_multipart as multipart
+    from python_multipart.exceptions import MultipartParseError
+    from python_multipart.multipart import parse_options_header
+except ModuleNotFoundError:  # python-multipart < 0.0.13
+    import multipart
+    from multipart.exceptions import MultipartParseError
+    from multipart.multipart import parse_options_header
+
+from .dependencies import get_profile
+from .models import VoiceAudioCommand, VoiceAudioResponse
+from speech2action.actions.manager_agent import process_command
+from speech2action.actions.registry import ACTION_REGISTRY, submit_action
+from speech2action.audio.asr import get_asr_backend
+from speech2action.audio.pipeline import Utterance
+from speech2action.audio.upload import AudioUpload, UploadError, UploadTooLarge
+from speech2action.config.profiles import Profile
+from speech2action.config.settings import get_settings
+from speech2action.core.admission import (
+    SATURATED_RETRY_AFTER,
+    SHED_METRIC,
+    AdmissionRejected,
+)
+from speech2action.core.command_parser import parse_command
+from speech2action.core.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+AUDIO_TYPES = {
+    "audio/wav",
+    "audio/wave",
+    "audio/x-wav",
+    "audio/vnd.wave",
+    "audio/pcm",
+    "application/octet-stream",
+}
+
+
+class UploadWorkers:
+    """A fixed pool of transcription threads that refuses work when all are busy."""
+
+    def __init__(self, size: int):
+        self.size = max(1, size)
+        self.busy = 0
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.size, thread_name_prefix="audio-upload"
+        )
+        self._lock = threading.Lock()
+
+    def run(self, func: Callable) -> "asyncio.Future":
+        """Start func on a free thread, or raise AdmissionRejected (503)."""
+        with self._lock:
+            if self.busy >= self.size:
+                get_metrics().inc(SHED_METRIC, reason="uploads_full")
+                raise AdmissionRejected(
+                    503,
+                    "uploads_full",
+                    "Too many audio uploads in progress",
+                    SATURATED_RETRY_AFTER,
+                )
+            self.busy += 1
+        context = contextvars.copy_context()
+        future = self._pool.submit(context.run, func)
+        future.add_done_callback(self._release)
+        return asyncio.wrap_future(future)
+
+    def _release(self, _):
+        with self._lock:
+            self.busy -= 1
+
+
+# Singleton pattern for the upload workers
+_upload_workers: Optional[UploadWorkers] = None
+
+
+def get_upload_workers() -> UploadWorkers:
+    global _upload_workers
+    if _upload_workers is None:
+        _upload_workers = UploadWorkers(get_settings().ORCHESTRA_MAX_AUDIO_UPLOADS)
+    return _upload_workers
+
+
+def dispatch_utterance(
+    utterance: Utterance, use_agent: bool, profile: Profile
+) -> Optional[VoiceAudioCommand]:
+    """Parse and dispatch one transcribed utterance (on the upload's worker thread)."""
+    text = utterance.text.strip()
+    if not text:
+        return None
+    span = {
+        "text": text,
+        "start": round(utterance.start, 3),
+        "end": round(utterance.end, 3),
+    }
+    try:
+        if use_agent:
+            # The agent runs the automation itself
+            result = process_command(text, profile)
+            return VoiceAudioCommand(
+                **span,
+                status="completed" if result.get("success") else "failed",
+                action=result.get("action"),
+                message=result.get("message", ""),
+            )
+        parsed = parse_command(text, profile)
+        if not parsed:
+            return VoiceAudioCommand(
+                **span,
+                status="unrecognized",
+                message="Could not parse the voice command",
+            )
+        action = parsed.get("action")
+        if "result" in parsed:
+            # The agent already ran the automation while parsing
+            result = parsed["result"]
+            return VoiceAudioCommand(
+                **span,
+                status="completed" if result.get("success") else "failed",
+                action=action,
+                message=result.get("message", ""),
+            )
+        if action not in ACTION_REGISTRY:
+            return VoiceAudioCommand(
+                **span,
+                status="unrecognized",
+                action=action,
+                message=f"No automation implemented for action: {action}",
+            )
+        future = submit_action(action, profile)
+        return VoiceAudioCommand(
+            **span,
+            status="queued",
+            action=action,
+            job_id=future.job_id,
+            message=f"{action} queued",
+        )
+    except AdmissionRejected as e:
+        return VoiceAudioCommand(**span, status="rejected", message=e.detail)
+    except Exception as e:
+        logger.error(f"Error dispatching '{text}': {str(e)}")
+        return VoiceAudioCommand(
+            **span,
+            status="failed",
+            message=f"Failed to process voice command: {str(e)}",
+        )
+
+
+async def read_multipart(request: Request, boundary: bytes, upload: AudioUpload):
+    """Feed the first file field of a multipart body to upload as it arrives."""
+    part = {"headers": {}, "field": b"", "value": b"", "audio": False}
+    found = []
+
+    def on_part_begin():
+        part.update(headers={}, field=b"", value=b"", audio=False)
+
+    def on_header_field(data: bytes, start: int, end: int):
+        part["field"] += data[start:end]
+
+    def on_header_value(data: bytes, start: int, end: int):
+        part["value"] += data[start:end]
+
+    def on_header_end():
+        part["headers"][part["field"].lower()] = part["value"]
+        part["field"] = part["value"] = b""
+
+    def on_headers_finished():
+        disposition = part["headers"].get(b"content-disposition", b"")
+        _, options = parse_options_header(disposition)
+        part["audio"] = b"filename" in options and not found
+        if part["audio"]:
+            found.append(options[b"filename"])
+
+    def on_part_data(data: bytes, start: int, end: int):
+        if part["audio"]:
+            upload.feed(data[start:end])
+
+    parser = multipart.MultipartParser(
+        boundary,
+        {
+            "on_part_begin": on_part_begin,
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_header_end": on_header_end,
+            "on_headers_finished": on_headers_finished,
+            "on_part_data": on_part_data,
+        },
+    )
+    async for chunk in request.stream():
+        parser.write(chunk)
+    parser.finalize()
+    if not found:
+        raise UploadError("No audio file in the form")
+
+
+@router.post(
+    "/voice-audio",
+    response_model=VoiceAudioResponse,
+    responses={
+        400: {"description": "Unreadable audio"},
+        413: {"description": "Upload too large"},
+        415: {"description": "Unsupported content type"},
+        503: {"description": "Too many uploads in progress"},
+    },
+)
+async def process_voice_audio(
+    request: Request,
+    use_agent: bool = False,
+    sample_rate: Optional[int] = Query(None, ge=1000, description="Raw PCM only"),
+    profile: Profile = Depends(get_profile),
+):
+    """Transcribe an uploaded recording and dispatch the commands spoken in it."""
+    media_type, params = parse_options_header(request.headers.get("content-type", ""))
+    media_type = media_type.decode("latin-1").lower()
+    is_form = media_type == "multipart/form-data"
+    if not is_form and media_type not in AUDIO_TYPES:
+        raise HTTPException(
+            status_code=415,
+            detail="Send a WAV file, raw 16-bit PCM or a multipart form with a file",
+        )
+
+    settings = get_settings()
+    commands: List[VoiceAudioCommand] = []
+
+    def on_utterance(utterance: Utterance):
+        command = dispatch_utterance(utterance, use_agent, profile)
+        if command is not None:
+            commands.append(command)
+
+    upload = AudioUpload(
+        get_asr_backend(settings.ORCHESTRA_ASR_BACKEND),
+        sample_rate or settings.ORCHESTRA_AUDIO_SAMPLE_RATE,
+        on_utterance,
+        size_hint=int(request.headers.get("content-length") or 0),
+        max_bytes=settings.ORCHESTRA_MAX_AUDIO_UPLOAD_MB * 1024 * 1024,
+    )
+    # Transcription runs on an upload thread while the body is being received
+    try:
+        worker = get_upload_workers().run(upload.process)
+    except AdmissionRejected:
+        upload.close()
+        raise
+    try:
+        if is_form:
+            await read_multipart(request, params.get(b"boundary", b""), upload)
+        else:
+            async for chunk in request.stream():
+                upload.feed(chunk)
+        upload.finish()
+        await worker
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except (UploadError, MultipartParseError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid audio upload: {str(e)}")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error processing audio upload: {str(e)}")
+        raise HTTPException(
+            status_code=500, detail=f"Failed to process audio upload: {str(e)}"
+        )
+    finally:
+        upload.abort()  # stops the worker early if the upload failed
+        await asyncio.gather(worker, return_exceptions=True)
+        upload.close()
+
+    stats = upload.stats()
+    return VoiceAudioResponse(
+        success=bool(commands)
+        and all(c.status in ("queued", "completed") for c in commands),
+        timestamp=datetime.now(),
+        commands=commands,
+        audio_seconds=stats["audio_seconds"],
+        bytes_received=stats["bytes_received"],
+        spooled_to_disk=stats["spooled_to_disk"],
+        memory_peak_bytes=stats["memory_peak_bytes"],
+    )
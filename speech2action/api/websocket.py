@@ -0,0 +1,388 @@
+"""
+WebSocket command channel for continuous voice sessions.
+
+A client keeps one connection open at /api/v1/ws and streams commands; the
+server answers each with its parse result, a queued notice and the final
+outcome of the automation:
+
+    -> {"type": "command", "id": "c1", "command": "create gym note"}
+    <- {"type": "parsed", "id": "c1", "action": "create_gym_dir"}
+    <- {"type": "queued", "id": "c1", "action": "create_gym_dir", "job_id": "..."}
+    <- {"type": "done", "id": "c1", "success": true, "message": "..."}
+
+    -> {"type": "ping", "id": "p1"}
+    <- {"type": "pong", "id": "p1", "server_time": 1705314600.12}
+
+Every command ends with exactly one "done" or "error" message. Messages are
+JSON text frames; a binary frame is answered with an "error". The job_id
+matches the job's progress events on /api/v1/events.
+
+Early dispatch: while the command is still being spoken, a client with a
+streaming recognizer can send its partial transcripts under the command's id.
+Once a trigger phrase is stable (see core/intent_stream.py) its action is
+claimed early: the command is admitted and its action resolved, but the job
+is held, not started, until the final command confirms the action. Later
+words can still bring a trigger that wins in the final parse ("open the
+studio today" parses to the daily note), and vault writes and GUI clicks
+cannot be taken back, so nothing runs on a guess. If later words change the
+action, the claim is revoked. The final command message adopts a claim
+whose action is the one the final transcript parses to and queues its job
+straight away, without parsing again:
+
+    -> {"type": "partial", "id": "c2", "text": "open the studio"}
+    -> {"type": "partial", "id": "c2", "text": "open the studio and"}
+    -> {"type": "partial", "id": "c2", "text": "open the studio and load"}
+    <- {"type": "early", "id": "c2", "action": "spell_studio", "held": true}
+    -> {"type": "command", "id": "c2", "command": "open the studio and load drums"}
+    <- {"type": "parsed", "id": "c2", "action": "spell_studio"}
+    <- {"type": "queued", "id": "c2", "action": "...", "job_id": "...", "early": true}
+    <- {"type": "done", "id": "c2", "success": true, "message": "..."}
+
+Partial messages get no reply of their own; a revoked claim is reported as
+{"type": "revoked", "id", "action", "job_id": null, "cancelled": true}.
+
+Backpressure: a connection has at most MAX_INFLIGHT commands in flight and the
+server stops reading from the socket until one of them has been answered, so
+a client that sends faster than automations finish (or reads its replies
+slowly) is held back by TCP flow control instead of growing server-side
+queues. Commands also pass admission control like REST requests; a refused
+command gets an "error" with a retry_after in seconds.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, WebSocket
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+
+from .dependencies import get_ws_profile
+from .models import WsCommandMessage, WsPartialMessage
+from speech2action.actions.manager_agent import process_command_async
+from speech2action.actions.registry import ACTION_REGISTRY, submit_action
+from speech2action.config.profiles import Profile
+from speech2action.core.admission import AdmissionRejected, get_admission_controller
+from speech2action.core.command_parser import match_trigger, parse_command
+from speech2action.core.intent_stream import FIRE, StreamingIntentMatcher
+from speech2action.gui.worker import GuiJob
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+MAX_INFLIGHT = 8  # commands per connection awaiting their final message
+MAX_FINISHED_IDS = 64  # command ids remembered to drop late partial transcripts
+
+
+class CommandSession:
+    """One WebSocket connection: reader, sender and in-flight commands."""
+
+    def __init__(self, websocket: WebSocket, profile: Profile, max_inflight: int):
+        self.websocket = websocket
+        self.profile = profile
+        self.client = websocket.client.host if websocket.client else "unknown"
+        self.slots = asyncio.Semaphore(max_inflight)
+        self.outbox: "asyncio.Queue[Any]" = asyncio.Queue()
+        self.tasks = set()
+        self.max_partials = max_inflight  # commands with partial transcripts
+        self.partials: Dict[str, StreamingIntentMatcher] = {}
+        self.early: Dict[str, str] = {}  # id -> action held for the command
+        self.finished: "OrderedDict[str, None]" = OrderedDict()  # recent final ids
+
+    def push(self, message: Dict[str, Any], final: bool = False):
+        """Queue a message; final messages free the command's slot once sent."""
+        self.outbox.put_nowait((message, final))
+
+    async def sender(self):
+        connected = True
+        while True:
+            item = await self.outbox.get()
+            if item is None:
+                return
+            message, final = item
+            try:
+                if connected:
+                    await self.websocket.send_text(json.dumps(message))
+            except Exception as e:
+                # The connection is gone; the receiver sees the disconnect.
+                # Keep freeing slots so it is not stuck waiting for one.
+                connected = False
+                logger.info(f"WebSocket send failed: {str(e)}")
+            finally:
+                if final:
+                    self.slots.release()
+
+    async def receiver(self):
+        while True:
+            await self.slots.acquire()
+            message = await self.websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            text = message.get("text")
+            if text is None:
+                self.push(
+                    {"type": "error", "message": "Send messages as JSON text frames"},
+                    final=True,
+                )
+                continue
+            self.handle(text)
+
+    def handle(self, raw: str):
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            self.push({"type": "error", "message": "Invalid JSON"}, final=True)
+            return
+        if isinstance(data, dict) and data.get("type") == "ping":
+            self.push(
+                {"type": "pong", "id": data.get("id"), "server_time": time.time()},
+                final=True,
+            )
+            return
+        if isinstance(data, dict) and data.get("type") == "partial":
+            self.slots.release()  # no reply of its own
+            self.handle_partial(data)
+            return
+        try:
+            command = WsCommandMessage.model_validate(data)
+        except ValidationError as e:
+            self.push(
+                {
+                    "type": "error",
+                    "id": data.get("id") if isinstance(data, dict) else None,
+                    "message": f"Invalid message: {e.errors()[0]['msg']}",
+                },
+                final=True,
+            )
+            return
+        try:
+            if command.id not in self.early:  # admitted when it started
+                get_admission_controller().admit(self.client)
+        except AdmissionRejected as e:
+            self.push(self.rejection(command.id, e), final=True)
+            return
+        task = asyncio.create_task(self.run_command(command))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    # Early dispatch
+
+    def handle_partial(self, data: Dict[str, Any]):
+        try:
+            partial = WsPartialMessage.model_validate(data)
+        except ValidationError as e:
+            self.push(
+                {
+                    "type": "error",
+                    "id": data.get("id"),
+                    "message": f"Invalid message: {e.errors()[0]['msg']}",
+                }
+            )
+            return
+        if partial.id in self.finished:
+            return  # arrived after its command
+        matcher = self.partials.get(partial.id)
+        if matcher is None:
+            if len(self.partials) >= self.max_partials:
+                # Forget the oldest utterance; its command was never sent
+                abandoned = next(iter(self.partials))
+                del self.partials[abandoned]
+                self.revoke_early(abandoned)
+            matcher = self.partials[partial.id] = StreamingIntentMatcher()
+        for event in matcher.update(partial.text):
+            if event.kind == FIRE:
+                self.start_early(partial.id, event.action)
+            else:
+                self.revoke_early(partial.id)
+
+    def start_early(self, command_id: str, action: str):
+        lane_kind = ACTION_REGISTRY.get(action, (None, None))[1]
+        if lane_kind is None:
+            return  # console actions only run for the final command
+        try:
+            get_admission_controller().admit(self.client)
+        except AdmissionRejected:
+            return  # left to the final command, which gets the refusal
+        # Held until the final command confirms the action
+        self.early[command_id] = action
+        self.push({"type": "early", "id": command_id, "action": action, "held": True})
+
+    def revoke_early(self, command_id: str):
+        action = self.early.pop(command_id, None)
+        if action is None:
+            return
+        self.push(
+            {
+                "type": "revoked",
+                "id": command_id,
+                "action": action,
+                "job_id": None,
+                "cancelled": True,
+            }
+        )
+
+    def adopt_early(self, command: WsCommandMessage) -> Optional[str]:
+        """
+        The held action if the final transcript parses to it, else revoke it.
+        """
+        self.finished[command.id] = None
+        if len(self.finished) > MAX_FINISHED_IDS:
+            self.finished.popitem(last=False)
+        self.partials.pop(command.id, None)
+        action = self.early.get(command.id)
+        if action is None:
+            return None
+        # The same trigger match parse_command() starts with
+        if not command.use_agent and match_trigger(command.command) == action:
+            return self.early.pop(command.id)
+        self.revoke_early(command.id)
+        return None
+
+    @staticmethod
+    def rejection(command_id: str, exc: AdmissionRejected) -> Dict[str, Any]:
+        return {
+            "type": "error",
+            "id": command_id,
+            "message": exc.detail,
+            "retry_after": exc.retry_after,
+        }
+
+    async def run_command(self, command: WsCommandMessage):
+        command_id = command.id
+        try:
+            action = self.adopt_early(command)
+            if action is not None:
+                self.push({"type": "parsed", "id": command_id, "action": action})
+                # Confirmed; a GUI job's queue may be shared state in SQLite
+                future = await run_in_threadpool(submit_action, action, self.profile)
+                self.push(
+                    {
+                        "type": "queued",
+                        "id": command_id,
+                        "action": action,
+                        "job_id": future.job_id,
+                        "early": True,
+                    }
+                )
+                await self.finish_job(command_id, action, future)
+                return
+            if command.use_agent:
+                result = await process_command_async(command.command, self.profile)
+                self.push(
+                    {
+                        "type": "done",
+                        "id": command_id,
+                        "success": bool(result.get("success")),
+                        "action": result.get("action"),
+                        "message": result.get("message", ""),
+                    },
+                    final=True,
+                )
+                return
+
+            parsed = await run_in_threadpool(
+                parse_command, command.command, self.profile
+            )
+            if not parsed:
+                self.push(
+                    {
+                        "type": "error",
+                        "id": command_id,
+                        "message": "Could not parse the voice command",
+                    },
+                    final=True,
+                )
+                return
+            action = parsed.get("action")
+            self.push({"type": "parsed", "id": command_id, "action": action})
+
+            if "result" in parsed:
+                # The agent already ran the automation while parsing
+                result = parsed["result"]
+                self.push(
+                    {
+                        "type": "done",
+                        "id": command_id,
+                        "success": bool(result.get("success")),
+                        "action": action,
+                        "message": result.get("message", ""),
+                    },
+                    final=True,
+                )
+                return
+            if action not in ACTION_REGISTRY:
+                self.push(
+                    {
+                        "type": "error",
+                        "id": command_id,
+                        "message": f"No automation implemented for action: {action}",
+                    },
+                    final=True,
+                )
+                return
+
+            future = await run_in_threadpool(submit_action, action, self.profile)
+            self.push(
+                {
+                    "type": "queued",
+                    "id": command_id,
+                    "action": action,
+                    "job_id": future.job_id,
+                }
+            )
+            await self.finish_job(command_id, action, future)
+        except AdmissionRejected as e:
+            self.push(self.rejection(command_id, e), final=True)
+        except Exception as e:
+            logger.error(f"WebSocket command {command_id} failed: {str(e)}")
+            self.push(
+                {
+                    "type": "done",
+                    "id": command_id,
+                    "success": False,
+                    "message": f"Failed to process voice command: {str(e)}",
+                },
+                final=True,
+            )
+
+    async def finish_job(self, command_id: str, action: str, future: Future):
+        result = await asyncio.wrap_future(future)
+        success, message = True, f"{action} completed"
+        if isinstance(result, GuiJob):
+            success, message = result.status == "succeeded", result.message
+        self.push(
+            {
+                "type": "done",
+                "id": command_id,
+                "success": success,
+                "action": action,
+                "message": message,
+            },
+            final=True,
+        )
+
+    async def serve(self):
+        sender = asyncio.create_task(self.sender())
+        try:
+            await self.receiver()
+        finally:
+            for task in list(self.tasks):
+                task.cancel()
+            self.early.clear()  # held claims of commands that never came
+            self.partials.clear()
+            self.outbox.put_nowait(None)
+            sender.cancel()
+
+
+@router.websocket("/ws")
+async def command_channel(
+    websocket: WebSocket, profile: Profile = Depends(get_ws_profile)
+):
+    """Persistent command channel: stream commands, receive their outcomes."""
+    await websocket.accept()
+    await CommandSession(websocket, profile, MAX_INFLIGHT).serve()
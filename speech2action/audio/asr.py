@@ -0,0 +1,95 @@
+"""
+Speech recognition backends.
+
+A backend turns one utterance (int16 mono samples) into text:
+
+- "openai": OpenAI's transcription API (whisper-1), using OPENAI_API_KEY
+- "scripted": returns prepared transcripts in order, without looking at the
+  audio. A local stand-in for tests and benchmarks; for a file source it
+  reads one transcript per line from the file next to it with a .txt suffix.
+"""
+
+import io
+import os
+import wave
+from typing import Callable, Dict, Iterable, Optional
+
+import numpy as np
+
+
+class ASRBackend:
+    """Transcribes one utterance at a time."""
+
+    name = "base"
+
+    def transcribe(self, samples: np.ndarray, sample_rate: int) -> str:
+        raise NotImplementedError
+
+
+def to_wav(samples: np.ndarray, sample_rate: int) -> bytes:
+    """Encode int16 mono samples as a WAV file."""
+    out = io.BytesIO()
+    with wave.open(out, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.astype("<i2").tobytes())
+    return out.getvalue()
+
+
+class OpenAIASR(ASRBackend):
+    """OpenAI transcription API; the client is created once and reused."""
+
+    name = "openai"
+
+    def __init__(self, model: str = "whisper-1"):
+        self.model = model
+        self._client = None
+
+    def transcribe(self, samples: np.ndarray, sample_rate: int) -> str:
+        if self._client is None:
+            from openai import OpenAI
+
+            self._client = OpenAI()
+        audio = io.BytesIO(to_wav(samples, sample_rate))
+        audio.name = "utterance.wav"
+        result = self._client.audio.transcriptions.create(model=self.model, file=audio)
+        return result.text.strip()
+
+
+class ScriptedASR(ASRBackend):
+    """Returns the given transcripts in order, then empty strings."""
+
+    name = "scripted"
+
+    def __init__(self, transcripts: Iterable[str] = ()):
+        self._transcripts = iter(list(transcripts))
+
+    @classmethod
+    def for_source(cls, source: Optional[str]) -> "ScriptedASR":
+        """Transcripts from <source>.txt (clip.wav -> clip.txt), if it exists."""
+        if not source or source in ("-", "mic"):
+            return cls()
+        path = os.path.splitext(source)[0] + ".txt"
+        if not os.path.exists(path):
+            return cls()
+        with open(path, encoding="utf-8") as f:
+            return cls(line.strip() for line in f if line.strip())
+
+    def transcribe(self, samples: np.ndarray, sample_rate: int) -> str:
+        return next(self._transcripts, "")
+
+
+ASR_BACKENDS: Dict[str, Callable[[Optional[str]], ASRBackend]] = {
+    "openai": lambda source: OpenAIASR(),
+    "scripted": ScriptedASR.for_source,
+}
+
+
+def get_asr_backend(name: str, source: Optional[str] = None) -> ASRBackend:
+    """Create the named backend for audio from source (see open_source())."""
+    if name not in ASR_BACKENDS:
+        raise ValueError(
+            f"Unknown ASR backend '{name}' (choose from {', '.join(ASR_BACKENDS)})"
+        )
+    return ASR_BACKENDS[name](source)
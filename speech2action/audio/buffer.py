@@ -0,0 +1,77 @@
+"""
+Preallocated ring buffer for 16-bit PCM samples.
+
+The buffer holds a whole number of fixed-size frames, so no frame ever wraps
+around its end: frames() returns a 2-D view straight into the buffer, and
+sources read into writable() views, so audio is not copied on its way from
+the source to voice activity detection. Positions are absolute sample counts
+since the stream started.
+"""
+
+import numpy as np
+
+
+class BufferOverrunError(Exception):
+    """Raised when samples are requested that have already been overwritten."""
+
+
+class RingBuffer:
+    """Fixed-capacity int16 sample ring, addressed by absolute position."""
+
+    def __init__(self, capacity: int, frame_size: int):
+        frames = -(-capacity // frame_size)  # round up to whole frames
+        self.frame_size = frame_size
+        self.capacity = frames * frame_size
+        self.data = np.zeros(self.capacity, dtype=np.int16)
+        self.written = 0  # samples written since the stream started
+
+    @property
+    def oldest(self) -> int:
+        """Position of the oldest sample still in the buffer."""
+        return max(0, self.written - self.capacity)
+
+    def writable(self, count: int) -> np.ndarray:
+        """A view of up to count free samples at the write position; see commit()."""
+        offset = self.written % self.capacity
+        return self.data[offset : min(self.capacity, offset + count)]
+
+    def commit(self, count: int):
+        """Mark count samples of the last writable() view as written."""
+        self.written += count
+
+    def write(self, samples: np.ndarray):
+        """Copy samples in, wrapping as needed."""
+        samples = samples[-self.capacity :]
+        while len(samples):
+            view = self.writable(len(samples))
+            view[:] = samples[: len(view)]
+            self.commit(len(view))
+            samples = samples[len(view) :]
+
+    def frames(self, first: int, last: int) -> np.ndarray:
+        """
+        View of frames first..last-1 as a (frames, frame_size) array. The range
+        must not cross the end of the buffer; see contiguous_frames().
+        """
+        if first * self.frame_size < self.oldest:
+            raise BufferOverrunError(f"frame {first} was overwritten")
+        start = first * self.frame_size % self.capacity
+        return self.data[start : start + (last - first) * self.frame_size].reshape(
+            -1, self.frame_size
+        )
+
+    def contiguous_frames(self, first: int, last: int) -> int:
+        """The end of the longest range from frame first that frames() can view."""
+        to_end = (self.capacity - first * self.frame_size % self.capacity) // (
+            self.frame_size
+        )
+        return min(last, first + to_end)
+
+    def samples(self, start: int, end: int) -> np.ndarray:
+        """A copy of samples start..end-1, which may wrap around."""
+        if start < self.oldest:
+            raise BufferOverrunError(f"sample {start} was overwritten")
+        first, last = start % self.capacity, end % self.capacity
+        if end - start <= self.capacity - first:
+            return self.data[first : first + end - start].copy()
+        return np.concatenate((self.data[first:], self.data[:last]))
@@ -0,0 +1,76 @@
+"""
+Log-mel features for keyword spotting.
+
+All frames of a clip are processed at once: a strided view cuts the samples
+into overlapping frames without copying, then windowing, the FFT, the mel
+filterbank (a matrix product) and the log run over the whole 2-D block.
+Filterbanks and windows are built once per sample rate.
+"""
+
+from functools import lru_cache
+from typing import Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+FRAME_MS = 25
+HOP_MS = 10
+N_MELS = 24
+
+
+def _hz_to_mel(hz):
+    return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+
+def _mel_to_hz(mel):
+    return 700.0 * (10.0 ** (mel / 2595.0) - 1.0)
+
+
+@lru_cache(maxsize=8)
+def _analysis(
+    sample_rate: int, frame_size: int, n_mels: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Window and (n_fft // 2 + 1, n_mels) triangular mel filterbank."""
+    n_fft = 1 << (frame_size - 1).bit_length()
+    bins = np.fft.rfftfreq(n_fft, 1.0 / sample_rate)
+    edges = _mel_to_hz(
+        np.linspace(_hz_to_mel(60.0), _hz_to_mel(sample_rate / 2 * 0.95), n_mels + 2)
+    )
+    low, center, high = edges[:-2, None], edges[1:-1, None], edges[2:, None]
+    rising = (bins - low) / (center - low)
+    falling = (high - bins) / (high - center)
+    filterbank = np.maximum(0.0, np.minimum(rising, falling)).T
+    window = np.hamming(frame_size).astype(np.float32)
+    return window, filterbank.astype(np.float32)
+
+
+def log_mel(
+    samples: np.ndarray,
+    sample_rate: int,
+    frame_ms: int = FRAME_MS,
+    hop_ms: int = HOP_MS,
+    n_mels: int = N_MELS,
+) -> np.ndarray:
+    """(frames, n_mels) log mel energies of int16 mono samples."""
+    frame_size = sample_rate * frame_ms // 1000
+    hop = sample_rate * hop_ms // 1000
+    if len(samples) < frame_size:
+        return np.zeros((0, n_mels), dtype=np.float32)
+    window, filterbank = _analysis(sample_rate, frame_size, n_mels)
+    frames = sliding_window_view(samples, frame_size)[::hop]
+    spectrum = np.fft.rfft(
+        frames.astype(np.float32) * window, n=2 * (filterbank.shape[0] - 1), axis=1
+    )
+    power = spectrum.real**2 + spectrum.imag**2
+    return np.log(power.astype(np.float32) @ filterbank + 1e-3)
+
+
+def frame_shapes(features: np.ndarray) -> np.ndarray:
+    """
+    Spectral shape of each frame: log mel energies minus their mean, scaled to
+    unit length, so a dot product is the cosine similarity of two frames and
+    overall loudness drops out.
+    """
+    centered = features - features.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(centered, axis=1, keepdims=True)
+    return centered / np.maximum(norms, 1e-6)
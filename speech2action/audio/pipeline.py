@@ -0,0 +1,238 @@
+"""
+Streaming audio capture pipeline: source -> ring buffer -> VAD -> ASR.
+
+Samples land in a preallocated ring buffer (read into it directly, or
+written with write() when audio is pushed in chunks). Every complete frame
+goes through voice activity detection as a view into the buffer; when an
+utterance closes, its samples are copied out once and transcribed.
+
+Each Utterance records when speech ended and when the VAD noticed (both in
+stream time) and how long the ASR backend took, so latency = hangover +
+ASR time is the delay from end of speech to transcript on a live source.
+stats() reports CPU time per second of audio for the front end (reading,
+buffering, VAD) and for ASR separately.
+
+With a wake gate (see wake.py), an utterance that does not start with the
+wake phrase is dropped before ASR and counted in stats()["gated"].
+
+Try it on a file:
+
+    python -m speech2action.audio.pipeline clip.wav --asr scripted
+"""
+
+import argparse
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from speech2action.audio.asr import ASRBackend, get_asr_backend
+from speech2action.audio.buffer import RingBuffer
+from speech2action.audio.sources import DEFAULT_SAMPLE_RATE, open_source
+from speech2action.audio.vad import EnergyVAD, Segment, frame_energies
+from speech2action.audio.wake import WakeGate, open_wake_gate
+
+FRAME_MS = 20
+READ_MS = 100  # audio requested from the source per read
+MAX_UTTERANCE = 30.0  # seconds before an utterance is cut
+
+
+@dataclass
+class Utterance:
+    """One transcribed utterance; times are seconds since the stream started."""
+
+    text: str
+    start: float
+    end: float  # end of speech
+    detected_at: float  # when the VAD closed the utterance
+    asr_seconds: float  # wall time spent in the ASR backend
+
+    @property
+    def latency(self) -> float:
+        """End of speech to transcript on a live source."""
+        return self.detected_at - self.end + self.asr_seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "text": self.text,
+            "start": round(self.start, 3),
+            "end": round(self.end, 3),
+            "latency": round(self.latency, 3),
+            "asr_seconds": round(self.asr_seconds, 3),
+        }
+
+
+class AudioPipeline:
+    """Segments a stream of int16 mono samples into transcribed utterances."""
+
+    def __init__(
+        self,
+        asr: ASRBackend,
+        sample_rate: int = DEFAULT_SAMPLE_RATE,
+        vad: Optional[EnergyVAD] = None,
+        frame_ms: int = FRAME_MS,
+        max_utterance: float = MAX_UTTERANCE,
+        gate: Optional[WakeGate] = None,
+    ):
+        self.asr = asr
+        self.gate = gate
+        self.sample_rate = sample_rate
+        self.frame_size = sample_rate * frame_ms // 1000
+        self.frame_seconds = self.frame_size / sample_rate
+        self.vad = vad or EnergyVAD()
+        self.vad.max_frames = int(max_utterance / self.frame_seconds)
+        self.read_size = sample_rate * READ_MS // 1000
+        # Room for the longest utterance, its pre-roll and one read
+        self.ring = RingBuffer(
+            (self.vad.max_frames + self.vad.pre_roll_frames + 1) * self.frame_size
+            + self.read_size,
+            self.frame_size,
+        )
+        self._next_frame = 0
+        self.frontend_cpu = 0.0
+        self.asr_cpu = 0.0
+        self.gate_cpu = 0.0
+        self.gated = 0  # utterances the wake gate kept from ASR
+        self.utterances: List[Utterance] = []
+
+    # Input
+
+    def run(self, source) -> Iterator[Utterance]:
+        """Read source to its end, yielding utterances as they close."""
+        while True:
+            started = time.process_time()
+            view = self.ring.writable(self.read_size)
+            count = source.readinto(view)
+            self.ring.commit(count)
+            self.frontend_cpu += time.process_time() - started
+            if not count:
+                break
+            yield from self._process()
+        yield from self.flush()
+
+    def write(self, samples: np.ndarray) -> List[Utterance]:
+        """Push samples in; returns the utterances they closed."""
+        utterances = []
+        # In reads' worth, so no unprocessed frame is overwritten
+        for offset in range(0, len(samples), self.read_size):
+            started = time.process_time()
+            self.ring.write(samples[offset : offset + self.read_size])
+            self.frontend_cpu += time.process_time() - started
+            utterances += self._process()
+        return utterances
+
+    def flush(self) -> List[Utterance]:
+        """End of stream: transcribe the utterance still open, if any."""
+        segment = self.vad.flush(self._next_frame)
+        utterance = self._transcribe(segment) if segment else None
+        return [utterance] if utterance else []
+
+    # Processing
+
+    def _process(self) -> List[Utterance]:
+        started = time.process_time()
+        segments: List[Segment] = []
+        ready = self.ring.written // self.frame_size
+        while self._next_frame < ready:
+            last = self.ring.contiguous_frames(self._next_frame, ready)
+            energies = frame_energies(self.ring.frames(self._next_frame, last))
+            segments += self.vad.process(energies, self._next_frame)
+            self._next_frame = last
+        self.frontend_cpu += time.process_time() - started
+        utterances = [self._transcribe(segment) for segment in segments]
+        return [u for u in utterances if u is not None]
+
+    def _transcribe(self, segment: Segment) -> Optional[Utterance]:
+        samples = self.ring.samples(
+            segment.start * self.frame_size, segment.end * self.frame_size
+        )
+        if self.gate is not None:
+            cpu = time.process_time()
+            admitted = self.gate.admit(
+                samples,
+                segment.start * self.frame_seconds,
+                segment.speech_end * self.frame_seconds,
+            )
+            self.gate_cpu += time.process_time() - cpu
+            if not admitted:
+                self.gated += 1
+                return None
+        started, cpu = time.perf_counter(), time.process_time()
+        text = self.asr.transcribe(samples, self.sample_rate)
+        asr_seconds = time.perf_counter() - started
+        self.asr_cpu += time.process_time() - cpu
+        utterance = Utterance(
+            text=text,
+            start=segment.start * self.frame_seconds,
+            end=segment.speech_end * self.frame_seconds,
+            detected_at=segment.detected * self.frame_seconds,
+            asr_seconds=asr_seconds,
+        )
+        self.utterances.append(utterance)
+        return utterance
+
+    # Measurements
+
+    @property
+    def audio_seconds(self) -> float:
+        return self.ring.written / self.sample_rate
+
+    def stats(self) -> Dict[str, Any]:
+        seconds = self.audio_seconds or 1.0
+        latencies = sorted(u.latency for u in self.utterances)
+        return {
+            "audio_seconds": round(self.audio_seconds, 3),
+            "utterances": len(self.utterances),
+            "frontend_cpu_per_audio_second": round(self.frontend_cpu / seconds, 6),
+            "asr_cpu_per_audio_second": round(self.asr_cpu / seconds, 6),
+            "gated": self.gated,
+            "gate_cpu_per_audio_second": round(self.gate_cpu / seconds, 6),
+            "latency_p50": (
+                round(latencies[len(latencies) // 2], 3) if latencies else None
+            ),
+            "latency_max": round(latencies[-1], 3) if latencies else None,
+        }
+
+
+def open_pipeline(
+    spec: str,
+    asr: str,
+    sample_rate: int = DEFAULT_SAMPLE_RATE,
+    wake_templates: Optional[str] = None,
+    wake_sensitivity: float = 0.5,
+    wake_follow_up: float = 5.0,
+):
+    """
+    Open the source named by spec and a pipeline matching its sample rate,
+    gated by the wake phrase recordings in wake_templates if given.
+    """
+    source = open_source(spec, sample_rate)
+    gate = open_wake_gate(
+        wake_templates, source.sample_rate, wake_sensitivity, wake_follow_up
+    )
+    pipeline = AudioPipeline(get_asr_backend(asr, spec), source.sample_rate, gate=gate)
+    return source, pipeline
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Transcribe utterances from audio")
+    parser.add_argument("source", help='"mic", "-" (raw PCM on stdin) or a file')
+    parser.add_argument("--asr", default="scripted", help="openai or scripted")
+    parser.add_argument("--rate", type=int, default=DEFAULT_SAMPLE_RATE)
+    parser.add_argument("--wake", help="directory of wake phrase recordings")
+    parser.add_argument("--sensitivity", type=float, default=0.5)
+    args = parser.parse_args()
+
+    source, pipeline = open_pipeline(
+        args.source, args.asr, args.rate, args.wake, args.sensitivity
+    )
+    try:
+        for utterance in pipeline.run(source):
+            print(
+                f"[{utterance.start:7.2f}s - {utterance.end:7.2f}s] "
+                f"{utterance.text!r} (latency {utterance.latency * 1000:.0f} ms)"
+            )
+    finally:
+        source.close()
+    print(pipeline.stats())
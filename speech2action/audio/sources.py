@@ -0,0 +1,99 @@
+"""
+Audio sources for the capture pipeline.
+
+Every source delivers 16-bit mono samples through readinto(buffer), which
+fills an int16 array (a view into the pipeline's ring buffer) and returns
+the number of samples read, 0 at the end of the stream. Raw PCM is read
+straight into that view without intermediate copies.
+
+open_source() picks a source from a spec:
+
+- "mic": the default input device (needs the sounddevice package)
+- "-": raw PCM on stdin
+- a .wav file
+- any other path: a raw PCM file
+"""
+
+import sys
+import wave
+from typing import BinaryIO
+
+import numpy as np
+
+DEFAULT_SAMPLE_RATE = 16000
+
+
+class PcmSource:
+    """Raw 16-bit little-endian mono PCM from a binary stream."""
+
+    def __init__(self, stream: BinaryIO, sample_rate: int = DEFAULT_SAMPLE_RATE):
+        self.stream = stream
+        self.sample_rate = sample_rate
+
+    def readinto(self, buffer: np.ndarray) -> int:
+        count = self.stream.readinto(memoryview(buffer).cast("B")) or 0
+        return count // 2  # a trailing odd byte at the end of the stream is dropped
+
+    def close(self):
+        if self.stream is not sys.stdin.buffer:
+            self.stream.close()
+
+
+class WavSource:
+    """A PCM WAV file; several channels are mixed down to mono."""
+
+    def __init__(self, path: str):
+        self._wave = wave.open(path, "rb")
+        if self._wave.getsampwidth() != 2:
+            self._wave.close()
+            raise ValueError(f"{path}: only 16-bit WAV files are supported")
+        self.channels = self._wave.getnchannels()
+        self.sample_rate = self._wave.getframerate()
+
+    def readinto(self, buffer: np.ndarray) -> int:
+        data = np.frombuffer(self._wave.readframes(len(buffer)), dtype="<i2")
+        if self.channels > 1:
+            data = data.reshape(-1, self.channels).mean(axis=1).astype(np.int16)
+        buffer[: len(data)] = data
+        return len(data)
+
+    def close(self):
+        self._wave.close()
+
+
+class MicrophoneSource:
+    """The default input device, through the optional sounddevice package."""
+
+    def __init__(self, sample_rate: int = DEFAULT_SAMPLE_RATE):
+        try:
+            import sounddevice
+        except ImportError as e:
+            raise RuntimeError(
+                "Microphone input needs the sounddevice package "
+                "(pip install sounddevice)"
+            ) from e
+        self.sample_rate = sample_rate
+        self._stream = sounddevice.InputStream(
+            samplerate=sample_rate, channels=1, dtype="int16"
+        )
+        self._stream.start()
+
+    def readinto(self, buffer: np.ndarray) -> int:
+        data, _ = self._stream.read(len(buffer))  # blocks until filled
+        buffer[: len(data)] = data[:, 0]
+        return len(data)
+
+    def close(self):
+        self._stream.stop()
+        self._stream.close()
+
+
+def open_source(spec: str, sample_rate: int = DEFAULT_SAMPLE_RATE):
+    """Open "mic", "-" (stdin), a .wav file or a raw PCM file."""
+    if spec == "mic":
+        return MicrophoneSource(sample_rate)
+    if spec == "-":
+        return PcmSource(sys.stdin.buffer, sample_rate)
+    if spec.lower().endswith(".wav"):
+        return WavSource(spec)
+    return PcmSource(open(spec, "rb"), sample_rate)
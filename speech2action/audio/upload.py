@@ -0,0 +1,315 @@
+"""
+Incremental ingestion of uploaded audio.
+
+An upload arrives as a stream of chunks of a WAV file or of raw 16-bit
+little-endian PCM. Each chunk is decoded as it comes (only the WAV header is
+ever buffered) and appended to an AudioSpool. A worker thread takes the
+samples from the spool and writes them through the capture pipeline (VAD ->
+ASR), handing on each utterance as soon as it closes, so receiving the
+upload and transcribing it overlap.
+
+The upload never has to fit in memory: the spool keeps the first
+SPOOL_MEMORY bytes in RAM and moves to a memory-mapped temporary file beyond
+that, so audio that arrives faster than ASR consumes it backs up on disk,
+not in the heap. The pipeline reads samples straight out of the mapping.
+What an upload holds in memory is the spool's RAM part plus the pipeline's
+ring buffer, whatever its size; stats() reports it as memory_peak_bytes.
+"""
+
+import mmap
+import struct
+import tempfile
+import threading
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from speech2action.audio.asr import ASRBackend
+from speech2action.audio.pipeline import AudioPipeline, Utterance
+
+SPOOL_MEMORY = 1024 * 1024  # bytes kept in RAM before spooling to a file
+SPOOL_GROWTH = 16 * 1024 * 1024  # minimum size step of the spool file
+MAX_HEADER = 64 * 1024  # WAV header bytes (fmt and other chunks) accepted
+READ_SECONDS = 1.0  # audio handed to the pipeline per step
+
+
+class UploadError(ValueError):
+    """The upload is not audio this pipeline can read."""
+
+
+class UploadTooLarge(UploadError):
+    """The upload exceeds the configured size limit."""
+
+
+def parse_wav_header(data: bytes) -> Optional[Tuple[int, int, int, Optional[int]]]:
+    """
+    (sample rate, channels, offset of the samples, their length in bytes or
+    None if unknown) from the start of a WAV file, or None if data does not
+    reach the start of the samples yet.
+    """
+    if len(data) < 12:
+        return None
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise UploadError("Not a WAV file")
+    position, fmt = 12, None
+    while position + 8 <= len(data):
+        chunk_id, size = struct.unpack_from("<4sI", data, position)
+        body = position + 8
+        if chunk_id == b"data":
+            if fmt is None:
+                raise UploadError("WAV file has no fmt chunk before its samples")
+            rate, channels = fmt
+            # Streaming writers leave the size at 0 or 0xFFFFFFFF
+            length = size if 0 < size < 0xFFFFFFFF else None
+            return rate, channels, body, length
+        if body + size > len(data):
+            return None
+        if chunk_id == b"fmt ":
+            audio_format, channels, rate = struct.unpack_from("<HHI", data, body)
+            bits = struct.unpack_from("<H", data, body + 14)[0]
+            if audio_format not in (1, 0xFFFE) or bits != 16:
+                raise UploadError("Only 16-bit PCM WAV files are supported")
+            if channels < 1 or rate < 1000:
+                raise UploadError("Invalid WAV format")
+            fmt = rate, channels
+        position = body + size + (size & 1)  # chunks are padded to even sizes
+    return None
+
+
+class AudioStreamDecoder:
+    """
+    Turns the chunks of an upload into PCM bytes. A stream starting with a
+    RIFF/WAVE header is read as WAV; anything else is raw mono PCM at
+    sample_rate.
+    """
+
+    def __init__(self, sample_rate: int):
+        self.sample_rate: Optional[int] = None
+        self.channels = 1
+        self._default_rate = sample_rate
+        self._header: Optional[bytearray] = bytearray()
+        self._remaining: Optional[int] = None  # sample bytes left, if known
+
+    @property
+    def ready(self) -> bool:
+        return self.sample_rate is not None
+
+    def feed(self, chunk: bytes) -> bytes:
+        """The PCM bytes in chunk (empty while a WAV header is being read)."""
+        if self._header is not None:
+            self._header += chunk
+            if len(self._header) < 4 and b"RIFF".startswith(bytes(self._header)):
+                return b""
+            if not self._header.startswith(b"RIFF"):
+                self.sample_rate = self._default_rate
+                chunk, self._header = bytes(self._header), None
+                return chunk
+            parsed = parse_wav_header(self._header)
+            if parsed is None:
+                if len(self._header) > MAX_HEADER:
+                    raise UploadError("WAV header too large")
+                return b""
+            self.sample_rate, self.channels, offset, self._remaining = parsed
+            chunk, self._header = bytes(self._header[offset:]), None
+        if self._remaining is not None:
+            # Trailing chunks after the samples (LIST, ...) are not audio
+            chunk = chunk[: self._remaining]
+            self._remaining -= len(chunk)
+        return chunk
+
+
+class AudioSpool:
+    """
+    Append-only byte store shared by one writer and one reader: in RAM up to
+    memory_limit bytes, then in a memory-mapped temporary file.
+    """
+
+    def __init__(self, memory_limit: int = SPOOL_MEMORY, size_hint: int = 0):
+        self.size = 0
+        self.memory_bytes = min(size_hint, memory_limit) if size_hint else memory_limit
+        # Allocated on the first write and never resized, so views the reader
+        # holds stay valid
+        self._memory: Optional[bytearray] = None
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+
+    @property
+    def on_disk(self) -> bool:
+        return self._file is not None
+
+    @property
+    def allocated(self) -> int:
+        """Bytes of RAM the spool used."""
+        return self.memory_bytes if self.size else 0
+
+    def write(self, data: bytes):
+        end = self.size + len(data)
+        if self._memory is None and self._file is None:
+            self._memory = bytearray(self.memory_bytes)
+        if self._memory is not None and end <= len(self._memory):
+            self._memory[self.size : end] = data
+        else:
+            self._reserve(end)
+            self._map[self.size : end] = data
+        self.size = end
+
+    def view(self, start: int, end: int) -> memoryview:
+        buffer = self._memory if self._file is None else self._map
+        return memoryview(buffer)[start:end]
+
+    def _reserve(self, end: int):
+        if self._map is not None and end <= len(self._map):
+            return
+        if self._file is None:
+            self._file = tempfile.TemporaryFile(prefix="orchestra-upload-")
+        capacity = max(end, 2 * self.size, SPOOL_GROWTH)
+        self._file.truncate(capacity)  # sparse: disk is used as it is written
+        # A new, larger mapping; one the reader still holds a view of stays
+        # valid (and sees the same file) until the view is released
+        self._map = mmap.mmap(self._file.fileno(), capacity)
+        if self._memory is not None:
+            self._map[: self.size] = self._memory[: self.size]
+            self._memory = None
+
+    def close(self):
+        self._memory = self._map = None
+        if self._file is not None:
+            self._file.close()
+
+
+class AudioUpload:
+    """
+    One upload: feed() its chunks as they arrive (from the event loop),
+    while process() runs the pipeline over them on a worker thread and calls
+    on_utterance for each transcribed utterance.
+    """
+
+    def __init__(
+        self,
+        asr: ASRBackend,
+        sample_rate: int,
+        on_utterance: Callable[[Utterance], None],
+        size_hint: int = 0,
+        max_bytes: int = 0,
+        memory_limit: int = SPOOL_MEMORY,
+    ):
+        self.asr = asr
+        self.on_utterance = on_utterance
+        self.max_bytes = max_bytes
+        self.decoder = AudioStreamDecoder(sample_rate)
+        self.spool = AudioSpool(memory_limit, size_hint)
+        self.pipeline: Optional[AudioPipeline] = None
+        self.bytes_received = 0
+        self.utterances: List[Utterance] = []
+        self._ready = threading.Condition()
+        self._finished = False
+        self._aborted = False
+        self._error: Optional[BaseException] = None
+
+    # Producer
+
+    def feed(self, chunk: bytes):
+        if self._error is not None:
+            raise self._error
+        self.bytes_received += len(chunk)
+        if self.max_bytes and self.bytes_received > self.max_bytes:
+            raise UploadTooLarge(f"Upload exceeds {self.max_bytes // (1024 * 1024)} MB")
+        data = self.decoder.feed(chunk)
+        if self.pipeline is None and self.decoder.ready:
+            self.pipeline = AudioPipeline(self.asr, self.decoder.sample_rate)
+        if data:
+            with self._ready:
+                self.spool.write(data)
+                self._ready.notify()
+        elif self.pipeline is not None:
+            with self._ready:
+                self._ready.notify()  # the reader can start
+
+    def finish(self):
+        """
+        No more chunks; process() transcribes what is left and returns.
+        Raises UploadError if the upload ended before any audio.
+        """
+        with self._ready:
+            self._finished = True
+            self._ready.notify()
+        if not self.decoder.ready:
+            raise UploadError(
+                "Incomplete WAV header" if self.bytes_received else "Empty upload"
+            )
+
+    def abort(self):
+        """Stop process() as soon as possible, leaving the rest untranscribed."""
+        with self._ready:
+            self._finished = self._aborted = True
+            self._ready.notify()
+
+    # Consumer
+
+    def process(self):
+        """Run the pipeline over the spooled audio until finish() (worker thread)."""
+        try:
+            self._process()
+        except BaseException as e:
+            self._error = e
+            raise
+
+    def _process(self):
+        position = 0
+        while True:
+            with self._ready:
+                while not self._finished and not self._has_audio(position):
+                    self._ready.wait()
+                if self._aborted:
+                    return
+                if self.pipeline is None:
+                    break  # finished before a single sample
+                step = self._frame_bytes * int(READ_SECONDS * self.pipeline.sample_rate)
+                usable = self.spool.size - position
+                usable -= usable % self._frame_bytes
+                if not usable:
+                    break  # finished
+                take = min(usable, step)
+                view = self.spool.view(position, position + take)
+            samples = np.frombuffer(view, dtype="<i2")
+            if self.decoder.channels > 1:
+                samples = samples.reshape(-1, self.decoder.channels).mean(axis=1)
+                samples = samples.astype(np.int16)
+            utterances = self.pipeline.write(samples)
+            del samples, view  # release the spool buffer
+            position += take
+            self._deliver(utterances)
+        if self.pipeline is not None:
+            self._deliver(self.pipeline.flush())
+
+    @property
+    def _frame_bytes(self) -> int:
+        return 2 * self.decoder.channels
+
+    def _has_audio(self, position: int) -> bool:
+        if self.pipeline is None:
+            return False
+        step = self._frame_bytes * int(READ_SECONDS * self.pipeline.sample_rate)
+        return self.spool.size - position >= step
+
+    def _deliver(self, utterances: List[Utterance]):
+        for utterance in utterances:
+            self.utterances.append(utterance)
+            self.on_utterance(utterance)
+
+    def close(self):
+        self.spool.close()
+
+    # Measurements
+
+    def stats(self):
+        ring = self.pipeline.ring.data.nbytes if self.pipeline else 0
+        return {
+            "bytes_received": self.bytes_received,
+            "audio_seconds": (
+                round(self.pipeline.audio_seconds, 3) if self.pipeline else 0.0
+            ),
+            "utterances": len(self.utterances),
+            "spooled_to_disk": self.spool.on_disk,
+            "memory_peak_bytes": self.spool.allocated + ring,
+        }
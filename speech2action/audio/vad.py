@@ -0,0 +1,120 @@
+"""
+Energy-based voice activity detection.
+
+Frame energies are computed for a whole block of frames at once (one
+vectorized pass over a 2-D view of the ring buffer); the per-frame decision
+is then a few comparisons. A frame is speech when its energy is
+threshold_db above the tracked noise floor. An utterance starts after
+start_frames speech frames in a row (plus pre_roll_frames before them, so
+soft onsets are not clipped) and ends after end_frames of non-speech, or
+when it reaches max_frames.
+
+The noise floor starts at the first frame's energy, then follows quieter
+frames immediately and louder ones slowly, and only outside utterances, so
+steady background noise is not speech.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+
+FULL_SCALE = 32768.0  # int16
+
+
+def frame_energies(frames: np.ndarray) -> np.ndarray:
+    """Mean energy of each row of a (frames, frame_size) int16 array, in dBFS."""
+    x = frames.astype(np.float32) / FULL_SCALE
+    power = np.einsum("ij,ij->i", x, x) / frames.shape[1]
+    return 10 * np.log10(power + 1e-10)
+
+
+@dataclass
+class Segment:
+    """An utterance in frame indices since the stream started."""
+
+    start: int  # first frame, including pre-roll
+    end: int  # frame after the last one, including padding
+    speech_end: int  # frame after the last speech frame
+    detected: int  # frame after the one that closed the utterance
+
+
+class EnergyVAD:
+    """Segments a stream of frame energies into utterances."""
+
+    def __init__(
+        self,
+        threshold_db: float = 12.0,
+        min_speech_db: float = -50.0,
+        start_frames: int = 3,
+        end_frames: int = 25,
+        pre_roll_frames: int = 10,
+        padding_frames: int = 5,
+        max_frames: int = 1500,
+        floor_rise: float = 0.02,
+    ):
+        self.threshold_db = threshold_db
+        self.min_speech_db = min_speech_db
+        self.start_frames = start_frames
+        self.end_frames = end_frames
+        self.pre_roll_frames = pre_roll_frames
+        self.padding_frames = padding_frames
+        self.max_frames = max_frames
+        self.floor_rise = floor_rise
+        self.noise_floor: Optional[float] = None
+        self.start: Optional[int] = None  # frame the open utterance starts at
+        self._run = 0  # speech frames in a row before an utterance
+        self._silence = 0  # non-speech frames in a row within one
+        self._last_speech = 0
+
+    @property
+    def in_speech(self) -> bool:
+        return self.start is not None
+
+    def is_speech(self, energy: float) -> bool:
+        return energy > max(self.noise_floor + self.threshold_db, self.min_speech_db)
+
+    def process(self, energies: np.ndarray, first: int) -> List[Segment]:
+        """Feed the energies of frames first, first+1, ...; returns closed utterances."""
+        segments = []
+        for index, energy in enumerate(energies.tolist(), first):
+            if self.noise_floor is None:
+                self.noise_floor = energy  # the stream starts outside speech
+                continue
+            speech = self.is_speech(energy)
+            if self.start is None:
+                if speech:
+                    self._run += 1
+                    if self._run >= self.start_frames:
+                        onset = index - self._run + 1
+                        self.start = max(0, onset - self.pre_roll_frames)
+                        self._last_speech, self._silence = index, 0
+                    continue
+                self._run = 0
+                if energy < self.noise_floor:
+                    self.noise_floor = energy
+                else:
+                    self.noise_floor += (energy - self.noise_floor) * self.floor_rise
+                continue
+            if speech:
+                self._last_speech, self._silence = index, 0
+            else:
+                self._silence += 1
+            if self._silence >= self.end_frames:
+                segments.append(self._close(index + 1))
+            elif index + 1 - self.start >= self.max_frames:
+                segments.append(self._close(index + 1, cut=True))
+        return segments
+
+    def flush(self, frames: int) -> Optional[Segment]:
+        """Close the open utterance at the end of a stream of frames frames."""
+        if self.start is None:
+            return None
+        return self._close(frames, cut=True)
+
+    def _close(self, detected: int, cut: bool = False) -> Segment:
+        speech_end = self._last_speech + 1
+        end = detected if cut else min(detected, speech_end + self.padding_frames)
+        segment = Segment(self.start, end, speech_end, detected)
+        self.start, self._run, self._silence = None, 0, 0
+        return segment
@@ -0,0 +1,198 @@
+"""
+Wake-phrase gate in front of ASR and the agent.
+
+With continuous listening every utterance would be sent to the ASR backend
+and every transcript that matches no trigger phrase to the agent. The gate
+lets an utterance through only if it starts with the wake phrase
+("orchestra, create a gym note"), or if it comes within follow_up seconds
+after the wake phrase was said on its own ("orchestra" ... "create a gym
+note"). Everything else is dropped before it costs an ASR or LLM call.
+
+KeywordSpotter compares the start of an utterance against a few recorded
+takes of the wake phrase. Both are turned into log-mel frame shapes (see
+features.py) and the frame distances for a whole template are one matrix
+product; subsequence dynamic time warping then finds the best-matching
+stretch of the utterance, allowing the phrase to be said up to twice as
+fast or slower than the template. The score is the path cost per template
+frame (0: identical), and an utterance is accepted below the threshold set
+by sensitivity: higher sensitivity accepts more, lower rejects more.
+
+Record 3-5 takes of the wake phrase as 16-bit WAV files in one directory
+and point ORCHESTRA_WAKE_TEMPLATES at it.
+"""
+
+import glob
+import os
+import re
+import wave
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from speech2action.audio.features import HOP_MS, frame_shapes, log_mel
+from speech2action.audio.vad import frame_energies
+
+SEARCH_SECONDS = 2.5  # start of an utterance searched for the wake phrase
+MAX_DISTANCE = 0.5  # threshold at sensitivity 1.0
+FOLLOW_UP = 5.0
+TRIM_DB = 25.0  # template frames this far below the loudest one are silence
+
+
+def trim_silence(samples: np.ndarray, sample_rate: int) -> np.ndarray:
+    """Cut leading and trailing silence from a recorded template."""
+    frame = sample_rate * HOP_MS // 1000
+    count = len(samples) // frame
+    if count == 0:
+        return samples
+    energies = frame_energies(samples[: count * frame].reshape(count, frame))
+    loud = np.flatnonzero(energies > energies.max() - TRIM_DB)
+    return samples[loud[0] * frame : (loud[-1] + 1) * frame]
+
+
+def read_wav(path: str) -> Tuple[np.ndarray, int]:
+    with wave.open(path, "rb") as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit WAV files are supported")
+        data = np.frombuffer(wav.readframes(wav.getnframes()), dtype="<i2")
+        channels, rate = wav.getnchannels(), wav.getframerate()
+    if channels > 1:
+        data = data.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    return data, rate
+
+
+class KeywordSpotter:
+    """Template-matching spotter for one wake phrase."""
+
+    def __init__(
+        self,
+        sample_rate: int,
+        sensitivity: float = 0.5,
+        search_seconds: float = SEARCH_SECONDS,
+    ):
+        if not 0.0 <= sensitivity <= 1.0:
+            raise ValueError("sensitivity must be between 0 and 1")
+        self.sample_rate = sample_rate
+        self.sensitivity = sensitivity
+        self.search_seconds = search_seconds
+        self.templates: List[np.ndarray] = []  # (frames, n_mels) frame shapes
+
+    @classmethod
+    def from_directory(cls, path: str, sample_rate: int, **kwargs) -> "KeywordSpotter":
+        spotter = cls(sample_rate, **kwargs)
+        for wav_path in sorted(glob.glob(os.path.join(path, "*.wav"))):
+            samples, rate = read_wav(wav_path)
+            if rate != sample_rate:
+                raise ValueError(
+                    f"{wav_path}: recorded at {rate} Hz, the audio source is "
+                    f"{sample_rate} Hz"
+                )
+            spotter.enroll(samples)
+        if not spotter.templates:
+            raise ValueError(f"No wake phrase recordings (*.wav) in {path}")
+        return spotter
+
+    @property
+    def threshold(self) -> float:
+        return MAX_DISTANCE * self.sensitivity
+
+    def enroll(self, samples: np.ndarray):
+        """Add a recorded take of the wake phrase."""
+        trimmed = trim_silence(samples, self.sample_rate)
+        self.templates.append(frame_shapes(log_mel(trimmed, self.sample_rate)))
+
+    def search(self, samples: np.ndarray) -> Tuple[float, int]:
+        """
+        Best score over all templates and the feature frame (10 ms) where the
+        best match ends, within the first search_seconds of samples.
+        """
+        window = samples[: int(self.search_seconds * self.sample_rate)]
+        shapes = frame_shapes(log_mel(window, self.sample_rate))
+        best, best_end = np.inf, 0
+        for template in self.templates:
+            score, end = _subsequence_dtw(1.0 - shapes @ template.T)
+            if score < best:
+                best, best_end = score, end
+        return best, best_end
+
+    def detect(self, samples: np.ndarray) -> bool:
+        return self.search(samples)[0] <= self.threshold
+
+
+def _subsequence_dtw(distances: np.ndarray) -> Tuple[float, int]:
+    """
+    Cheapest path through a (utterance frames, template frames) distance
+    matrix that starts and ends anywhere in the utterance and covers the
+    whole template. Every step advances one utterance frame and zero, one or
+    two template frames (a double step pays for both frames), so each row
+    only depends on the previous one and is computed as whole-row operations.
+    Returns (cost per template frame, utterance frame after the match).
+    """
+    frames, length = distances.shape
+    if frames == 0 or length == 0:
+        return np.inf, 0
+    # Two leading infinities so the shifted predecessors are plain slices
+    padded = np.full(length + 2, np.inf, dtype=np.float32)
+    cost = padded[2:]
+    # Distance of the template frame a double step jumps over
+    skipped = np.empty_like(distances)
+    skipped[:, 0] = np.inf
+    skipped[:, 1:] = distances[:, :-1]
+    best, best_end = np.inf, 0
+    for row in range(frames):
+        d = distances[row]
+        candidates = padded[:-2] + skipped[row]
+        np.minimum(candidates, padded[1:-1], out=candidates)
+        np.minimum(candidates, cost, out=candidates)
+        candidates += d
+        candidates[0] = min(candidates[0], d[0])  # the match may start anywhere
+        cost[:] = candidates
+        if cost[-1] < best:
+            best, best_end = float(cost[-1]), row + 1
+    return best / length, best_end
+
+
+class WakeGate:
+    """Decides which utterances reach ASR; times are stream seconds."""
+
+    def __init__(self, spotter: KeywordSpotter, follow_up: float = FOLLOW_UP):
+        self.spotter = spotter
+        self.follow_up = follow_up
+        self.open_until = -1.0
+        self.woken = 0  # utterances that started with the wake phrase
+        self.followed = 0  # utterances let through after a bare wake phrase
+
+    def admit(self, samples: np.ndarray, start: float, speech_end: float) -> bool:
+        """Whether the utterance from start to speech_end goes on to ASR."""
+        if start <= self.open_until:
+            self.open_until = -1.0  # one command per wake phrase
+            self.followed += 1
+            return True
+        score, end_frame = self.spotter.search(samples)
+        if score > self.spotter.threshold:
+            return False
+        self.woken += 1
+        phrase_end = start + end_frame * HOP_MS / 1000
+        if speech_end - phrase_end < 0.3:  # nothing said after the wake phrase
+            self.open_until = speech_end + self.follow_up
+        return True
+
+
+def open_wake_gate(
+    template_dir: Optional[str],
+    sample_rate: int,
+    sensitivity: float = 0.5,
+    follow_up: float = FOLLOW_UP,
+) -> Optional[WakeGate]:
+    """A gate from a directory of wake phrase recordings; None without one."""
+    if not template_dir:
+        return None
+    spotter = KeywordSpotter.from_directory(
+        template_dir, sample_rate, sensitivity=sensitivity
+    )
+    return WakeGate(spotter, follow_up)
+
+
+def strip_wake_phrase(text: str, phrase: str) -> str:
+    """Remove a leading wake phrase (and the punctuation after it) from a transcript."""
+    pattern = r"^\W*" + r"\W+".join(map(re.escape, phrase.split())) + r"\b[\W_]*"
+    return re.sub(pattern, "", text, count=1, flags=re.IGNORECASE)
@@ -0,0 +1,161 @@
+"""
+Per-user vault profiles.
+
+A profile maps a user (tenant) to its own Obsidian vault paths. Profiles are
+loaded from the JSON file named by ORCHESTRA_PROFILES_FILE, e.g.:
+
+    {
+        "alice": {
+            "OBSIDIAN_EXERCISE_VAULT_PATH": "/vaults/alice/exercise",
+            "OBSIDIAN_MAIN_VAULT_PATH": "/vaults/alice/main",
+            "tokens": ["alice-secret"]
+        }
+    }
+
+Each profile is named by its key. The vault settings from .env are always
+available as the default profile.
+The registry is rebuilt when those settings or the profiles file change.
+Profiles expose the same vault attributes as Settings, so they can be passed
+anywhere the automations accept a settings object.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, ValidationError
+
+from speech2action.config.settings import get_settings, get_settings_service
+
+# Settings the registry is built from
+REGISTRY_SETTINGS = {
+    "OBSIDIAN_EXERCISE_VAULT_PATH",
+    "OBSIDIAN_MAIN_VAULT_PATH",
+    "ORCHESTRA_PROFILES_FILE",
+    "ORCHESTRA_DEFAULT_PROFILE",
+}
+
+
+class UnknownProfileError(KeyError):
+    """Raised when a profile name or token does not match any profile."""
+
+
+class ProfileAuthError(PermissionError):
+    """Raised when a token-protected profile is requested without its token."""
+
+
+class ProfileConfigError(ValueError):
+    """Raised when an entry in the profiles file is not a valid profile."""
+
+
+class Profile(BaseModel):
+    """Vault configuration for one user."""
+
+    name: str
+    OBSIDIAN_EXERCISE_VAULT_PATH: str
+    OBSIDIAN_MAIN_VAULT_PATH: str
+    tokens: List[str] = []
+
+    def vault_path(self, vault_type: str) -> str:
+        """Return the vault path for "exercise" or "main"."""
+        if vault_type == "exercise":
+            return self.OBSIDIAN_EXERCISE_VAULT_PATH
+        return self.OBSIDIAN_MAIN_VAULT_PATH
+
+
+class ProfileRegistry:
+    """Resolves profile names and bearer tokens to profiles."""
+
+    def __init__(
+        self,
+        profiles: Dict[str, Profile],
+        default: str,
+        source: Optional[str] = None,
+        source_mtime: Optional[float] = None,
+    ):
+        self.profiles = profiles
+        self.default = default
+        # Profiles file and its modification time when loaded, if any
+        self.source = source
+        self.source_mtime = source_mtime
+        self._by_token = {
+            token: profile for profile in profiles.values() for token in profile.tokens
+        }
+
+    @classmethod
+    def from_settings(cls, settings=None) -> "ProfileRegistry":
+        settings = settings or get_settings()
+        profiles = {
+            settings.ORCHESTRA_DEFAULT_PROFILE: Profile(
+                name=settings.ORCHESTRA_DEFAULT_PROFILE,
+                OBSIDIAN_EXERCISE_VAULT_PATH=settings.OBSIDIAN_EXERCISE_VAULT_PATH,
+                OBSIDIAN_MAIN_VAULT_PATH=settings.OBSIDIAN_MAIN_VAULT_PATH,
+            )
+        }
+        source = settings.ORCHESTRA_PROFILES_FILE
+        source_mtime = None
+        if source:
+            source_mtime = os.stat(source).st_mtime
+            raw = json.loads(Path(source).read_text(encoding="utf-8"))
+            for name, values in raw.items():
+                profiles[name] = _load_profile(source, name, values)
+        return cls(profiles, settings.ORCHESTRA_DEFAULT_PROFILE, source, source_mtime)
+
+    def resolve(
+        self, name: Optional[str] = None, token: Optional[str] = None
+    ) -> Profile:
+        """
+        Resolve a profile from an explicit name and/or a bearer token.
+
+        A token alone selects its profile. A name alone selects a profile only
+        if that profile is not token-protected. With neither, the default
+        profile is returned.
+        """
+        if token is not None:
+            profile = self._by_token.get(token)
+            if profile is None:
+                raise ProfileAuthError("Invalid profile token")
+            if name is not None and name != profile.name:
+                raise ProfileAuthError(f"Token does not grant profile '{name}'")
+            return profile
+
+        profile = self.profiles.get(name or self.default)
+        if profile is None:
+            raise UnknownProfileError(name)
+        if profile.tokens:
+            raise ProfileAuthError(f"Profile '{profile.name}' requires a token")
+        return profile
+
+
+def _load_profile(source: str, name: str, values) -> Profile:
+    if not isinstance(values, dict):
+        raise ProfileConfigError(f"Profile '{name}' in {source} is not an object")
+    if "name" in values:
+        raise ProfileConfigError(
+            f"Profile '{name}' in {source} has a \"name\" key; "
+            "a profile is named by its key"
+        )
+    try:
+        return Profile(name=name, **values)
+    except ValidationError as e:
+        raise ProfileConfigError(f"Profile '{name}' in {source} is invalid: {e}")
+
+
+# Singleton pattern for the profile registry
+_registry = None
+
+
+def _rebuild_registry(old, new, changed):
+    # An invalid profiles file raises here and the previous registry stays
+    global _registry
+    if changed & REGISTRY_SETTINGS:
+        _registry = ProfileRegistry.from_settings(new)
+
+
+def get_profile_registry() -> ProfileRegistry:
+    global _registry
+    if _registry is None:
+        _registry = ProfileRegistry.from_settings()
+        get_settings_service().subscribe(_rebuild_registry)
+    return _registry
@@ -1,26 +1,270 @@
+"""
+Application settings.
+
+Settings come from the environment and the .env file. get_settings() returns
+an immutable snapshot; the settings service builds a new one when .env or the
+profiles file changes and swaps it in whole, so a reader sees either the old
+or the new settings, never a mix. A change that fails validation is logged
+and the previous snapshot stays in place.
+
+Components holding state derived from settings subscribe to the service and
+update only what a change touches (see SettingsService.subscribe()). Settings
+in RESTART_REQUIRED are read once at startup.
+"""
+
+import logging
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Set
+
+from pydantic import ValidationError
 from pydantic_settings import BaseSettings
-from dotenv import load_dotenv
+from dotenv import dotenv_values
+
+logger = logging.getLogger(__name__)
 
-# Load environment variables from .env file
-load_dotenv()
+ENV_FILE = ".env"
+
+# Read once at startup; changing them takes a restart
+RESTART_REQUIRED = {
+    "ORCHESTRA_PROFILING",
+    "ORCHESTRA_PROFILE_DIR",
+    "ORCHESTRA_PROFILE_RETENTION",
+    "ORCHESTRA_WORKERS",
+    "ORCHESTRA_STATE_DIR",
+}
 
 
 class Settings(BaseSettings):
     OBSIDIAN_EXERCISE_VAULT_PATH: str
     OBSIDIAN_MAIN_VAULT_PATH: str
 
+    # Optional JSON file mapping profile names to their own vault paths
+    ORCHESTRA_PROFILES_FILE: Optional[str] = None
+    ORCHESTRA_DEFAULT_PROFILE: str = "default"
+
+    # Opt-in request profiling (X-Debug-Profile header or ?debug_profile=1)
+    ORCHESTRA_PROFILING: bool = False
+    ORCHESTRA_PROFILE_DIR: Optional[str] = None  # defaults to a temp directory
+    ORCHESTRA_PROFILE_RETENTION: int = 20
+
+    # Admission control (0 disables a limit)
+    ORCHESTRA_RATE_LIMIT: float = 50.0  # requests/s that trigger work, all clients
+    ORCHESTRA_RATE_BURST: int = 100
+    ORCHESTRA_CLIENT_RATE_LIMIT: float = 10.0  # requests/s per client
+    ORCHESTRA_CLIENT_RATE_BURST: int = 20
+    ORCHESTRA_MAX_LANE_DEPTH: int = 32  # automations queued or running per lane
+    ORCHESTRA_MAX_PENDING_DISPATCH: int = 16  # voice commands awaiting dispatch
+
+    # Production server (run_server.py --production sets both)
+    ORCHESTRA_WORKERS: int = 1  # API worker processes sharing the limits above
+    ORCHESTRA_STATE_DIR: Optional[str] = None  # shared state for several workers
+
+    # Seconds between background readiness checks (GET /api/v1/ready)
+    ORCHESTRA_READY_INTERVAL: float = 5.0
+
+    # Seconds between checks of .env and the profiles file for changes (0: off)
+    ORCHESTRA_SETTINGS_POLL_INTERVAL: float = 1.0
+
+    # Voice input for the CLI: "mic", "-" (raw PCM on stdin) or a WAV/PCM file
+    ORCHESTRA_AUDIO_SOURCE: Optional[str] = None  # unset: typed commands
+    ORCHESTRA_AUDIO_SAMPLE_RATE: int = 16000  # for the microphone and raw PCM
+    ORCHESTRA_ASR_BACKEND: str = "openai"  # or "scripted" (see audio/asr.py)
+    ORCHESTRA_MAX_AUDIO_UPLOAD_MB: int = 256  # POST /api/v1/voice-audio (0: no limit)
+    ORCHESTRA_MAX_AUDIO_UPLOADS: int = 4  # transcribed at once, read at startup
+    # Wake phrase gate (see audio/wake.py): a directory of WAV recordings of
+    # the phrase; unset, every utterance is transcribed
+    ORCHESTRA_WAKE_TEMPLATES: Optional[str] = None
+    ORCHESTRA_WAKE_PHRASE: str = "orchestra"  # removed from transcripts
+    ORCHESTRA_WAKE_SENSITIVITY: float = 0.5  # 0-1, higher accepts more
+    ORCHESTRA_WAKE_FOLLOW_UP: float = 5.0  # seconds to answer a bare wake phrase
+
+    # Agent mode of the interactive CLI (see actions/agent_session.py)
+    ORCHESTRA_AGENT_KEEPALIVE: float = 30.0  # idle seconds between pings (0: off)
+    ORCHESTRA_AGENT_SPECULATE: bool = True  # resolve commands while typed
+
+    # FL Studio automations
+    FL_ASSETS_DIR: str = "assets"  # Directory for reference images
+    FL_STUDIO_PATH: str = "FL Studio 2024"
+    FL_PROJECT_NAME: str = "DRUMS.flp"
+    FL_AUDIO_DEVICE: str = "AIR 192 4"
+    FL_LAUNCH_TIMEOUT: int = 60  # max seconds to wait for FL Studio to become ready
+
     class Config:
-        env_file = ".env"
+        env_file = ENV_FILE
         env_file_encoding = "utf-8"
         extra = "allow"
+        frozen = True
+
+
+# (old settings, new settings, names of the settings that changed)
+SettingsCallback = Callable[[Settings, Settings, Set[str]], None]
+
+
+class SettingsService:
+    """Holds the current settings snapshot and reloads it when files change."""
+
+    def __init__(self, env_file: str = ENV_FILE):
+        self.env_file = env_file
+        self.reloads = 0
+        self.last_error: Optional[str] = None
+        self._env_keys: Set[str] = set()  # os.environ keys that came from .env
+        self._current: Optional[Settings] = None
+        self._mtimes: Dict[str, Optional[float]] = {}
+        self._subscribers: List[SettingsCallback] = []
+        self._lock = threading.RLock()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._apply_env_file()
+
+    @property
+    def current(self) -> Settings:
+        if self._current is None:
+            with self._lock:
+                if self._current is None:
+                    self._current = Settings()
+                    self._mtimes = self._watched_mtimes(self._current)
+        return self._current
+
+    def subscribe(self, callback: SettingsCallback):
+        """
+        Call callback(old, new, changed) after every swap, in order, on the
+        thread that reloaded. An exception is logged and does not undo the swap.
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+    # Loading
+
+    def _apply_env_file(self) -> Dict[str, Optional[str]]:
+        """
+        Copy .env into os.environ, without overriding variables set elsewhere.
+        Returns the previous values of the variables it changed.
+        """
+        values = dotenv_values(self.env_file) if os.path.exists(self.env_file) else {}
+        previous: Dict[str, Optional[str]] = {}
+        keys = set()
+        for key, value in values.items():
+            if value is None or (key in os.environ and key not in self._env_keys):
+                continue
+            keys.add(key)
+            if os.environ.get(key) != value:
+                previous[key] = os.environ.get(key)
+                os.environ[key] = value
+        for key in self._env_keys - keys:  # removed from .env
+            previous[key] = os.environ.pop(key, None)
+        self._env_keys = keys
+        return previous
+
+    def _watched_mtimes(self, settings: Settings) -> Dict[str, Optional[float]]:
+        paths = [self.env_file]
+        if settings.ORCHESTRA_PROFILES_FILE:
+            paths.append(settings.ORCHESTRA_PROFILES_FILE)
+        mtimes = {}
+        for path in paths:
+            try:
+                mtimes[path] = os.stat(path).st_mtime
+            except OSError:
+                mtimes[path] = None
+        return mtimes
+
+    def reload(self) -> bool:
+        """
+        Re-read .env and the environment and swap in the new settings. Returns
+        False if they failed validation, in which case nothing changes.
+        """
+        with self._lock:
+            old = self.current
+            env_keys = set(self._env_keys)
+            previous = self._apply_env_file()
+            try:
+                new = Settings()
+            except ValidationError as e:
+                for key, value in previous.items():
+                    if value is None:
+                        os.environ.pop(key, None)
+                    else:
+                        os.environ[key] = value
+                self._env_keys = env_keys
+                self._mtimes = self._watched_mtimes(old)
+                self.last_error = str(e)
+                logger.error(f"Settings change rejected, keeping previous: {str(e)}")
+                return False
+            mtimes = self._watched_mtimes(new)
+            changed = {
+                name
+                for name in Settings.model_fields
+                if getattr(old, name) != getattr(new, name)
+            }
+            if new.ORCHESTRA_PROFILES_FILE and mtimes.get(
+                new.ORCHESTRA_PROFILES_FILE
+            ) != self._mtimes.get(new.ORCHESTRA_PROFILES_FILE):
+                changed.add("ORCHESTRA_PROFILES_FILE")  # same file, new contents
+            self._current, self._mtimes, self.last_error = new, mtimes, None
+            if changed:
+                self._notify(old, new, changed)
+        return True
+
+    def _notify(self, old: Settings, new: Settings, changed: Set[str]):
+        self.reloads += 1
+        logger.info(f"Settings reloaded: {', '.join(sorted(changed))}")
+        if changed & RESTART_REQUIRED:
+            logger.warning(
+                f"Restart to apply: {', '.join(sorted(changed & RESTART_REQUIRED))}"
+            )
+        for callback in self._subscribers:
+            try:
+                callback(old, new, changed)
+            except Exception as e:
+                logger.error(f"Settings subscriber failed: {str(e)}")
+
+    def poll(self) -> bool:
+        """Reload if .env or the profiles file changed. Returns True if it did."""
+        if self._watched_mtimes(self.current) == self._mtimes:
+            return False
+        self.reload()
+        return True
+
+    # Watching
+
+    def start(self):
+        """
+        Poll for changes every ORCHESTRA_SETTINGS_POLL_INTERVAL seconds, until
+        stopped or the interval is set to 0.
+        """
+        if (
+            self._thread is not None
+            or not self.current.ORCHESTRA_SETTINGS_POLL_INTERVAL
+        ):
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._loop, name="settings-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def _loop(self):
+        while True:
+            interval = self.current.ORCHESTRA_SETTINGS_POLL_INTERVAL
+            if not interval or self._stopping.wait(interval):
+                return
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"Settings watcher failed: {str(e)}")
+
+    def stop(self):
+        self._stopping.set()
+        self._thread = None
+
+
+# Loading .env at import keeps it in os.environ for libraries that read it
+_service = SettingsService()
 
 
-# Singleton pattern for settings
-_settings = None
+def get_settings_service() -> SettingsService:
+    return _service
 
 
-def get_settings():
-    global _settings
-    if _settings is None:
-        _settings = Settings()
-    return _settings
+def get_settings() -> Settings:
+    return _service.current
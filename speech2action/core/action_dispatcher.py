@@ -1,35 +1,27 @@
 import asyncio
-from speech2action.actions.flstudio_automation import open_drum_session
-from speech2action.actions.obsidian_automation import (
-    create_gym_dir,
-    create_daily_note,
-    create_tomorrow_note,
-    create_today_running_note,
-    create_today_stairclimbing_note,
-    create_today_mobility_note,
-    create_today_cycling_note,
-)
-from speech2action.actions.spell_book import list_spells
+from speech2action.actions.registry import ACTION_REGISTRY, run_action
 from speech2action.actions.manager_agent import process_command, process_command_async
+from speech2action.core.profiling import bind_profile, profiled
 
 
-async def dispatch_action_async(command, use_agent=False):
+async def dispatch_action_async(command, use_agent=False, settings=None):
     """
     Async version of dispatch_action that properly handles agent operations.
 
     Args:
         command: The parsed command dict or command text
         use_agent: Whether to use the OpenAI Agents SDK (default: False)
+        settings: Profile whose vaults the automations use (defaults to .env)
     """
     if use_agent:
         # Use the async version for agent processing
         if isinstance(command, str):
-            result = await process_command_async(command)
+            result = await process_command_async(command, settings)
         elif isinstance(command, dict) and "result" in command:
             result = command["result"]
         else:
             action = command.get("action", "")
-            result = await process_command_async(action)
+            result = await process_command_async(action, settings)
 
         if result.get("success"):
             print(result["message"])
@@ -39,10 +31,12 @@ async def dispatch_action_async(command, use_agent=False):
 
     # For traditional mode, run in thread pool to avoid blocking
     loop = asyncio.get_event_loop()
-    await loop.run_in_executor(None, _dispatch_traditional, command)
+    await loop.run_in_executor(
+        None, bind_profile(_dispatch_traditional), command, settings
+    )
 
 
-def _dispatch_traditional(command):
+def _dispatch_traditional(command, settings=None):
     """Helper function to handle traditional command dispatch."""
     # Check if result is already included (from manager agent)
     if isinstance(command, dict) and "result" in command:
@@ -52,35 +46,21 @@ def _dispatch_traditional(command):
 
     # Traditional action dispatch
     action = command.get("action")
-    if action == "list_spells":
-        list_spells()
-    elif action == "create_gym_dir":
-        create_gym_dir()
-    elif action == "create_daily_note":
-        create_daily_note()
-    elif action == "create_tomorrow_note":
-        create_tomorrow_note()
-    elif action == "create_today_running_note":
-        create_today_running_note()
-    elif action == "create_today_stairclimbing_note":
-        create_today_stairclimbing_note()
-    elif action == "create_today_mobility_note":
-        create_today_mobility_note()
-    elif action == "create_today_cycling_note":
-        create_today_cycling_note()
-    elif action == "spell_studio" or action == "open_drum_session":
-        open_drum_session()
+    if action in ACTION_REGISTRY:
+        run_action(action, settings)
     else:
         print(f"No automation implemented for action: {action}")
 
 
-def dispatch_action(command, use_agent=False):
+@profiled
+def dispatch_action(command, use_agent=False, settings=None):
     """
     Dispatches the command to the appropriate automation function.
 
     Args:
         command: The parsed command dict or command text
         use_agent: Whether to use the OpenAI Agents SDK (default: False)
+        settings: Profile whose vaults the automations use (defaults to .env)
     """
     # If use_agent is True, we need to run this in an async context
     if use_agent:
@@ -93,12 +73,12 @@ def dispatch_action(command, use_agent=False):
 
                 if isinstance(command, str):
                     # Run the sync version since we have a clean event loop
-                    result = process_command(command)
+                    result = process_command(command, settings)
                 elif isinstance(command, dict) and "result" in command:
                     result = command["result"]
                 else:
                     action = command.get("action", "")
-                    result = process_command(action)
+                    result = process_command(action, settings)
 
                 if result.get("success"):
                     print(result["message"])
@@ -111,10 +91,10 @@ def dispatch_action(command, use_agent=False):
         # Run in a separate thread
         import threading
 
-        thread = threading.Thread(target=run_agent)
+        thread = threading.Thread(target=bind_profile(run_agent))
         thread.start()
         thread.join()
         return
 
     # Traditional mode - run directly
-    _dispatch_traditional(command)
+    _dispatch_traditional(command, settings)
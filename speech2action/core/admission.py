@@ -0,0 +1,219 @@
+"""
+Admission control for automation requests.
+
+Work is refused up front instead of being queued without bound:
+
+- rate limits: a global token bucket and one per client IP address for
+  requests that trigger work -> 429
+- lane depth: automations queued or running per resource lane (each vault
+  lane and the GUI worker) -> 503
+- dispatch slots: voice commands waiting for background dispatch (parsing,
+  agent runs and their automations) -> 503
+
+A refusal raises AdmissionRejected with a Retry-After hint, which the API
+turns into a response, and counts it in orchestra_requests_shed_total.
+Every check is a few dictionary lookups and never blocks. Limits come from
+settings and follow changes to them; 0 disables a limit.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from speech2action.core.metrics import get_metrics
+
+MAX_TRACKED_CLIENTS = 10000  # per-client buckets kept, least recently used evicted
+SATURATED_RETRY_AFTER = 1  # seconds suggested when a lane or dispatch is full
+
+SHED_METRIC = "orchestra_requests_shed_total"
+
+# Settings the limits are computed from
+LIMIT_SETTINGS = {
+    "ORCHESTRA_RATE_LIMIT",
+    "ORCHESTRA_RATE_BURST",
+    "ORCHESTRA_CLIENT_RATE_LIMIT",
+    "ORCHESTRA_CLIENT_RATE_BURST",
+    "ORCHESTRA_MAX_LANE_DEPTH",
+    "ORCHESTRA_MAX_PENDING_DISPATCH",
+    "ORCHESTRA_WORKERS",
+}
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is refused by admission control."""
+
+    def __init__(self, status_code: int, reason: str, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.reason = reason
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Refills at rate tokens per second up to burst; each request takes one."""
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        """Take a token. Returns 0 on success, else seconds until one is available."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class AdmissionController:
+    """Rate limits, lane depth limits and dispatch slots."""
+
+    def __init__(
+        self,
+        rate: float = 0,
+        burst: int = 0,
+        client_rate: float = 0,
+        client_burst: int = 0,
+        max_lane_depth: int = 0,
+        max_pending_dispatch: int = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.clock = clock
+        self.pending_dispatch = 0
+        self._clients: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.configure(
+            rate, burst, client_rate, client_burst, max_lane_depth, max_pending_dispatch
+        )
+
+    def configure(
+        self,
+        rate: float = 0,
+        burst: int = 0,
+        client_rate: float = 0,
+        client_burst: int = 0,
+        max_lane_depth: int = 0,
+        max_pending_dispatch: int = 0,
+    ):
+        """Set new limits. Rate limit buckets restart full; dispatch slots in use stay."""
+        with self._lock:
+            self.client_rate = client_rate
+            self.client_burst = client_burst or max(1, math.ceil(client_rate))
+            self.max_lane_depth = max_lane_depth
+            self.max_pending_dispatch = max_pending_dispatch
+            self._global = (
+                TokenBucket(rate, burst or max(1, math.ceil(rate)), self.clock())
+                if rate
+                else None
+            )
+            self._clients.clear()
+
+    @staticmethod
+    def settings_limits(settings) -> Dict[str, Any]:
+        # Each worker process admits its share of the global rate. A client's
+        # keep-alive connection stays on one worker, so per-client limits apply
+        # per worker, as do vault lane depths (the GUI queue is shared).
+        workers = max(1, settings.ORCHESTRA_WORKERS)
+        return {
+            "rate": settings.ORCHESTRA_RATE_LIMIT / workers,
+            "burst": math.ceil(settings.ORCHESTRA_RATE_BURST / workers),
+            "client_rate": settings.ORCHESTRA_CLIENT_RATE_LIMIT,
+            "client_burst": settings.ORCHESTRA_CLIENT_RATE_BURST,
+            "max_lane_depth": settings.ORCHESTRA_MAX_LANE_DEPTH,
+            "max_pending_dispatch": settings.ORCHESTRA_MAX_PENDING_DISPATCH,
+        }
+
+    @classmethod
+    def from_settings(cls, settings) -> "AdmissionController":
+        return cls(**cls.settings_limits(settings))
+
+    def _reject(
+        self, status_code: int, reason: str, detail: str, wait: float
+    ) -> AdmissionRejected:
+        get_metrics().inc(SHED_METRIC, reason=reason)
+        return AdmissionRejected(status_code, reason, detail, max(1, math.ceil(wait)))
+
+    def admit(self, client: str):
+        """Take a token from the client's bucket and the global one."""
+        with self._lock:
+            now = self.clock()
+            if self.client_rate:
+                bucket = self._clients.get(client)
+                if bucket is None:
+                    bucket = TokenBucket(self.client_rate, self.client_burst, now)
+                    self._clients[client] = bucket
+                    if len(self._clients) > MAX_TRACKED_CLIENTS:
+                        self._clients.popitem(last=False)
+                else:
+                    self._clients.move_to_end(client)
+                wait = bucket.take(now)
+                if wait:
+                    raise self._reject(
+                        429, "client_rate", "Too many requests from this client", wait
+                    )
+            if self._global is not None:
+                wait = self._global.take(now)
+                if wait:
+                    raise self._reject(429, "global_rate", "Server is busy", wait)
+
+    def check_lane(self, lane: str, depth: int, count: int = 1):
+        """Refuse count more jobs on a lane that already holds depth jobs."""
+        if self.max_lane_depth and depth + count > self.max_lane_depth:
+            raise self._reject(
+                503,
+                "lane_full",
+                f"Too many automations queued on {lane.split(':')[0]} lane",
+                SATURATED_RETRY_AFTER,
+            )
+
+    def acquire_dispatch(self):
+        """Reserve a background dispatch slot; pair with release_dispatch()."""
+        with self._lock:
+            if (
+                self.max_pending_dispatch
+                and self.pending_dispatch >= self.max_pending_dispatch
+            ):
+                raise self._reject(
+                    503,
+                    "dispatch_full",
+                    "Too many voice commands in progress",
+                    SATURATED_RETRY_AFTER,
+                )
+            self.pending_dispatch += 1
+
+    def release_dispatch(self):
+        with self._lock:
+            self.pending_dispatch -= 1
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "tracked_clients": len(self._clients),
+            "pending_dispatch": self.pending_dispatch,
+            "max_pending_dispatch": self.max_pending_dispatch,
+            "max_lane_depth": self.max_lane_depth,
+        }
+
+
+# Singleton pattern for the admission controller
+_controller: Optional[AdmissionController] = None
+
+
+def _reconfigure(old, new, changed):
+    if changed & LIMIT_SETTINGS:
+        _controller.configure(**AdmissionController.settings_limits(new))
+
+
+def get_admission_controller() -> AdmissionController:
+    global _controller
+    if _controller is None:
+        from speech2action.config.settings import get_settings, get_settings_service
+
+        _controller = AdmissionController.from_settings(get_settings())
+        get_settings_service().subscribe(_reconfigure)
+    return _controller
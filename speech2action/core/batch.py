@@ -0,0 +1,255 @@
+"""
+Non-interactive batch mode for the CLI (python -m speech2action.main --batch).
+
+Commands are read one per line (blank lines and lines starting with # are
+skipped) and up to `concurrency` of them are handled at a time. A command
+is resolved from the parser's trigger phrases first and by the agent only
+when none matches (or always by the agent with use_agent), then queued on
+its vault lane or the GUI worker like an API request. Commands are queued
+in file order, so automations sharing a vault, or the GUI, still run in the
+order written, while resolution, including slow agent calls, overlaps.
+
+Each result is printed as it finishes, followed by throughput and latency
+percentiles for the whole batch (or a JSON report, with the automations'
+own output moved to stderr). A command's latency runs from when it starts
+resolving until its automation has finished, including any wait for the
+commands before it to be queued.
+"""
+
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from speech2action.actions.manager_agent import process_command
+from speech2action.actions.registry import ACTION_REGISTRY, submit_action
+from speech2action.core.admission import AdmissionRejected
+from speech2action.core.command_parser import match_trigger, parse_command
+from speech2action.gui.worker import GuiJob
+
+DEFAULT_CONCURRENCY = 4
+
+
+@dataclass
+class CommandResult:
+    index: int  # line of the command among the commands read, from 0
+    command: str
+    resolved_by: str  # "trigger" or "agent"
+    status: str  # succeeded, failed, unrecognized, rejected or cancelled
+    message: str
+    action: Optional[str] = None
+    job_id: Optional[str] = None
+    resolve_seconds: float = 0.0
+    latency: float = 0.0  # resolving to finished
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "succeeded"
+
+
+def read_commands(lines: Iterable[str]) -> List[str]:
+    commands = []
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            commands.append(line)
+    return commands
+
+
+class _Turnstile:
+    """Lets numbered callers through in order: caller n waits for 0..n-1."""
+
+    def __init__(self):
+        self._next = 0
+        self._passed = set()
+        self._turn = threading.Condition()
+
+    def wait(self, index: int):
+        with self._turn:
+            self._turn.wait_for(lambda: self._next == index)
+
+    def done(self, index: int):
+        """index has gone through, or will not (which never blocks)."""
+        with self._turn:
+            self._passed.add(index)
+            while self._next in self._passed:
+                self._passed.remove(self._next)
+                self._next += 1
+            self._turn.notify_all()
+
+
+def run_command(
+    index: int, text: str, use_agent: bool, turnstile: _Turnstile
+) -> CommandResult:
+    started = time.perf_counter()
+    result = {"index": index, "command": text, "resolved_by": "agent"}
+    took_turn = use_agent  # nothing is queued in agent mode
+    try:
+        if use_agent:
+            # The agent resolves the command and runs the automation itself
+            outcome = process_command(text)
+            result["action"] = outcome.get("action")
+            result["resolve_seconds"] = time.perf_counter() - started
+            status = "succeeded" if outcome.get("success") else "failed"
+            return _finish(result, started, status, outcome.get("message", ""))
+
+        result["resolved_by"] = "trigger" if match_trigger(text) else "agent"
+        command = parse_command(text)
+        result["resolve_seconds"] = time.perf_counter() - started
+        if not command:
+            return _finish(result, started, "unrecognized", "No recognized command")
+        action = result["action"] = command.get("action")
+        if "result" in command:
+            # The agent already ran the automation while parsing
+            outcome = command["result"]
+            status = "succeeded" if outcome.get("success") else "failed"
+            return _finish(result, started, status, outcome.get("message", ""))
+        if action not in ACTION_REGISTRY:
+            message = f"No automation implemented for action: {action}"
+            return _finish(result, started, "unrecognized", message)
+
+        # Queue in file order; earlier commands are already resolving
+        turnstile.wait(index)
+        took_turn = True
+        try:
+            future = submit_action(action)
+        finally:
+            turnstile.done(index)
+        result["job_id"] = future.job_id
+        outcome = future.result()
+        status, message = "succeeded", f"{action} completed"
+        if isinstance(outcome, GuiJob):
+            status, message = outcome.status, outcome.message
+        return _finish(result, started, status, message)
+    except AdmissionRejected as e:
+        return _finish(result, started, "rejected", e.detail)
+    except Exception as e:
+        return _finish(result, started, "failed", f"Error: {str(e)}")
+    finally:
+        if not took_turn:
+            turnstile.done(index)  # queued nothing
+
+
+def _finish(
+    result: Dict[str, Any], started: float, status: str, message: str
+) -> CommandResult:
+    return CommandResult(
+        **result,
+        status=status,
+        message=message,
+        latency=time.perf_counter() - started,
+    )
+
+
+def run_batch(
+    commands: List[str],
+    use_agent: bool = False,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    on_result: Optional[Callable[[CommandResult], None]] = None,
+):
+    """Run commands with at most concurrency in flight; returns (results, wall seconds)."""
+    turnstile = _Turnstile()
+    results: List[Optional[CommandResult]] = [None] * len(commands)
+    lock = threading.Lock()
+
+    def handle(index: int, text: str):
+        result = run_command(index, text, use_agent, turnstile)
+        with lock:
+            results[index] = result
+            if on_result is not None:
+                on_result(result)
+
+    started = time.perf_counter()
+    # Tasks start in submission order, so a command waiting for its turn
+    # only ever waits for commands that are already running
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        for index, text in enumerate(commands):
+            pool.submit(handle, index, text)
+    return results, time.perf_counter() - started
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def summarize(results: List[CommandResult], wall: float) -> Dict[str, Any]:
+    latencies = [r.latency for r in results]
+    statuses: Dict[str, int] = {}
+    for r in results:
+        statuses[r.status] = statuses.get(r.status, 0) + 1
+    resolvers = {}
+    for tier in ("trigger", "agent"):
+        times = [r.resolve_seconds for r in results if r.resolved_by == tier]
+        if times:
+            resolvers[tier] = {
+                "count": len(times),
+                "p50_ms": round(_percentile(times, 0.5) * 1000, 3),
+            }
+    return {
+        "commands": len(results),
+        "statuses": statuses,
+        "wall_seconds": round(wall, 3),
+        "throughput": round(len(results) / wall, 2) if wall else 0.0,
+        "latency_ms": {
+            name: round(_percentile(latencies, q) * 1000, 3)
+            for name, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99), ("max", 1.0))
+        },
+        "resolved_by": resolvers,
+    }
+
+
+def format_result(result: CommandResult) -> str:
+    mark = "✅" if result.ok else "❌"
+    return (
+        f"{mark} [{result.index:>3}] {result.status:<12} {result.action or '-':<32} "
+        f"{result.latency * 1000:>9.1f} ms  {result.command}"
+    )
+
+
+def print_summary(summary: Dict[str, Any]):
+    statuses = ", ".join(f"{n} {s}" for s, n in sorted(summary["statuses"].items()))
+    latency = summary["latency_ms"]
+    print(
+        f"\n{summary['commands']} commands in {summary['wall_seconds']:.2f}s: "
+        f"{summary['throughput']:.1f} commands/s ({statuses})"
+    )
+    print(
+        f"latency p50 {latency['p50']:.1f} ms, p95 {latency['p95']:.1f} ms, "
+        f"p99 {latency['p99']:.1f} ms, max {latency['max']:.1f} ms"
+    )
+    resolvers = ", ".join(
+        f"{tier} {r['count']} (p50 {r['p50_ms']:.1f} ms)"
+        for tier, r in summary["resolved_by"].items()
+    )
+    print(f"resolved by: {resolvers}")
+
+
+def batch_main(
+    lines: Iterable[str],
+    use_agent: bool = False,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    as_json: bool = False,
+) -> int:
+    """Run a batch from the CLI; exit status 1 if any command did not succeed."""
+    commands = read_commands(lines)
+    if as_json:
+        # Automations print as they run; keep stdout for the report
+        with redirect_stdout(sys.stderr):
+            results, wall = run_batch(commands, use_agent, concurrency)
+    else:
+        on_result = lambda r: print(format_result(r), flush=True)  # noqa: E731
+        results, wall = run_batch(commands, use_agent, concurrency, on_result)
+    summary = summarize(results, wall)
+    if as_json:
+        report = {"results": [asdict(r) for r in results], "summary": summary}
+        print(json.dumps(report, indent=2))
+    else:
+        print_summary(summary)
+    return 0 if all(r.ok for r in results) else 1
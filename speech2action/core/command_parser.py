@@ -1,33 +1,51 @@
 from speech2action.actions.manager_agent import get_command_from_text
+from speech2action.actions.registry import metric_action
+from speech2action.core.metrics import get_metrics
 
 
-def parse_command(transcript):
+def parse_command(transcript, settings=None):
     """
     Parses the transcript for known trigger phrases using the manager agent.
     Returns a command dict or None.
+    The settings profile is passed to the agent, whose tools act on its vaults.
     """
+    with get_metrics().timed("parse") as timer:
+        command = _match_command(transcript, settings)
+        timer.action = metric_action(command.get("action")) if command else "none"
+    return command
+
+
+# Trigger phrases and their actions, checked in order: the first rule with a
+# phrase anywhere in the transcript wins (legacy fallback parsing, kept for
+# backward compatibility; see also intent_stream.py)
+TRIGGER_RULES = [
+    (("spell book", "list spells", "show spells"), "list_spells"),
+    (("gym", "muscle up"), "create_gym_dir"),
+    (("tomorrow",), "create_tomorrow_note"),
+    (("day",), "create_daily_note"),
+    (("running", "run"), "create_today_running_note"),
+    (("climbing", "stairs"), "create_today_stairclimbing_note"),
+    (("mobility",), "create_today_mobility_note"),
+    (("studio", "fl studio", "music studio"), "spell_studio"),
+    (("cycling", "bike"), "create_today_cycling_note"),
+]
+
+
+def match_trigger(transcript):
+    """The action of the first rule with a trigger phrase in transcript, or None."""
     lower = transcript.lower()
-    # Legacy fallback parsing (for backward compatibility)
-    if "spell book" in lower or "list spells" in lower or "show spells" in lower:
-        return {"action": "list_spells"}
-    if "gym" in lower or "muscle up" in lower:
-        return {"action": "create_gym_dir"}
-    if "tomorrow" in lower:
-        return {"action": "create_tomorrow_note"}
-    if "day" in lower:
-        return {"action": "create_daily_note"}
-    if "running" in lower or "run" in lower:
-        return {"action": "create_today_running_note"}
-    if "climbing" in lower or "stairs" in lower:
-        return {"action": "create_today_stairclimbing_note"}
-    if "mobility" in lower:
-        return {"action": "create_today_mobility_note"}
-    if "studio" in lower or "fl studio" in lower or "music studio" in lower:
-        return {"action": "spell_studio"}
-    if "cycling" in lower or "bike" in lower:
-        return {"action": "create_today_cycling_note"}
+    for phrases, action in TRIGGER_RULES:
+        if any(phrase in lower for phrase in phrases):
+            return action
+    return None
+
+
+def _match_command(transcript, settings=None):
+    action = match_trigger(transcript)
+    if action:
+        return {"action": action}
     # Then try the agent
-    command = get_command_from_text(transcript)
+    command = get_command_from_text(transcript, settings)
     if command:
         return command
     return None
@@ -0,0 +1,329 @@
+"""
+In-process event bus for automation progress.
+
+Actions publish structured events (a job was queued, started or finished, a
+macro step ran, vault files were copied) and subscribers such as the
+/api/v1/events stream receive them. Publishing never blocks on a subscriber:
+each one has a bounded buffer, and when it falls behind its oldest events are
+dropped and counted instead of slowing the automation down.
+
+Events published while a job runs carry its job_id (see job_context()). The
+bus keeps a short history so a reconnecting client can resume after the last
+event id it saw. With several API worker processes, events also go through
+the shared state so every worker's subscribers see all of them (see share()).
+Publishing never waits for the shared state either: events are delivered
+locally first and written by a background thread, and events that cannot be
+written (queue full, database errors) are counted, not raised.
+
+Event types:
+
+    job.queued, job.started      job_id, action, lane
+    job.finished                 job_id, action, lane, status, duration, message
+    macro.step                   macro, step, index, total, duration, waited
+    vault.files_copied           source, target, files, count
+    vault.note_created           path, source
+"""
+
+import asyncio
+import itertools
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from speech2action.core.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUFFER = 256  # events buffered per subscriber before dropping
+HISTORY_SIZE = 256  # recent events kept for Last-Event-ID resumption
+SHARED_POLL_INTERVAL = 0.1  # seconds between reads of other workers' events
+SHARED_QUEUE_SIZE = 1024  # events waiting to be written to the shared state
+SHARED_BATCH = 256  # events written per transaction
+
+_job_id: ContextVar[Optional[str]] = ContextVar("orchestra_job_id", default=None)
+
+
+@dataclass
+class Event:
+    """One published event."""
+
+    id: int
+    type: str
+    time: float
+    data: Dict[str, Any]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "type": self.type, "time": self.time, **self.data}
+
+
+@contextmanager
+def job_context(job_id: str):
+    """Tag events published in the enclosed block with job_id."""
+    token = _job_id.set(job_id)
+    try:
+        yield
+    finally:
+        _job_id.reset(token)
+
+
+class Subscription:
+    """A subscriber's bounded event buffer, readable from a coroutine or thread."""
+
+    def __init__(self, bus: "EventBus", maxsize: int, types: Optional[Tuple[str, ...]]):
+        self.bus = bus
+        self.types = types
+        self.buffer: "deque[Event]" = deque(maxlen=maxsize)
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._waiter: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = None
+        self._ready = threading.Event()
+
+    def wants(self, event: Event) -> bool:
+        return self.types is None or event.type.startswith(self.types)
+
+    def offer(self, event: Event):
+        """Buffer an event, dropping the oldest one when the buffer is full."""
+        with self._lock:
+            full = len(self.buffer) == self.buffer.maxlen
+            if full:
+                self.dropped += 1
+            self.buffer.append(event)
+            waiter, self._waiter = self._waiter, None
+        if full:
+            self.bus.record_drop()
+        if waiter is not None:
+            loop, ready = waiter
+            try:
+                loop.call_soon_threadsafe(ready.set)
+            except RuntimeError:
+                pass  # the subscriber's loop has closed
+        self._ready.set()
+
+    def get_nowait(self) -> Optional[Event]:
+        with self._lock:
+            return self.buffer.popleft() if self.buffer else None
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Event]:
+        """Wait for the next event; None if none arrives within timeout."""
+        with self._lock:
+            if self.buffer:
+                return self.buffer.popleft()
+            ready = asyncio.Event()
+            self._waiter = (asyncio.get_running_loop(), ready)
+        try:
+            await asyncio.wait_for(ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._waiter = None
+        return self.get_nowait()
+
+    def ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until an event is buffered, without consuming it."""
+        with self._lock:
+            if self.buffer:
+                return True
+            self._ready.clear()
+        return self._ready.wait(timeout)
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[Event]:
+        """Blocking get() for subscribers running on a thread."""
+        self.ready(timeout)
+        return self.get_nowait()
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class EventBus:
+    """Fans published events out to subscriber buffers."""
+
+    def __init__(self, history: int = HISTORY_SIZE):
+        self._subscribers: Tuple[Subscription, ...] = ()
+        self._history: "deque[Event]" = deque(maxlen=history)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._shared = None
+        self._shared_ids: Optional["_SharedIds"] = None
+        self._outbox: Optional[queue.Queue] = None
+        self.published = 0
+        self.dropped = 0
+        self.shared_dropped = 0  # not shared: the writer's queue was full
+        self.shared_errors = 0  # not shared: the write failed
+
+    def share(self, state):
+        """
+        Exchange events with other worker processes through the shared state:
+        published events are queued for a writer thread, and a reader thread
+        delivers the events other workers publish to this bus's subscribers.
+        Event ids are then unique across workers (see _SharedIds).
+        """
+        self._shared = state
+        self._shared_ids = _SharedIds(state.register_worker())
+        self._outbox = queue.Queue(SHARED_QUEUE_SIZE)
+        threading.Thread(
+            target=self._write_shared, name="event-bus-writer", daemon=True
+        ).start()
+        threading.Thread(
+            target=self._tail_shared,
+            args=(state.last_event_row(),),
+            name="event-bus-tail",
+            daemon=True,
+        ).start()
+
+    def _write_shared(self):
+        while True:
+            batch = [self._outbox.get()]
+            while len(batch) < SHARED_BATCH:
+                try:
+                    batch.append(self._outbox.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._shared.append_events(
+                    (e.id, e.type, e.time, e.data) for e in batch
+                )
+            except (sqlite3.Error, TypeError, ValueError) as e:
+                self._record_shared_loss("shared_errors", len(batch))
+                logger.warning(f"Could not share {len(batch)} events: {str(e)}")
+
+    def _tail_shared(self, last_row: int):
+        while True:
+            time.sleep(SHARED_POLL_INTERVAL)
+            try:
+                events = self._shared.events_after(last_row)
+            except sqlite3.Error as e:
+                logger.warning(f"Could not read shared events: {str(e)}")
+                continue
+            for row, event_id, origin, type, published_at, data in events:
+                last_row = row
+                if origin != self._shared.pid:
+                    self._deliver(Event(event_id, type, published_at, data))
+
+    def publish(self, type: str, **data: Any) -> Event:
+        """Publish an event to every interested subscriber without blocking."""
+        job_id = _job_id.get()
+        if job_id is not None:
+            data.setdefault("job_id", job_id)
+        now = time.time()
+        if self._shared is None:
+            return self._deliver(Event(next(self._ids), type, now, data))
+        event = self._deliver(Event(self._shared_ids.next(now), type, now, data))
+        try:
+            self._outbox.put_nowait(event)
+        except queue.Full:
+            self._record_shared_loss("shared_dropped", 1)
+        return event
+
+    def _deliver(self, event: Event) -> Event:
+        with self._lock:
+            self._history.append(event)
+            self.published += 1
+            subscribers = self._subscribers
+        for subscription in subscribers:
+            if subscription.wants(event):
+                subscription.offer(event)
+        return event
+
+    def subscribe(
+        self,
+        types: Optional[Iterable[str]] = None,
+        maxsize: int = DEFAULT_BUFFER,
+        last_event_id: Optional[int] = None,
+    ) -> Subscription:
+        """
+        Subscribe to events whose type starts with one of types (all if None).
+        With last_event_id, buffered history after that id is replayed first.
+        """
+        subscription = Subscription(self, maxsize, tuple(types) if types else None)
+        with self._lock:
+            if last_event_id is not None:
+                for event in self._history:
+                    if event.id > last_event_id and subscription.wants(event):
+                        subscription.buffer.append(event)
+            self._subscribers = self._subscribers + (subscription,)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers = tuple(
+                s for s in self._subscribers if s is not subscription
+            )
+
+    def record_drop(self):
+        with self._lock:
+            self.dropped += 1
+        get_metrics().inc("orchestra_events_dropped_total")
+
+    def _record_shared_loss(self, counter: str, count: int):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + count)
+        get_metrics().inc(f"orchestra_events_{counter}_total", count)
+
+    def stats(self) -> Dict[str, Any]:
+        subscribers = self._subscribers
+        return {
+            "published": self.published,
+            "dropped": self.dropped,
+            "shared_dropped": self.shared_dropped,
+            "shared_errors": self.shared_errors,
+            "subscribers": [
+                {
+                    "types": list(s.types) if s.types else None,
+                    "buffered": len(s.buffer),
+                    "dropped": s.dropped,
+                }
+                for s in subscribers
+            ],
+        }
+
+
+class _SharedIds:
+    """
+    Event ids for a worker sharing events with others: milliseconds since
+    the epoch, then 10 bits of the worker's slot in the shared state and a
+    10-bit sequence, so ids from different workers do not collide (unless
+    one of them has outlived 1024 later worker starts) and sort roughly by
+    publishing time. Strictly increasing within a worker.
+    """
+
+    def __init__(self, slot: int):
+        self._slot = (slot & 0x3FF) << 10
+        self._millis = 0
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    def next(self, now: float) -> int:
+        with self._lock:
+            millis = int(now * 1000)
+            if millis > self._millis:
+                self._millis, self._sequence = millis, 0
+            else:
+                self._sequence += 1
+                if self._sequence > 0x3FF:  # borrow the next millisecond
+                    self._millis, self._sequence = self._millis + 1, 0
+            return (self._millis << 20) | self._slot | self._sequence
+
+
+# Singleton pattern for the event bus
+_bus: Optional[EventBus] = None
+
+
+def get_event_bus() -> EventBus:
+    global _bus
+    if _bus is None:
+        _bus = EventBus()
+    return _bus
@@ -0,0 +1,182 @@
+"""
+Incremental trigger matching over partial ASR hypotheses.
+
+A streaming recognizer sends growing, sometimes revised, hypotheses of the
+utterance in progress ("create a", "create a run", "create a running no...").
+StreamingIntentMatcher runs the parser's trigger phrases (TRIGGER_RULES)
+through an Aho-Corasick automaton and keeps the automaton state after every
+character, so each update only rewinds to where the new hypothesis differs
+from the previous one and scans from there.
+
+Matching follows match_trigger() exactly: a trigger phrase counts anywhere
+in the text, including inside a word ("day" in "today"), and the first rule
+with a phrase in the text wins, so on the final transcript the matcher
+always agrees with the parser. A match fires once it has survived
+stable_updates further hypotheses unchanged and no higher-priority trigger
+could be completed by the text in progress ("... note for tomo"). If a
+later hypothesis changes the best action (a revised word, or a
+higher-priority trigger further on), the fired action is cancelled and the
+new one can fire in turn. Later words can always still bring a
+higher-priority trigger, so a fired action is a guess until the final
+transcript; the WebSocket channel only reserves work on it (see
+api/websocket.py).
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from speech2action.core.command_parser import TRIGGER_RULES
+
+FIRE, CANCEL = "fire", "cancel"
+
+
+@dataclass
+class IntentEvent:
+    """An action to start early, or a started one to take back."""
+
+    kind: str  # "fire" or "cancel"
+    action: str
+    trigger: str
+
+
+class TriggerAutomaton:
+    """Aho-Corasick automaton over the trigger phrases of ordered rules."""
+
+    def __init__(self, rules: Sequence[Tuple[Sequence[str], str]] = TRIGGER_RULES):
+        self.actions = [action for _, action in rules]
+        self.triggers: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        # (rule index, trigger index) of every phrase ending in each state
+        self._output: List[List[Tuple[int, int]]] = [[]]
+        self._depth = [0]  # length of the prefix a state stands for
+        # Highest-priority rule with a phrase starting with that prefix
+        self._reach = [len(rules)]
+        for rule, (phrases, _) in enumerate(rules):
+            for phrase in phrases:
+                state = 0
+                for char in phrase:
+                    if char not in self._goto[state]:
+                        self._goto.append({})
+                        self._output.append([])
+                        self._depth.append(self._depth[state] + 1)
+                        self._reach.append(rule)
+                        self._goto[state][char] = len(self._goto) - 1
+                    state = self._goto[state][char]
+                    self._reach[state] = min(self._reach[state], rule)
+                self._output[state].append((rule, len(self.triggers)))
+                self.triggers.append(phrase)
+        self._fail = [0] * len(self._goto)
+        queue = list(self._goto[0].values())
+        for state in queue:  # breadth first, so fail links point to done states
+            for char, child in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._output[child] = (
+                    self._output[child] + self._output[self._fail[child]]
+                )
+                queue.append(child)
+
+    def step(self, state: int, char: str) -> int:
+        while state and char not in self._goto[state]:
+            state = self._fail[state]
+        return self._goto[state].get(char, 0)
+
+    def outputs(self, state: int) -> List[Tuple[int, int]]:
+        return self._output[state]
+
+    def prefixes(self, state: int) -> Iterator[Tuple[int, int]]:
+        """
+        (length, best rule) of every phrase prefix the text read so far ends
+        with, longest first.
+        """
+        while state:
+            yield self._depth[state], self._reach[state]
+            state = self._fail[state]
+
+
+_automaton: Optional[TriggerAutomaton] = None
+
+
+def get_trigger_automaton() -> TriggerAutomaton:
+    global _automaton
+    if _automaton is None:
+        _automaton = TriggerAutomaton()
+    return _automaton
+
+
+class StreamingIntentMatcher:
+    """Tracks one utterance's hypotheses and decides when to fire its action."""
+
+    def __init__(
+        self, automaton: Optional[TriggerAutomaton] = None, stable_updates: int = 1
+    ):
+        self.automaton = automaton or get_trigger_automaton()
+        self.stable_updates = stable_updates
+        self.text = ""
+        self.fired: Optional[str] = None
+        self._fired_trigger = ""
+        self.scanned = 0  # characters fed to the automaton, for measurements
+        self._states = [0]  # automaton state after each character of text
+        # (end position, rule index, trigger index), ordered by end position
+        self._matches: List[Tuple[int, int, int]] = []
+        self._best: Optional[Tuple[int, int, int]] = None
+        self._best_updates = 0  # hypotheses the best match has survived
+
+    def update(self, hypothesis: str) -> List[IntentEvent]:
+        """Feed the latest partial hypothesis; returns what to fire or cancel."""
+        return self._update(hypothesis, final=False)
+
+    def _update(self, hypothesis: str, final: bool) -> List[IntentEvent]:
+        text = hypothesis.lower()
+        common = 0
+        limit = min(len(text), len(self.text))
+        while common < limit and text[common] == self.text[common]:
+            common += 1
+        del self._states[common + 1 :]
+        while self._matches and self._matches[-1][0] > common:
+            self._matches.pop()
+        state = self._states[-1]
+        for position in range(common, len(text)):
+            state = self.automaton.step(state, text[position])
+            self._states.append(state)
+            for rule, trigger in self.automaton.outputs(state):
+                self._matches.append((position + 1, rule, trigger))
+        self.scanned += len(text) - common
+        self.text = text
+
+        best = min(self._matches, key=lambda m: (m[1], m[0]), default=None)
+        if best is not None and best == self._best and best[0] <= common:
+            self._best_updates += 1
+        else:
+            self._best, self._best_updates = best, 0
+
+        events = []
+        action = self.automaton.actions[best[1]] if best else None
+        if self.fired is not None and action != self.fired:
+            events.append(IntentEvent(CANCEL, self.fired, self._fired_trigger))
+            self.fired = None
+        if (
+            self.fired is None
+            and action is not None
+            and self._best_updates >= self.stable_updates
+            and (final or not self._contested(best[1]))
+        ):
+            self.fired, self._fired_trigger = action, self.automaton.triggers[best[2]]
+            events.append(IntentEvent(FIRE, action, self._fired_trigger))
+        return events
+
+    def _contested(self, rule: int) -> bool:
+        """Could the text in progress still complete a trigger of a better rule?"""
+        return any(
+            best_rule < rule
+            for _, best_rule in self.automaton.prefixes(self._states[-1])
+        )
+
+    def finish(self, transcript: str) -> Optional[str]:
+        """The final transcript's action (None: no trigger phrase in it)."""
+        self._update(transcript, final=True)
+        if self._best is None:
+            return None
+        return self.automaton.actions[self._best[1]]
@@ -0,0 +1,127 @@
+"""
+Keyed worker lanes for automation jobs.
+
+Every lane is a single worker thread, so jobs sharing a lane key run one at a
+time in submission order while jobs on different lanes run in parallel. Vault
+automations use one lane per vault path. With several API worker processes a
+lane also holds a file lock while a job runs (see share()).
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from speech2action.core.profiling import (
+    bind_profile,
+    release_if_cancelled,
+    release_unrun,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def vault_lane(settings, vault_type: str) -> str:
+    """Return the lane key for the "exercise" or "main" vault of a profile."""
+    path = (
+        settings.OBSIDIAN_EXERCISE_VAULT_PATH
+        if vault_type == "exercise"
+        else settings.OBSIDIAN_MAIN_VAULT_PATH
+    )
+    return f"vault:{os.path.realpath(path)}"
+
+
+class LaneExecutor:
+    """Runs callables on per-key single-thread lanes."""
+
+    def __init__(self):
+        self._lanes: Dict[str, ThreadPoolExecutor] = {}
+        self._lane_threads: Dict[str, int] = {}
+        self._depths: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._shared = None
+
+    def _get_lane(self, key: str) -> ThreadPoolExecutor:
+        with self._lock:
+            lane = self._lanes.get(key)
+            if lane is None:
+                lane = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix=f"lane-{key}"
+                )
+                self._lanes[key] = lane
+            return lane
+
+    def _run(self, key: str, func: Callable, args, kwargs):
+        self._lane_threads[key] = threading.get_ident()
+        try:
+            if self._shared is None:
+                return func(*args, **kwargs)
+            with self._shared.lane_lock(key):
+                return func(*args, **kwargs)
+        except Exception as e:
+            logger.error(f"Job on lane {key} failed: {str(e)}")
+            raise
+
+    def share(self, state):
+        """Serialize each lane with the same lane in other worker processes."""
+        self._shared = state
+
+    def submit(self, key: str, func: Callable, *args, **kwargs) -> Future:
+        """Queue func on the lane for key and return its future."""
+        func = bind_profile(func)
+        with self._lock:
+            self._depths[key] = self._depths.get(key, 0) + 1
+        try:
+            future = self._get_lane(key).submit(self._run, key, func, args, kwargs)
+        except RuntimeError:
+            self._job_done(key)  # lane already shut down
+            release_unrun(func)
+            raise
+        release_if_cancelled(func, future)
+        future.add_done_callback(lambda _: self._job_done(key))
+        return future
+
+    def _job_done(self, key: str):
+        with self._lock:
+            self._depths[key] -= 1
+
+    def depth(self, key: str) -> int:
+        """Jobs queued or running on the lane for key."""
+        return self._depths.get(key, 0)
+
+    def depths(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._depths)
+
+    def call(self, key: str, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run func on the lane for key and wait for its result.
+        Runs inline when already on that lane, so nested calls cannot deadlock.
+        """
+        if self._lane_threads.get(key) == threading.get_ident():
+            return func(*args, **kwargs)
+        return self.submit(key, func, *args, **kwargs).result()
+
+    async def run(self, key: str, func: Callable, *args, **kwargs) -> Any:
+        """Awaitable version of call() for use on the event loop."""
+        return await asyncio.wrap_future(self.submit(key, func, *args, **kwargs))
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            lanes = list(self._lanes.values())
+            self._lanes.clear()
+        for lane in lanes:
+            lane.shutdown(wait=wait)
+
+
+# Singleton pattern for the lane executor
+_executor = None
+
+
+def get_lane_executor() -> LaneExecutor:
+    global _executor
+    if _executor is None:
+        _executor = LaneExecutor()
+    return _executor
@@ -0,0 +1,215 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+Counters and fixed-bucket latency histograms, labelled per pipeline stage
+and action:
+
+- parse: parse_command (keyword match or agent fallback)
+- agent: one manager agent run, including the tools it calls
+- queue_wait: time an action waited for its lane or the GUI worker
+- execute: time an action ran on its lane or in the GUI worker
+- vault_io: time spent in Obsidian vault file operations
+
+Recording is a dict lookup, a bisect and a few additions under a lock, so it
+is cheap enough for the hot path. Served at GET /metrics; with several
+worker processes their snapshots are summed (see core/shared_state.py).
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+# Upper bounds in seconds, from sub-millisecond file I/O to slow agent runs
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+STAGE_METRIC = "orchestra_stage_seconds"
+
+HELP = {
+    STAGE_METRIC: "Time spent per pipeline stage and action.",
+    "orchestra_actions_total": "Automation actions run, by outcome.",
+    "orchestra_http_requests_total": "HTTP requests served, by method and status.",
+    "orchestra_events_dropped_total": "Progress events dropped for slow subscribers.",
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Fixed-bucket histogram (per-bucket counts, cumulated when rendered)."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class StageTimer:
+    """Context manager that records the time of its block for a stage."""
+
+    __slots__ = ("metrics", "stage", "action", "start")
+
+    def __init__(self, metrics: "Metrics", stage: str, action: str):
+        self.metrics = metrics
+        self.stage = stage
+        self.action = action  # may be set inside the block once it is known
+
+    def __enter__(self) -> "StageTimer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.stage, self.action, time.perf_counter() - self.start)
+        return False
+
+
+def _escape(value) -> str:
+    """A label value escaped for the text exposition format."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels) -> str:
+    return ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+
+
+class Metrics:
+    """Registry of counters and stage histograms."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._stages: Dict[Tuple[str, str], Histogram] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, action: str, seconds: float):
+        """Record a duration for a stage and action."""
+        key = (stage, action)
+        with self._lock:
+            histogram = self._stages.get(key)
+            if histogram is None:
+                histogram = self._stages[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def timed(self, stage: str, action: str = "unknown") -> StageTimer:
+        """Time a block: `with metrics.timed("parse") as t: ...; t.action = ...`."""
+        return StageTimer(self, stage, action)
+
+    def inc(self, name: str, amount: float = 1, **labels: str):
+        """Increment a counter."""
+        key = tuple(labels.items())
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def get_counter(self, name: str, **labels: str) -> float:
+        return self._counters.get(name, {}).get(tuple(labels.items()), 0)
+
+    def get_histogram(self, stage: str, action: str) -> Optional[Histogram]:
+        return self._stages.get((stage, action))
+
+    def snapshot(self) -> Dict:
+        """Plain-data copy of every series, for merging across processes."""
+        with self._lock:
+            return {
+                "stages": [
+                    [stage, action, list(h.counts), h.sum, h.count]
+                    for (stage, action), h in self._stages.items()
+                ],
+                "counters": [
+                    [name, [list(label) for label in labels], value]
+                    for name, series in self._counters.items()
+                    for labels, value in series.items()
+                ],
+            }
+
+    def merge(self, snapshot: Dict):
+        """Add the series of a snapshot() to this registry."""
+        with self._lock:
+            for stage, action, counts, total, count in snapshot["stages"]:
+                histogram = self._stages.get((stage, action))
+                if histogram is None:
+                    histogram = self._stages[(stage, action)] = Histogram(self.buckets)
+                histogram.counts = [a + b for a, b in zip(histogram.counts, counts)]
+                histogram.sum += total
+                histogram.count += count
+            for name, labels, value in snapshot["counters"]:
+                key = tuple(tuple(label) for label in labels)
+                series = self._counters.setdefault(name, {})
+                series[key] = series.get(key, 0) + value
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            stages = [
+                (key, list(h.counts), h.sum, h.count)
+                for key, h in sorted(self._stages.items())
+            ]
+            counters = {
+                name: sorted(series.items()) for name, series in self._counters.items()
+            }
+
+        lines: List[str] = [
+            f"# HELP {STAGE_METRIC} {HELP[STAGE_METRIC]}",
+            f"# TYPE {STAGE_METRIC} histogram",
+        ]
+        bounds = [repr(float(b)) for b in self.buckets] + ["+Inf"]
+        for (stage, action), counts, total, count in stages:
+            labels = _format_labels((("stage", stage), ("action", action)))
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                lines.append(
+                    f'{STAGE_METRIC}_bucket{{{labels},le="{bound}"}} {cumulative}'
+                )
+            lines.append(f"{STAGE_METRIC}_sum{{{labels}}} {total}")
+            lines.append(f"{STAGE_METRIC}_count{{{labels}}} {count}")
+
+        for name in sorted(counters):
+            if name in HELP:
+                lines.append(f"# HELP {name} {HELP[name]}")
+            lines.append(f"# TYPE {name} counter")
+            for labels, value in counters[name]:
+                label_text = f"{{{_format_labels(labels)}}}" if labels else ""
+                lines.append(f"{name}{label_text} {value}")
+        return "\n".join(lines) + "\n"
+
+
+# Singleton pattern for the metrics registry
+_metrics: Optional[Metrics] = None
+
+
+def get_metrics() -> Metrics:
+    global _metrics
+    if _metrics is None:
+        _metrics = Metrics()
+    return _metrics
@@ -0,0 +1,365 @@
+"""
+Opt-in per-request profiling.
+
+When ORCHESTRA_PROFILING is enabled, a request sent with the
+`X-Debug-Profile: 1` header or `?debug_profile=1` query flag runs under
+cProfile: the route on the event loop, the dispatcher in the threadpool and
+the jobs it queues on vault lanes each record a segment, and the segments are
+merged into one profile once the request and all of its jobs have finished.
+Profiles are kept on disk with bounded retention and served as pstats or
+speedscope files under /api/v1/debug/profiles.
+
+The active profile travels in a context variable; code that hands work to
+other threads wraps it with bind_profile(), which returns the callable
+unchanged when no profile is active, and, when the work is queued on an
+executor, passes the future to release_if_cancelled() so a job cancelled
+before it runs does not keep the profile open. Requests without the flag
+never start a profiler.
+
+cProfile sees everything that runs on a thread while a segment is open, so
+the route segment also includes other coroutines the event loop ran during
+the request. GUI jobs run in the GUI worker process and are not profiled.
+
+Up to Python 3.11 every thread can run its own profiler, so segments on the
+event loop and on lanes are recorded side by side. From Python 3.12 cProfile
+is built on sys.monitoring, which allows one profiler per process: a segment
+that starts while another one (of any request) is open is not profiled and
+is listed with "skipped" in the profile's segments. Lane jobs of a profiled
+request then mostly show up in the route segment's wall time only.
+"""
+
+import cProfile
+import functools
+import json
+import logging
+import os
+import pstats
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import parse_qsl
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-debug-profile"
+PROFILE_QUERY_PARAM = "debug_profile"
+MAX_SPEEDSCOPE_EVENTS = 100_000
+MAX_SPEEDSCOPE_DEPTH = 200
+
+_current: ContextVar[Optional["RequestProfile"]] = ContextVar(
+    "orchestra_request_profile", default=None
+)
+_local = threading.local()  # .active is True while a segment runs on a thread
+
+
+class RequestProfile:
+    """Profiler segments recorded for one request and the jobs it started."""
+
+    def __init__(self, store: "ProfileStore", method: str, path: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.store = store
+        self.method = method
+        self.path = path
+        self.started_at = time.time()
+        self.profilers: List[cProfile.Profile] = []
+        self.segments: List[Dict[str, Any]] = []
+        self._pending = 1  # the request itself
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def segment(self, name: str):
+        """Profile the enclosed block on the current thread."""
+        if getattr(_local, "active", False):
+            # Already profiling this thread; cProfile cannot nest
+            yield
+            return
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            profiler.enable()
+        except ValueError as e:
+            # Python 3.12+: another segment holds the process-wide profiler
+            logger.info(f"Profile {self.id}: segment {name} not profiled: {str(e)}")
+            try:
+                yield
+            finally:
+                self._add_segment(name, start, skipped=str(e))
+            return
+        _local.active = True
+        try:
+            yield
+        finally:
+            profiler.disable()
+            _local.active = False
+            with self._lock:
+                self.profilers.append(profiler)
+            self._add_segment(name, start)
+
+    def _add_segment(self, name: str, start: float, skipped: Optional[str] = None):
+        segment = {
+            "name": name,
+            "thread": threading.current_thread().name,
+            "seconds": round(time.perf_counter() - start, 6),
+        }
+        if skipped is not None:
+            segment["skipped"] = skipped
+        with self._lock:
+            self.segments.append(segment)
+
+    def hold(self):
+        """Keep the profile open for a job that has not run yet."""
+        with self._lock:
+            self._pending += 1
+
+    def release(self):
+        """Mark the request or one job as finished; saves after the last one."""
+        with self._lock:
+            self._pending -= 1
+            finished = self._pending == 0
+        if finished:
+            self.store.save(self)
+
+
+def current_profile() -> Optional[RequestProfile]:
+    return _current.get()
+
+
+def activate_profile(profile: RequestProfile):
+    """Make profile the active one in the current context; returns a reset token."""
+    return _current.set(profile)
+
+
+def deactivate_profile(token):
+    _current.reset(token)
+
+
+def bind_profile(func: Callable) -> Callable:
+    """
+    Carry the active profile to func when it runs on another thread.
+    Returns func itself when no profile is active.
+    """
+    profile = _current.get()
+    if profile is None:
+        return func
+    profile.hold()
+    name = getattr(func, "__name__", "job")
+
+    def run(*args, **kwargs):
+        token = _current.set(profile)
+        try:
+            with profile.segment(name):
+                return func(*args, **kwargs)
+        finally:
+            _current.reset(token)
+            profile.release()
+
+    run.release = profile.release  # for a run that will never happen
+    return run
+
+
+def release_unrun(func: Callable):
+    """Release the profile held by a bind_profile() callable that will not run."""
+    release = getattr(func, "release", None)
+    if release is not None:
+        release()
+
+
+def release_if_cancelled(func: Callable, future: Future):
+    """
+    Release the profile held by a bind_profile() callable if future, the
+    executor future that would have run it, is cancelled (which it can only
+    be before it starts).
+    """
+    future.add_done_callback(lambda done: done.cancelled() and release_unrun(func))
+
+
+def profiled(func: Callable) -> Callable:
+    """Record a segment for func when it runs as part of a profiled request."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profile = _current.get()
+        if profile is None:
+            return func(*args, **kwargs)
+        with profile.segment(func.__name__):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def profiling_requested(scope) -> bool:
+    """Whether an ASGI request asks to be profiled."""
+    query = scope.get("query_string", b"").decode("latin-1")
+    if (PROFILE_QUERY_PARAM, "1") in parse_qsl(query):
+        return True
+    for name, value in scope["headers"]:
+        if name == PROFILE_HEADER:
+            return value not in (b"0", b"false", b"")
+    return False
+
+
+def _function_label(func) -> str:
+    filename, line, name = func
+    if filename == "~":
+        return name  # built-in
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def to_speedscope(stats: pstats.Stats, name: str) -> Dict[str, Any]:
+    """
+    Convert pstats into a speedscope evented profile.
+
+    cProfile only keeps caller/callee totals, so the call tree is rebuilt by
+    splitting each function's time between its callees in proportion; view
+    it in speedscope's "Left Heavy" mode.
+    """
+    entries = stats.stats
+    children: Dict[tuple, List[tuple]] = {}
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller, edge in callers.items():
+            children.setdefault(caller, []).append((func, edge[3]))
+    for calls in children.values():
+        calls.sort(key=lambda call: -call[1])
+
+    frames: List[Dict[str, Any]] = []
+    frame_index: Dict[tuple, int] = {}
+    events: List[Dict[str, Any]] = []
+
+    def frame(func) -> int:
+        if func not in frame_index:
+            frame_index[func] = len(frames)
+            frames.append(
+                {"name": _function_label(func), "file": func[0], "line": func[1]}
+            )
+        return frame_index[func]
+
+    def walk(func, start: float, total: float, stack: set):
+        index = frame(func)
+        events.append({"type": "O", "frame": index, "at": start})
+        cumulative = entries[func][3]
+        scale = total / cumulative if cumulative else 0.0
+        cursor = start
+        if len(stack) < MAX_SPEEDSCOPE_DEPTH:
+            stack.add(func)
+            for callee, edge_time in children.get(func, []):
+                if callee in stack or len(events) >= MAX_SPEEDSCOPE_EVENTS:
+                    continue
+                share = min(edge_time * scale, start + total - cursor)
+                if share <= 0:
+                    continue
+                walk(callee, cursor, share, stack)
+                cursor += share
+            stack.discard(func)
+        events.append({"type": "C", "frame": index, "at": start + total})
+
+    roots = [func for func, entry in entries.items() if not entry[4]]
+    cursor = 0.0
+    for root in sorted(roots, key=lambda func: -entries[func][3]):
+        walk(root, cursor, entries[root][3], set())
+        cursor += entries[root][3]
+
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "speech2action",
+        "shared": {"frames": frames},
+        "profiles": [
+            {
+                "type": "evented",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0.0,
+                "endValue": cursor,
+                "events": events,
+            }
+        ],
+    }
+
+
+class ProfileStore:
+    """Keeps the most recent request profiles on disk."""
+
+    def __init__(self, directory: str, retention: int = 20):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.retention = retention
+        self._index: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def start(self, method: str, path: str) -> RequestProfile:
+        return RequestProfile(self, method, path)
+
+    def stats_path(self, profile_id: str) -> Path:
+        return self.directory / f"{profile_id}.pstats"
+
+    def save(self, profile: RequestProfile):
+        if not profile.profilers:
+            return
+        stats = pstats.Stats(profile.profilers[0])
+        for profiler in profile.profilers[1:]:
+            stats.add(profiler)
+        stats.dump_stats(self.stats_path(profile.id))
+
+        top = sorted(stats.stats.items(), key=lambda item: -item[1][3])[:15]
+        meta = {
+            "id": profile.id,
+            "method": profile.method,
+            "path": profile.path,
+            "started_at": profile.started_at,
+            "duration": round(time.time() - profile.started_at, 6),
+            "segments": profile.segments,
+            "top_cumulative": [
+                {
+                    "function": _function_label(func),
+                    "calls": entry[1],
+                    "cumulative": round(entry[3], 6),
+                }
+                for func, entry in top
+            ],
+        }
+        with self._lock:
+            self._index[profile.id] = meta
+            while len(self._index) > self.retention:
+                old_id, _ = self._index.popitem(last=False)
+                self.stats_path(old_id).unlink(missing_ok=True)
+        logger.info(f"Saved request profile {profile.id} for {profile.path}")
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(reversed(self._index.values()))
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        return self._index.get(profile_id)
+
+    def speedscope(self, profile_id: str) -> bytes:
+        stats = pstats.Stats(str(self.stats_path(profile_id)))
+        meta = self._index[profile_id]
+        name = f"{meta['method']} {meta['path']}"
+        return json.dumps(to_speedscope(stats, name), separators=(",", ":")).encode()
+
+
+# Singleton pattern for the profile store (None when profiling is disabled)
+_store: Optional[ProfileStore] = None
+_store_checked = False
+
+
+def get_profile_store() -> Optional[ProfileStore]:
+    global _store, _store_checked
+    if not _store_checked:
+        from speech2action.config.settings import get_settings
+
+        settings = get_settings()
+        if settings.ORCHESTRA_PROFILING:
+            directory = settings.ORCHESTRA_PROFILE_DIR or os.path.join(
+                tempfile.gettempdir(), "orchestra-profiles"
+            )
+            _store = ProfileStore(directory, settings.ORCHESTRA_PROFILE_RETENTION)
+        _store_checked = True
+    return _store
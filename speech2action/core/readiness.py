@@ -0,0 +1,241 @@
+"""
+Readiness probes behind GET /api/v1/ready.
+
+A background thread runs every probe on an interval
+(ORCHESTRA_READY_INTERVAL) and encodes the results once. The endpoint only
+returns that cached body, so a supervisor can poll it as often as it likes
+without triggering filesystem checks.
+
+Each probe reports ok, degraded or failed with some details:
+
+- vaults: every profile's vault directories exist and are writable
+  (degraded while some profile's are not, failed when no profile's are)
+- profiles: the profiles file is unchanged since it was loaded
+- agent: an OpenAI key is configured and the last agent run did not fail
+- lanes: automations queued per lane, against ORCHESTRA_MAX_LANE_DEPTH
+- gui_worker: the GUI worker process is alive and sending heartbeats
+- shared_state: the state database answers (several worker processes only)
+- settings: the last change to .env or the profiles file was applied
+
+The service is ready unless a probe failed. Degraded probes are reported but
+do not make it unready. A snapshot older than STALE_INTERVALS intervals
+counts as not ready, because the probe thread has stopped.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+STALE_INTERVALS = 3  # snapshot ages, in intervals, after which it is not ready
+
+OK, DEGRADED, FAILED = "ok", "degraded", "failed"
+
+ProbeResult = Tuple[str, Dict[str, Any]]
+
+
+def probe_vaults() -> ProbeResult:
+    from speech2action.config.profiles import get_profile_registry
+
+    problems = {}
+    profiles = get_profile_registry().profiles
+    usable = 0
+    for profile in profiles.values():
+        ok = True
+        for vault_type in ("exercise", "main"):
+            path = profile.vault_path(vault_type)
+            if not os.path.isdir(path):
+                problems[f"{profile.name}/{vault_type}"] = f"missing: {path}"
+                ok = False
+            elif not os.access(path, os.W_OK):
+                problems[f"{profile.name}/{vault_type}"] = f"not writable: {path}"
+                ok = False
+        usable += ok
+    details = {"profiles": len(profiles), "usable": usable, **problems}
+    if not problems:
+        return OK, details
+    # One tenant's broken vault must not take the service away from the others
+    return (DEGRADED if usable else FAILED), details
+
+
+def probe_profiles() -> ProbeResult:
+    from speech2action.config.profiles import get_profile_registry
+
+    registry = get_profile_registry()
+    details: Dict[str, Any] = {"profiles": len(registry.profiles)}
+    if registry.source is None:
+        return OK, details
+    details["file"] = registry.source
+    try:
+        modified = os.stat(registry.source).st_mtime
+    except OSError:
+        return DEGRADED, {**details, "error": "profiles file is missing"}
+    if modified != registry.source_mtime:
+        return DEGRADED, {**details, "error": "profiles file changed since loaded"}
+    return OK, details
+
+
+def probe_agent() -> ProbeResult:
+    from speech2action.actions.manager_agent import agent_health
+
+    details = dict(agent_health)
+    if not os.environ.get("OPENAI_API_KEY"):
+        return DEGRADED, {**details, "error": "OPENAI_API_KEY is not set"}
+    failed_at = agent_health["last_error_at"]
+    if failed_at and failed_at > (agent_health["last_success_at"] or 0):
+        return DEGRADED, details
+    return OK, details
+
+
+def probe_lanes() -> ProbeResult:
+    from speech2action.core.admission import get_admission_controller
+    from speech2action.core.lanes import get_lane_executor
+
+    depths = get_lane_executor().depths()
+    limit = get_admission_controller().max_lane_depth
+    full = [lane for lane, depth in depths.items() if limit and depth >= limit]
+    details = {"max_lane_depth": limit, "depths": depths}
+    return (DEGRADED if full else OK), ({**details, "full": full} if full else details)
+
+
+def probe_gui_worker() -> ProbeResult:
+    from speech2action.gui.worker import get_gui_worker
+
+    worker = get_gui_worker()
+    status = worker.status()
+    if status["pid"] is None:
+        return OK, {**status, "state": "idle"}  # started with the first job
+    if not status["alive"]:
+        return FAILED, {**status, "error": "GUI worker process is not running"}
+    if (status["heartbeat_age"] or 0) > worker.heartbeat_timeout:
+        return FAILED, {**status, "error": "GUI worker heartbeat timed out"}
+    return OK, status
+
+
+def probe_shared_state() -> ProbeResult:
+    from speech2action.core.shared_state import get_shared_state
+
+    state = get_shared_state()
+    if state is None:
+        return OK, {"enabled": False}
+    state.active_jobs()
+    return OK, {"enabled": True, "directory": str(state.directory)}
+
+
+def probe_settings() -> ProbeResult:
+    from speech2action.config.settings import get_settings_service
+
+    service = get_settings_service()
+    details = {"reloads": service.reloads}
+    if service.last_error:
+        return DEGRADED, {**details, "error": service.last_error}
+    return OK, details
+
+
+PROBES: Dict[str, Callable[[], ProbeResult]] = {
+    "vaults": probe_vaults,
+    "profiles": probe_profiles,
+    "agent": probe_agent,
+    "lanes": probe_lanes,
+    "gui_worker": probe_gui_worker,
+    "shared_state": probe_shared_state,
+    "settings": probe_settings,
+}
+
+
+class ReadinessMonitor:
+    """Runs probes in the background and caches the encoded result."""
+
+    def __init__(
+        self,
+        probes: Optional[Dict[str, Callable[[], ProbeResult]]] = None,
+        interval: float = 5.0,
+    ):
+        self.probes = PROBES if probes is None else probes
+        self.interval = interval
+        # (ready, checked_at, encoded snapshot), replaced as a whole
+        self._snapshot: Tuple[bool, Optional[float], bytes] = (
+            False,
+            None,
+            json.dumps({"ready": False, "status": "starting"}).encode(),
+        )
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def check(self) -> Dict[str, Any]:
+        """Run every probe once and cache the result."""
+        results = {}
+        for name, probe in self.probes.items():
+            start = time.perf_counter()
+            try:
+                status, details = probe()
+            except Exception as e:
+                status, details = FAILED, {"error": str(e)}
+            details["status"] = status
+            details["duration_ms"] = round((time.perf_counter() - start) * 1000, 3)
+            results[name] = details
+        statuses = {details["status"] for details in results.values()}
+        ready = FAILED not in statuses
+        snapshot = {
+            "ready": ready,
+            "status": FAILED if not ready else DEGRADED if DEGRADED in statuses else OK,
+            "checked_at": time.time(),
+            "interval": self.interval,
+            "probes": results,
+        }
+        body = json.dumps(snapshot, default=str).encode()
+        self._snapshot = (ready, snapshot["checked_at"], body)
+        return snapshot
+
+    def current(self) -> Tuple[bool, bytes]:
+        """(ready, encoded snapshot) of the last check; stale checks are not ready."""
+        ready, checked_at, body = self._snapshot
+        if checked_at and time.time() - checked_at > STALE_INTERVALS * self.interval:
+            stale = {"ready": False, "status": "stale", "checked_at": checked_at}
+            return False, json.dumps(stale).encode()
+        return ready, body
+
+    def start(self):
+        """Check once now, then every interval on a background thread."""
+        if self._thread is not None:
+            return
+        self.check()
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._loop, name="readiness-probes", daemon=True
+        )
+        self._thread.start()
+
+    def _loop(self):
+        while not self._stopping.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Readiness check failed: {str(e)}")
+
+    def stop(self):
+        self._stopping.set()
+        self._thread = None
+
+
+# Singleton pattern for the readiness monitor
+_monitor: Optional[ReadinessMonitor] = None
+
+
+def _update_interval(old, new, changed):
+    # Takes effect after the current wait
+    _monitor.interval = new.ORCHESTRA_READY_INTERVAL
+
+
+def get_readiness_monitor() -> ReadinessMonitor:
+    global _monitor
+    if _monitor is None:
+        from speech2action.config.settings import get_settings, get_settings_service
+
+        _monitor = ReadinessMonitor(interval=get_settings().ORCHESTRA_READY_INTERVAL)
+        get_settings_service().subscribe(_update_interval)
+    return _monitor
@@ -0,0 +1,415 @@
+"""
+State shared between API worker processes.
+
+A single API process keeps its job queue, event history and metrics in
+memory. When the production server runs several uvicorn workers, state that
+must agree across them lives in ORCHESTRA_STATE_DIR instead:
+
+- gui_jobs table: studio jobs submitted by any worker. The worker holding
+  the GUI host lock runs them all in its GUI worker process; every worker
+  can read their status and cancel them.
+- events table: progress events from every worker, so an SSE client sees
+  them whichever worker it is connected to.
+- metrics table: each worker's metrics snapshot, summed by GET /metrics.
+- workers table: a slot number for each worker, part of its event ids.
+- lane lock files: a vault lane holds an exclusive file lock while a job
+  runs, so jobs on one vault stay serialized across workers.
+
+Tables live in one SQLite database in WAL mode, which is safe for several
+processes on one host. The directory is reset by the server before its
+workers start (see api/server.py).
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from hashlib import sha1
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+SYNC_INTERVAL = 1.0  # seconds between metrics snapshots and pruning
+LOCK_RETRY_INTERVAL = 0.01  # Windows has no blocking lock call
+MAX_SHARED_EVENTS = 1000  # events kept in the table for other workers to read
+MAX_FINISHED_JOBS = 200  # finished GUI jobs kept for status lookups
+
+ACTIVE_STATUSES = ("queued", "running")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS gui_jobs (
+    job_id TEXT PRIMARY KEY,
+    action TEXT NOT NULL,
+    status TEXT NOT NULL,
+    message TEXT NOT NULL DEFAULT '',
+    submitted_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    host INTEGER,  -- pid of the worker running it, NULL until claimed
+    cancel INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS gui_jobs_status ON gui_jobs (status);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,  -- order written, for tailing
+    event_id INTEGER NOT NULL,  -- the id the publishing worker gave it
+    origin INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    time REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    pid INTEGER PRIMARY KEY,
+    snapshot TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS workers (
+    slot INTEGER PRIMARY KEY AUTOINCREMENT,  -- in the order workers registered
+    pid INTEGER NOT NULL
+);
+"""
+
+JOB_FIELDS = ("job_id", "action", "status", "message")
+JOB_TIMES = ("submitted_at", "started_at", "finished_at")
+
+
+class FileLock:
+    """Exclusive lock on a file, held by at most one process at a time."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        if self._file is None:
+            self._file = open(self.path, "a+b")
+        fd = self._file.fileno()
+        while True:
+            try:
+                if fcntl is not None:
+                    flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+                    fcntl.flock(fd, flags)
+                else:
+                    self._file.seek(0)
+                    msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                return True
+            except OSError:
+                if not blocking:
+                    return False
+                if fcntl is not None:
+                    raise
+                time.sleep(LOCK_RETRY_INTERVAL)
+
+    def release(self):
+        fd = self._file.fileno()
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+        return False
+
+
+class SharedState:
+    """SQLite tables and lock files in a directory shared by worker processes."""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        (self.directory / "locks").mkdir(parents=True, exist_ok=True)
+        self.path = self.directory / "state.sqlite3"
+        self.pid = os.getpid()
+        self._local = threading.local()
+        self._lane_locks: Dict[str, FileLock] = {}
+        self._lock = threading.Lock()
+        self._sync = None
+        db = self._db()
+        db.executescript(SCHEMA)
+        columns = {row["name"] for row in db.execute("PRAGMA table_info(events)")}
+        if "event_id" not in columns:  # a state directory from an older version
+            db.executescript("DROP TABLE events;" + SCHEMA)
+
+    def _db(self) -> sqlite3.Connection:
+        """This thread's connection (autocommit; transactions are explicit)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def reset(self):
+        """Forget jobs, events and metrics from a previous server run."""
+        self._db().executescript(
+            "DELETE FROM gui_jobs; DELETE FROM events; DELETE FROM metrics;"
+            " DELETE FROM workers;"
+        )
+
+    def start(self, metrics):
+        """Publish this worker's metrics and prune old rows in the background."""
+        self._sync = threading.Thread(
+            target=self._sync_loop, args=(metrics,), name="shared-state", daemon=True
+        )
+        self._sync.start()
+
+    def _sync_loop(self, metrics):
+        while True:
+            time.sleep(SYNC_INTERVAL)
+            try:
+                self.save_metrics(metrics.snapshot())
+                self.prune()
+            except sqlite3.Error as e:
+                logger.warning(f"Shared state sync failed: {str(e)}")
+
+    def prune(self):
+        db = self._db()
+        db.execute(
+            "DELETE FROM events WHERE id <= (SELECT MAX(id) FROM events) - ?",
+            (MAX_SHARED_EVENTS,),
+        )
+        db.execute(
+            "DELETE FROM gui_jobs WHERE job_id IN (SELECT job_id FROM gui_jobs"
+            " WHERE status NOT IN (?, ?) ORDER BY finished_at DESC LIMIT -1 OFFSET ?)",
+            (*ACTIVE_STATUSES, MAX_FINISHED_JOBS),
+        )
+
+    def register_worker(self) -> int:
+        """
+        A slot number for this worker. Slots are handed out in order, so the
+        low bits of a slot are unique among the workers registered since.
+        """
+        cursor = self._db().execute("INSERT INTO workers (pid) VALUES (?)", (self.pid,))
+        return cursor.lastrowid
+
+    # Locks
+
+    def lane_lock(self, key: str) -> FileLock:
+        """The lock a vault lane holds while one of its jobs runs."""
+        with self._lock:
+            lock = self._lane_locks.get(key)
+            if lock is None:
+                name = sha1(key.encode()).hexdigest()[:16]
+                lock = FileLock(self.directory / "locks" / f"lane-{name}.lock")
+                self._lane_locks[key] = lock
+            return lock
+
+    def host_lock(self) -> FileLock:
+        """Held by the one worker that runs the GUI worker process."""
+        return FileLock(self.directory / "locks" / "gui-host.lock")
+
+    # GUI jobs
+
+    def add_job(self, job: Dict[str, Any], host: Optional[int] = None):
+        self._db().execute(
+            "INSERT INTO gui_jobs (job_id, action, status, message, submitted_at,"
+            " started_at, finished_at, host) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (*(job[k] for k in JOB_FIELDS + JOB_TIMES), host),
+        )
+
+    def update_job(self, job: Dict[str, Any]):
+        self._db().execute(
+            "UPDATE gui_jobs SET status = ?, message = ?, started_at = ?,"
+            " finished_at = ? WHERE job_id = ?",
+            (
+                job["status"],
+                job["message"],
+                job["started_at"],
+                job["finished_at"],
+                job["job_id"],
+            ),
+        )
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        jobs = self.get_jobs([job_id])
+        return jobs[0] if jobs else None
+
+    def get_jobs(self, job_ids: Iterable[str]) -> List[Dict[str, Any]]:
+        job_ids = list(job_ids)
+        if not job_ids:
+            return []
+        rows = self._db().execute(
+            f"SELECT {', '.join(JOB_FIELDS + JOB_TIMES)} FROM gui_jobs"
+            f" WHERE job_id IN ({', '.join('?' * len(job_ids))})",
+            job_ids,
+        )
+        return [dict(row) for row in rows]
+
+    def active_jobs(self) -> int:
+        return (
+            self._db()
+            .execute(
+                "SELECT COUNT(*) FROM gui_jobs WHERE status IN (?, ?)", ACTIVE_STATUSES
+            )
+            .fetchone()[0]
+        )
+
+    def claim_jobs(self) -> List[Dict[str, Any]]:
+        """Take the queued jobs no worker has claimed yet, oldest first."""
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            rows = [
+                dict(row)
+                for row in db.execute(
+                    f"SELECT {', '.join(JOB_FIELDS + JOB_TIMES)} FROM gui_jobs"
+                    " WHERE status = 'queued' AND host IS NULL ORDER BY submitted_at"
+                )
+            ]
+            db.executemany(
+                "UPDATE gui_jobs SET host = ? WHERE job_id = ?",
+                [(self.pid, row["job_id"]) for row in rows],
+            )
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return rows
+
+    def take_over(self, reason: str) -> List[str]:
+        """
+        Become the GUI host: fail the jobs a previous host was running and
+        release its queued ones to be claimed again. Returns the failed ids.
+        """
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            failed = [
+                row[0]
+                for row in db.execute(
+                    "SELECT job_id FROM gui_jobs WHERE status = 'running'"
+                )
+            ]
+            db.execute(
+                "UPDATE gui_jobs SET status = 'failed', message = ?, finished_at = ?"
+                " WHERE status = 'running'",
+                (reason, time.time()),
+            )
+            db.execute("UPDATE gui_jobs SET host = NULL WHERE status = 'queued'")
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return failed
+
+    def request_cancel(self, job_id: str) -> bool:
+        """Flag a queued or running job for the host to cancel."""
+        cursor = self._db().execute(
+            "UPDATE gui_jobs SET cancel = 1 WHERE job_id = ? AND status IN (?, ?)",
+            (job_id, *ACTIVE_STATUSES),
+        )
+        return cursor.rowcount > 0
+
+    def take_cancel_requests(self) -> List[str]:
+        """Ids of this host's jobs flagged for cancellation since the last call."""
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            job_ids = [
+                row[0]
+                for row in db.execute(
+                    "SELECT job_id FROM gui_jobs WHERE cancel = 1 AND host = ?",
+                    (self.pid,),
+                )
+            ]
+            db.execute(
+                "UPDATE gui_jobs SET cancel = 2 WHERE cancel = 1 AND host = ?",
+                (self.pid,),
+            )
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return job_ids
+
+    # Events
+
+    def append_events(self, events: Iterable[Tuple[int, str, float, Dict[str, Any]]]):
+        """Store (id, type, time, data) events published by this worker."""
+        rows = [
+            (event_id, self.pid, type, time, json.dumps(data, default=str))
+            for event_id, type, time, data in events
+        ]
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.executemany(
+                "INSERT INTO events (event_id, origin, type, time, data)"
+                " VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+    def events_after(
+        self, last_row: int
+    ) -> List[Tuple[int, int, int, str, float, Dict[str, Any]]]:
+        """
+        (row, event id, origin pid, type, time, data) of the events written
+        after row last_row, in the order they were written.
+        """
+        rows = self._db().execute(
+            "SELECT id, event_id, origin, type, time, data FROM events"
+            " WHERE id > ? ORDER BY id",
+            (last_row,),
+        )
+        return [
+            (row, event_id, origin, type, t, json.loads(data))
+            for row, event_id, origin, type, t, data in rows
+        ]
+
+    def last_event_row(self) -> int:
+        return (
+            self._db().execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+        )
+
+    # Metrics
+
+    def save_metrics(self, snapshot: Dict[str, Any]):
+        self._db().execute(
+            "INSERT OR REPLACE INTO metrics (pid, snapshot) VALUES (?, ?)",
+            (self.pid, json.dumps(snapshot)),
+        )
+
+    def render_metrics(self, metrics) -> str:
+        """Render the metrics of every worker, summed, including this one's latest."""
+        from speech2action.core.metrics import Metrics
+
+        self.save_metrics(metrics.snapshot())
+        combined = Metrics(metrics.buckets)
+        for (snapshot,) in self._db().execute("SELECT snapshot FROM metrics"):
+            combined.merge(json.loads(snapshot))
+        return combined.render()
+
+
+# Singleton pattern for the shared state (None when running as one process)
+_state: Optional[SharedState] = None
+_state_checked = False
+
+
+def get_shared_state() -> Optional[SharedState]:
+    global _state, _state_checked
+    if not _state_checked:
+        from speech2action.config.settings import get_settings
+
+        directory = get_settings().ORCHESTRA_STATE_DIR
+        if directory:
+            _state = SharedState(directory)
+        _state_checked = True
+    return _state
@@ -1,6 +1,153 @@
-def listen_for_command():
+"""
+Voice input for the CLI.
+
+With ORCHESTRA_AUDIO_SOURCE set ("mic", "-" for raw PCM on stdin, or a
+WAV/PCM file), commands are utterances transcribed by the audio pipeline
+(see speech2action/audio/pipeline.py) with the ORCHESTRA_ASR_BACKEND
+backend. Otherwise commands are typed.
+
+With ORCHESTRA_WAKE_TEMPLATES set as well, only utterances starting with the
+wake phrase (or following it after a pause) are transcribed, and the wake
+phrase is removed before the command is parsed, so background speech never
+reaches ASR or the agent.
+
+Typed commands can be streamed: given an on_partial callback and a
+terminal, the line is read key by key and on_partial gets the text typed so
+far whenever typing pauses for TYPING_PAUSE seconds, so the agent can start
+on a command before Enter is pressed (see actions/agent_session.py).
+"""
+
+import codecs
+import os
+import sys
+import time
+from typing import Callable, Iterator, Optional
+
+from speech2action.audio.wake import strip_wake_phrase
+from speech2action.config.settings import get_settings
+
+PROMPT = "🗣️ Spell: "
+TYPING_PAUSE = 0.3  # seconds without a key press before on_partial
+
+_utterances: Optional[Iterator] = None
+
+
+def _next_utterance(settings) -> str:
+    global _utterances
+    if _utterances is None:
+        from speech2action.audio.pipeline import open_pipeline
+
+        source, pipeline = open_pipeline(
+            settings.ORCHESTRA_AUDIO_SOURCE,
+            settings.ORCHESTRA_ASR_BACKEND,
+            settings.ORCHESTRA_AUDIO_SAMPLE_RATE,
+            settings.ORCHESTRA_WAKE_TEMPLATES,
+            settings.ORCHESTRA_WAKE_SENSITIVITY,
+            settings.ORCHESTRA_WAKE_FOLLOW_UP,
+        )
+        _utterances = pipeline.run(source)
+    for utterance in _utterances:
+        text = utterance.text
+        if settings.ORCHESTRA_WAKE_TEMPLATES:
+            text = strip_wake_phrase(text, settings.ORCHESTRA_WAKE_PHRASE)
+            if not text:
+                print("👂 Listening...")  # bare wake phrase; the command follows
+                continue
+        if text:
+            print(f"🗣️ Spell: {text}")
+            return text
+    return "exit"  # the audio source ended
+
+
+def _posix_keys():
+    """Yield typed characters, or None after TYPING_PAUSE without any."""
+    import select
+    import termios
+    import tty
+
+    fd = sys.stdin.fileno()
+    saved = termios.tcgetattr(fd)
+    decoder = codecs.getincrementaldecoder(sys.stdin.encoding or "utf-8")("replace")
+    try:
+        tty.setcbreak(fd)  # no line buffering or echo; Ctrl-C still works
+        while True:
+            ready, _, _ = select.select([fd], [], [], TYPING_PAUSE)
+            if not ready:
+                yield None
+                continue
+            data = os.read(fd, 1024)
+            if not data:
+                yield "\x04"
+                return
+            yield from decoder.decode(data)
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, saved)
+
+
+def _windows_keys():
+    import msvcrt
+
+    idle_since = time.monotonic()
+    while True:
+        if msvcrt.kbhit():
+            idle_since = time.monotonic()
+            yield msvcrt.getwch()
+        elif time.monotonic() - idle_since >= TYPING_PAUSE:
+            idle_since = time.monotonic()
+            yield None
+        else:
+            time.sleep(0.01)
+
+
+def _read_streaming(on_partial: Callable[[str], None]) -> str:
+    """input() that calls on_partial with the line so far when typing pauses."""
+    print(PROMPT, end="", flush=True)
+    keys = _windows_keys() if os.name == "nt" else _posix_keys()
+    line, changed, escape = [], False, False
+    try:
+        for key in keys:
+            if key is None:
+                if changed and line:
+                    on_partial("".join(line))
+                changed = False
+            elif escape:
+                escape = not key.isalpha() and key != "~"  # end of the sequence
+            elif key == "\x1b":  # arrow and function keys are not supported
+                escape = True
+            elif key in ("\r", "\n"):
+                break
+            elif key == "\x04" and not line:  # Ctrl-D
+                print()
+                return "exit"
+            elif key == "\x03":  # Ctrl-C (Windows)
+                raise KeyboardInterrupt
+            elif key in ("\x7f", "\b"):
+                if line:
+                    line.pop()
+                    changed = True
+                    print("\b \b", end="", flush=True)
+            elif key == "\x15":  # Ctrl-U
+                print("\b \b" * len(line), end="", flush=True)
+                line, changed = [], True
+            elif key.isprintable():
+                line.append(key)
+                changed = True
+                print(key, end="", flush=True)
+    finally:
+        keys.close()
+    print()
+    return "".join(line)
+
+
+def listen_for_command(on_partial: Optional[Callable[[str], None]] = None):
     """
-    Mock voice listener. Prompts user for text input.
-    TODO: Integrate real microphone input using SpeechRecognition or Whisper.
+    Return the next command: a transcribed utterance when an audio source is
+    configured, else text typed at the prompt (streamed to on_partial, if
+    given, when the prompt is a terminal).
     """
-    return input("🗣️ Spell: ")
+    settings = get_settings()
+    if settings.ORCHESTRA_AUDIO_SOURCE:
+        return _next_utterance(settings)
+    if on_partial is not None and sys.stdin.isatty():
+        return _read_streaming(on_partial)
+    return input(PROMPT)
@@ -0,0 +1 @@
+# GUI automation: macro engine and wait-until conditions
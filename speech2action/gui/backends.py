@@ -0,0 +1,166 @@
+"""
+Input backends for GUI macros.
+
+The macro engine never calls pyautogui directly. It drives an InputBackend,
+which also owns the clock used for waits, so macros can run against:
+
+- PyAutoGUIBackend: real mouse/keyboard input and wall-clock time
+- VirtualBackend: records intended events and simulates time, for dry runs,
+  headless CI and benchmarks
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from speech2action.gui.locator import Match
+
+PYAUTOGUI_PAUSE = 0.1  # pyautogui's default pause after every call
+
+
+class InputBackend:
+    """Mouse, keyboard, screen and clock operations used by macros."""
+
+    simulated = False  # True for backends that only simulate input and time
+
+    def hotkey(self, *keys: str):
+        raise NotImplementedError
+
+    def press(self, key: str):
+        raise NotImplementedError
+
+    def typewrite(self, text: str):
+        raise NotImplementedError
+
+    def moveTo(self, x: int, y: int):
+        raise NotImplementedError
+
+    def click(self, x: Optional[int] = None, y: Optional[int] = None):
+        raise NotImplementedError
+
+    def pixel(self, x: int, y: int) -> Tuple[int, int, int]:
+        raise NotImplementedError
+
+    def pixelMatchesColor(self, x: int, y: int, color, tolerance: int = 0) -> bool:
+        raise NotImplementedError
+
+    def locate(self, locator, name: str) -> Optional[Match]:
+        """Locate a reference image on the current screen."""
+        return locator.locate(name)
+
+    def sleep(self, seconds: float):
+        time.sleep(seconds)
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+
+class PyAutoGUIBackend(InputBackend):
+    """Real input through pyautogui (imported on first use)."""
+
+    def __init__(self):
+        self._pyautogui = None
+
+    @property
+    def gui(self):
+        if self._pyautogui is None:
+            import pyautogui
+
+            self._pyautogui = pyautogui
+        return self._pyautogui
+
+    def hotkey(self, *keys: str):
+        self.gui.hotkey(*keys)
+
+    def press(self, key: str):
+        self.gui.press(key)
+
+    def typewrite(self, text: str):
+        self.gui.typewrite(text)
+
+    def moveTo(self, x: int, y: int):
+        self.gui.moveTo(x, y)
+
+    def click(self, x: Optional[int] = None, y: Optional[int] = None):
+        self.gui.click(x, y)
+
+    def pixel(self, x: int, y: int) -> Tuple[int, int, int]:
+        return self.gui.pixel(x, y)
+
+    def pixelMatchesColor(self, x: int, y: int, color, tolerance: int = 0) -> bool:
+        return self.gui.pixelMatchesColor(x, y, color, tolerance=tolerance)
+
+
+@dataclass
+class VirtualEvent:
+    """An input event recorded by the virtual backend."""
+
+    time: float
+    name: str
+    args: Tuple[Any, ...]
+
+
+class VirtualBackend(InputBackend):
+    """
+    Records intended input and simulates time.
+
+    Every input call costs input_cost simulated seconds (pyautogui's default
+    pause). Sleeps advance the simulated clock without blocking. Conditions
+    hold immediately and templates are always found, so a dry run measures
+    the fixed cost of a macro.
+    """
+
+    simulated = True
+
+    def __init__(self, input_cost: float = PYAUTOGUI_PAUSE, start: float = 0.0):
+        self.input_cost = input_cost
+        self.now = start
+        self.start = start
+        self.input_time = 0.0
+        self.wait_time = 0.0
+        self.events: List[VirtualEvent] = []
+
+    def _record(self, name: str, *args):
+        self.events.append(VirtualEvent(self.now, name, args))
+        self.now += self.input_cost
+        self.input_time += self.input_cost
+
+    def hotkey(self, *keys: str):
+        self._record("hotkey", *keys)
+
+    def press(self, key: str):
+        self._record("press", key)
+
+    def typewrite(self, text: str):
+        self._record("typewrite", text)
+
+    def moveTo(self, x: int, y: int):
+        self._record("moveTo", x, y)
+
+    def click(self, x: Optional[int] = None, y: Optional[int] = None):
+        self._record("click", x, y)
+
+    def pixel(self, x: int, y: int) -> Tuple[int, int, int]:
+        return (0, 0, 0)
+
+    def pixelMatchesColor(self, x: int, y: int, color, tolerance: int = 0) -> bool:
+        return True
+
+    def locate(self, locator, name: str) -> Optional[Match]:
+        return Match(0, 0, 1, 1, 1.0, 1.0)
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+        self.wait_time += seconds
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def report(self) -> Dict[str, float]:
+        """Simulated cost so far, split into input and wait time."""
+        return {
+            "total": self.now - self.start,
+            "input": self.input_time,
+            "wait": self.wait_time,
+            "events": len(self.events),
+        }
@@ -0,0 +1,48 @@
+"""
+Wait-until conditions for GUI macros.
+
+Each condition is a predicate ``check(engine, spec) -> bool`` that is polled by
+the macro engine until it holds or the step times out. A condition spec is the
+``wait_until`` mapping of a macro step, e.g.:
+
+    {"window_title": "FL Studio"}
+    {"pixel": [640, 160], "color": [255, 255, 255], "tolerance": 10}
+    {"template": "audio_settings.png"}
+"""
+
+from typing import Any, Callable, Dict
+
+from speech2action.gui.readiness import has_window
+
+
+def window_title_present(engine, spec: Dict[str, Any]) -> bool:
+    """True when a visible window title contains spec["window_title"]."""
+    return has_window(engine.app_backend, spec["window_title"])
+
+
+def pixel_matches(engine, spec: Dict[str, Any]) -> bool:
+    """True when the screen pixel at spec["pixel"] has spec["color"]."""
+    x, y = spec["pixel"]
+    return engine.backend.pixelMatchesColor(
+        int(x), int(y), tuple(spec["color"]), tolerance=spec.get("tolerance", 0)
+    )
+
+
+def template_found(engine, spec: Dict[str, Any]) -> bool:
+    """True when the reference image spec["template"] is visible on screen."""
+    return engine.locate(spec["template"]) is not None
+
+
+CONDITIONS: Dict[str, Callable[[Any, Dict[str, Any]], bool]] = {
+    "window_title": window_title_present,
+    "pixel": pixel_matches,
+    "template": template_found,
+}
+
+
+def get_condition(spec: Dict[str, Any]) -> Callable[[Any, Dict[str, Any]], bool]:
+    """Return the condition check for a wait_until spec."""
+    for kind, check in CONDITIONS.items():
+        if kind in spec:
+            return check
+    raise ValueError(f"Unknown wait_until condition: {sorted(spec)}")
@@ -0,0 +1,256 @@
+"""
+Declarative GUI macro engine.
+
+A macro is a JSON (or YAML) file with a name and a list of steps. Every step
+can first wait until a condition holds, then perform at most one input action,
+then optionally settle for a fixed time:
+
+    {
+        "name": "switch_audio_device",
+        "steps": [
+            {"name": "wait for FL Studio",
+             "wait_until": {"window_title": "FL Studio", "timeout": 30}},
+            {"name": "open options", "click": [265, 60], "settle": 0.5}
+        ]
+    }
+
+Actions: "hotkey" (list of keys), "press" (key), "type" (text),
+"move" and "click" (a target), and "sleep" (seconds). A target is [x, y],
+{"template": "image.png"} to locate a reference image from the assets
+directory, or null (click only) for the current position. String values may
+reference ``${VARIABLES}``.
+
+Conditions are polled with exponential backoff until they hold or the
+step's timeout expires (see conditions.py for the available conditions).
+A speed factor shortens fixed settles and sleeps, never condition waits.
+
+Input and time go through an InputBackend (see backends.py), so the same
+macro can run for real or against the virtual backend in dry-run mode.
+"""
+
+import json
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from string import Template
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from speech2action.core.events import get_event_bus
+from speech2action.gui.backends import InputBackend, PyAutoGUIBackend
+from speech2action.gui.conditions import get_condition
+from speech2action.gui.locator import TemplateLocator, get_locator
+from speech2action.gui.readiness import AppBackend, get_app_backend
+
+logger = logging.getLogger(__name__)
+
+MACROS_DIR = Path(__file__).parent / "macros"
+
+DEFAULT_TIMEOUT = 10.0  # seconds before a wait_until condition fails
+DEFAULT_INTERVAL = 0.1  # first poll interval in seconds
+DEFAULT_BACKOFF = 1.5  # poll interval multiplier
+DEFAULT_MAX_INTERVAL = 1.0  # poll interval cap in seconds
+MIN_PAUSE = 0.05  # floor for fixed waits shortened by the speed factor
+
+
+class MacroError(Exception):
+    """Raised when a macro file or step is invalid."""
+
+
+class TargetNotFoundError(MacroError):
+    """Raised when a template target is not visible on screen."""
+
+
+class MacroTimeoutError(TimeoutError):
+    """Raised when a step's wait_until condition does not hold in time."""
+
+
+@dataclass
+class StepResult:
+    """Timing of one executed macro step."""
+
+    name: str
+    duration: float  # total seconds spent in the step
+    waited: float  # seconds spent polling the wait_until condition
+    satisfied: bool = True  # False if an optional condition timed out
+
+
+def _substitute(value: Any, variables: Dict[str, Any]) -> Any:
+    if isinstance(value, str):
+        return Template(value).safe_substitute(variables)
+    if isinstance(value, list):
+        return [_substitute(v, variables) for v in value]
+    if isinstance(value, dict):
+        return {k: _substitute(v, variables) for k, v in value.items()}
+    return value
+
+
+def load_macro(source: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Load a macro by file path or by name from the bundled macros directory.
+    """
+    path = Path(source)
+    if not path.suffix:
+        path = MACROS_DIR / f"{source}.json"
+    text = path.read_text(encoding="utf-8")
+    if path.suffix in (".yaml", ".yml"):
+        import yaml
+
+        macro = yaml.safe_load(text)
+    else:
+        macro = json.loads(text)
+    if not isinstance(macro, dict) or not isinstance(macro.get("steps"), list):
+        raise MacroError(f"Macro {path} must define a list of steps")
+    macro.setdefault("name", path.stem)
+    return macro
+
+
+class MacroEngine:
+    """Executes macro steps against an input backend."""
+
+    def __init__(
+        self,
+        backend: Optional[InputBackend] = None,
+        variables: Optional[Dict[str, Any]] = None,
+        locator: Optional[TemplateLocator] = None,
+        speed: float = 1.0,
+        app_backend: Optional[AppBackend] = None,
+    ):
+        self.backend = backend or PyAutoGUIBackend()
+        self.variables = dict(variables or {})
+        self.locator = locator or get_locator()
+        self.speed = speed
+        self.app_backend = app_backend or get_app_backend()
+
+    def pause(self, seconds: float):
+        """Sleep for a fixed wait, shortened by the speed factor."""
+        seconds = float(seconds)
+        self.backend.sleep(max(seconds / self.speed, min(seconds, MIN_PAUSE)))
+
+    def locate(self, name: str):
+        """Locate a reference image through the input backend's screen."""
+        return self.backend.locate(self.locator, name)
+
+    def resolve_target(self, target) -> Tuple[int, int]:
+        """Resolve a step target to screen coordinates."""
+        if isinstance(target, dict):
+            match = self.locate(target["template"])
+            if match is None:
+                raise TargetNotFoundError(f"{target['template']} not found on screen")
+            return self.locator.to_point(match)
+        x, y = target
+        return int(x), int(y)
+
+    def wait_until(self, spec: Dict[str, Any]) -> bool:
+        """
+        Poll a condition with exponential backoff.
+        Returns True once it holds, False if it timed out.
+        """
+        check = get_condition(spec)
+        timeout = float(spec.get("timeout", DEFAULT_TIMEOUT))
+        interval = float(spec.get("interval", DEFAULT_INTERVAL))
+        backoff = float(spec.get("backoff", DEFAULT_BACKOFF))
+        max_interval = float(spec.get("max_interval", DEFAULT_MAX_INTERVAL))
+
+        clock = self.backend.monotonic
+        deadline = clock() + timeout
+        while True:
+            if check(self, spec):
+                return True
+            remaining = deadline - clock()
+            if remaining <= 0:
+                return False
+            self.backend.sleep(min(interval, remaining))
+            interval = min(interval * backoff, max_interval)
+
+    def _perform(self, step: Dict[str, Any]):
+        gui = self.backend
+        if "hotkey" in step:
+            gui.hotkey(*step["hotkey"])
+        elif "press" in step:
+            gui.press(step["press"])
+        elif "type" in step:
+            gui.typewrite(str(step["type"]))
+        elif "move" in step:
+            gui.moveTo(*self.resolve_target(step["move"]))
+        elif "click" in step:
+            if step["click"] is None:
+                gui.click()
+            else:
+                gui.click(*self.resolve_target(step["click"]))
+        elif "sleep" in step:
+            self.pause(step["sleep"])
+
+    def run_step(self, step: Dict[str, Any], index: int = 0) -> StepResult:
+        step = _substitute(step, self.variables)
+        name = step.get("name", f"step {index}")
+        clock = self.backend.monotonic
+        start = clock()
+
+        satisfied = True
+        if "wait_until" in step:
+            satisfied = self.wait_until(step["wait_until"])
+            if not satisfied and not step["wait_until"].get("optional", False):
+                raise MacroTimeoutError(
+                    f"Step '{name}' timed out waiting for {step['wait_until']}"
+                )
+        waited = clock() - start
+
+        self._perform(step)
+        if "settle" in step:
+            self.pause(step["settle"])
+
+        return StepResult(
+            name=name,
+            duration=clock() - start,
+            waited=waited,
+            satisfied=satisfied,
+        )
+
+    def run(self, macro: Union[str, Path, Dict[str, Any]]) -> List[StepResult]:
+        """Run every step of a macro, logging and publishing each step's duration."""
+        if not isinstance(macro, dict):
+            macro = load_macro(macro)
+        name = macro.get("name", "macro")
+        steps = macro["steps"]
+        bus = get_event_bus()
+        start = self.backend.monotonic()
+        results = []
+        for index, step in enumerate(steps):
+            result = self.run_step(step, index)
+            results.append(result)
+            logger.info(
+                f"[{name}] {result.name}: {result.duration:.3f}s "
+                f"(waited {result.waited:.3f}s)"
+            )
+            if self.backend.simulated:
+                continue  # dry runs are not progress
+            bus.publish(
+                "macro.step",
+                macro=name,
+                step=result.name,
+                index=index,
+                total=len(steps),
+                duration=round(result.duration, 6),
+                waited=round(result.waited, 6),
+            )
+        logger.info(f"[{name}] finished in {self.backend.monotonic() - start:.3f}s")
+        return results
+
+
+def run_macro(
+    macro: Union[str, Path, Dict[str, Any]],
+    variables: Optional[Dict[str, Any]] = None,
+    backend: Optional[InputBackend] = None,
+    locator: Optional[TemplateLocator] = None,
+    speed: float = 1.0,
+    app_backend: Optional[AppBackend] = None,
+) -> List[StepResult]:
+    """Run a macro by name, path or dict with a fresh engine."""
+    engine = MacroEngine(
+        backend=backend,
+        variables=variables,
+        locator=locator,
+        speed=speed,
+        app_backend=app_backend,
+    )
+    return engine.run(macro)
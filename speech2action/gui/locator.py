@@ -0,0 +1,225 @@
+"""
+OpenCV template-matching locator for GUI macros.
+
+Reference PNGs are loaded from the assets directory once and pre-scaled into a
+small pyramid, so the same image works on displays with different scaling.
+A lookup first checks a region of interest around the template's last known
+position and only falls back to a coarse-to-fine full-screen search on a miss.
+
+Screenshots can be passed in explicitly, which makes the locator testable
+offline against saved screenshots:
+
+    python -m speech2action.gui.locator project_icon.png screenshot.png
+"""
+
+import os
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+ASSETS_DIR = os.getenv("FL_ASSETS_DIR", "assets")  # Directory for reference images
+
+DEFAULT_SCALES = (0.5, 0.75, 1.0, 1.25, 1.5, 2.0)
+DEFAULT_CONFIDENCE = 0.85
+COARSE_FACTOR = 0.5  # screen downscale for the first full-screen pass
+ROI_MARGIN = 120  # pixels searched around the last hit
+
+
+@dataclass
+class Match:
+    """Location of a template in screenshot pixels."""
+
+    x: int
+    y: int
+    width: int
+    height: int
+    score: float
+    scale: float
+
+    @property
+    def center(self) -> Tuple[int, int]:
+        return self.x + self.width // 2, self.y + self.height // 2
+
+
+def to_gray(image) -> np.ndarray:
+    """Convert a path, PIL image or BGR/RGB array to a grayscale array."""
+    if isinstance(image, (str, Path)):
+        gray = cv2.imread(str(image), cv2.IMREAD_GRAYSCALE)
+        if gray is None:
+            raise FileNotFoundError(f"Cannot read image: {image}")
+        return gray
+    array = np.asarray(image)
+    if array.ndim == 2:
+        return array
+    if array.shape[2] == 4:
+        return cv2.cvtColor(array, cv2.COLOR_RGBA2GRAY)
+    return cv2.cvtColor(array, cv2.COLOR_RGB2GRAY)
+
+
+def _best_match(
+    screen: np.ndarray, template: np.ndarray
+) -> Tuple[float, Tuple[int, int]]:
+    th, tw = template.shape
+    if screen.shape[0] < th or screen.shape[1] < tw:
+        return -1.0, (0, 0)
+    scores = cv2.matchTemplate(screen, template, cv2.TM_CCOEFF_NORMED)
+    _, score, _, loc = cv2.minMaxLoc(scores)
+    return score, loc
+
+
+class TemplateLocator:
+    """Finds reference images on screen with cached, region-limited search."""
+
+    def __init__(
+        self,
+        assets_dir: str = ASSETS_DIR,
+        scales=DEFAULT_SCALES,
+        confidence: float = DEFAULT_CONFIDENCE,
+        roi_margin: int = ROI_MARGIN,
+        grab: Optional[Callable[[], object]] = None,
+    ):
+        self.assets_dir = Path(assets_dir)
+        self.scales = tuple(scales)
+        self.confidence = confidence
+        self.roi_margin = roi_margin
+        self._grab = grab
+        self.pixel_ratio = 1.0  # screenshot pixels per screen point (2.0 on Retina)
+        self._pyramids: Dict[str, List[Tuple[float, np.ndarray, np.ndarray]]] = {}
+        self._last_hits: Dict[str, Match] = {}
+
+    def pyramid(self, name: str) -> List[Tuple[float, np.ndarray, np.ndarray]]:
+        """
+        Return (scale, template, coarse template) for every pyramid level.
+        Templates are read from disk once per name.
+        """
+        pyramid = self._pyramids.get(name)
+        if pyramid is None:
+            base = to_gray(self.assets_dir / name)
+            pyramid = []
+            for scale in self.scales:
+                scaled = cv2.resize(
+                    base, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA
+                )
+                coarse = cv2.resize(
+                    scaled,
+                    None,
+                    fx=COARSE_FACTOR,
+                    fy=COARSE_FACTOR,
+                    interpolation=cv2.INTER_AREA,
+                )
+                if min(coarse.shape) >= 4:
+                    pyramid.append((scale, scaled, coarse))
+            self._pyramids[name] = pyramid
+        return pyramid
+
+    def screenshot(self) -> np.ndarray:
+        if self._grab is None:
+            import pyautogui
+
+            self._grab = pyautogui.screenshot
+            screen = to_gray(self._grab())
+            self.pixel_ratio = screen.shape[1] / pyautogui.size()[0]
+            return screen
+        return to_gray(self._grab())
+
+    def to_point(self, match: Match) -> Tuple[int, int]:
+        """Convert a match's center to screen coordinates for clicking."""
+        x, y = match.center
+        return int(x / self.pixel_ratio), int(y / self.pixel_ratio)
+
+    def _search_roi(
+        self, screen: np.ndarray, template: np.ndarray, x: int, y: int, scale: float
+    ) -> Optional[Match]:
+        th, tw = template.shape
+        m = self.roi_margin
+        x0, y0 = max(x - m, 0), max(y - m, 0)
+        x1 = min(x + tw + m, screen.shape[1])
+        y1 = min(y + th + m, screen.shape[0])
+        score, (lx, ly) = _best_match(screen[y0:y1, x0:x1], template)
+        if score < self.confidence:
+            return None
+        return Match(x0 + lx, y0 + ly, tw, th, float(score), scale)
+
+    def _full_search(self, name: str, screen: np.ndarray) -> Optional[Match]:
+        coarse_screen = cv2.resize(
+            screen,
+            None,
+            fx=COARSE_FACTOR,
+            fy=COARSE_FACTOR,
+            interpolation=cv2.INTER_AREA,
+        )
+        candidates = []
+        for scale, template, coarse in self.pyramid(name):
+            score, (cx, cy) = _best_match(coarse_screen, coarse)
+            candidates.append((score, scale, template, cx, cy))
+        # Refine the best coarse candidates at full resolution
+        candidates.sort(key=lambda c: c[0], reverse=True)
+        for score, scale, template, cx, cy in candidates[:2]:
+            match = self._search_roi(
+                screen,
+                template,
+                int(cx / COARSE_FACTOR),
+                int(cy / COARSE_FACTOR),
+                scale,
+            )
+            if match:
+                return match
+        return None
+
+    def locate(self, name: str, screenshot=None) -> Optional[Match]:
+        """
+        Locate a reference image, searching around its last hit first.
+        Returns None (and forgets the cached hit) when it is not on screen.
+        """
+        screen = to_gray(screenshot) if screenshot is not None else self.screenshot()
+        last = self._last_hits.get(name)
+        match = None
+        if last is not None:
+            template = next(t for s, t, _ in self.pyramid(name) if s == last.scale)
+            match = self._search_roi(screen, template, last.x, last.y, last.scale)
+        if match is None:
+            match = self._full_search(name, screen)
+        if match is None:
+            self._last_hits.pop(name, None)
+        else:
+            self._last_hits[name] = match
+        return match
+
+    def invalidate(self, name: Optional[str] = None):
+        """Forget cached positions (all, or for one template)."""
+        if name is None:
+            self._last_hits.clear()
+        else:
+            self._last_hits.pop(name, None)
+
+
+# One locator per assets directory
+_locators: Dict[str, TemplateLocator] = {}
+
+
+def get_locator(assets_dir: str = ASSETS_DIR) -> TemplateLocator:
+    locator = _locators.get(assets_dir)
+    if locator is None:
+        locator = _locators[assets_dir] = TemplateLocator(assets_dir)
+    return locator
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print(
+            "Usage: python -m speech2action.gui.locator <template.png> <screenshot.png>"
+        )
+        sys.exit(1)
+    template_path, screenshot_path = Path(sys.argv[1]), sys.argv[2]
+    locator = TemplateLocator(template_path.parent)
+    screen = to_gray(screenshot_path)
+    for attempt in ("cold", "cached"):
+        start = time.perf_counter()
+        found = locator.locate(template_path.name, screen)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{attempt}: {found} in {elapsed:.1f} ms")
@@ -0,0 +1,209 @@
+"""
+Application readiness probes.
+
+Instead of launching an app and sleeping a fixed time, ensure_app_ready()
+skips the launch when the app is already running and otherwise polls the
+process and window state with exponential backoff until a deadline.
+
+Platform access goes through an AppBackend, so probes can run against
+FakeAppBackend in tests and dry runs.
+"""
+
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+# One title per line; window titles may contain commas
+_MACOS_WINDOW_TITLES = """
+set titles to {}
+tell application "System Events"
+    repeat with proc in (every process whose visible is true)
+        repeat with title in (name of every window of proc)
+            if title is not missing value then set end of titles to title as text
+        end repeat
+    end repeat
+end tell
+set AppleScript's text item delimiters to linefeed
+return titles as text
+"""
+
+
+class AppNotReadyError(TimeoutError):
+    """Raised when an app does not become ready before the deadline."""
+
+
+class AppBackend:
+    """Platform hooks used by the readiness probes."""
+
+    def is_running(self, app: str) -> bool:
+        raise NotImplementedError
+
+    def launch(self, app: str):
+        raise NotImplementedError
+
+    def window_titles(self) -> List[str]:
+        raise NotImplementedError
+
+
+class MacOSAppBackend(AppBackend):
+    """Probes apps through LaunchServices and System Events."""
+
+    def _osascript(self, script: str) -> str:
+        """The script's output, or "" (not ready yet) if osascript failed."""
+        try:
+            result = subprocess.run(
+                ["osascript", "-e", script], capture_output=True, text=True, timeout=5
+            )
+        except (subprocess.TimeoutExpired, OSError):
+            # System Events can stall while an app starts; the next probe retries
+            return ""
+        return result.stdout.strip()
+
+    def is_running(self, app: str) -> bool:
+        return self._osascript(f'application "{app}" is running') == "true"
+
+    def launch(self, app: str):
+        subprocess.Popen(["open", "-a", app])
+
+    def window_titles(self) -> List[str]:
+        output = self._osascript(_MACOS_WINDOW_TITLES)
+        return [t.strip() for t in output.splitlines() if t.strip()]
+
+
+class DesktopAppBackend(AppBackend):
+    """Best-effort backend for other platforms (window titles via pygetwindow)."""
+
+    def is_running(self, app: str) -> bool:
+        result = subprocess.run(["pgrep", "-f", app], capture_output=True)
+        return result.returncode == 0
+
+    def launch(self, app: str):
+        subprocess.Popen([app])
+
+    def window_titles(self) -> List[str]:
+        try:
+            import pygetwindow
+        except ImportError:
+            return []
+        return [t for t in pygetwindow.getAllTitles() if t]
+
+
+class FakeAppBackend(AppBackend):
+    """
+    In-memory backend for tests and dry runs.
+    A launched app reports running after launch_delay seconds and shows a
+    window titled window_title after window_delay more seconds.
+    """
+
+    def __init__(
+        self,
+        running: bool = False,
+        launch_delay: float = 0.0,
+        window_delay: float = 0.0,
+        window_title: str = "",
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.clock = clock
+        self.launch_delay = launch_delay
+        self.window_delay = window_delay
+        self.window_title = window_title
+        self.launches: List[str] = []
+        self._started_at = -float("inf") if running else None
+
+    def is_running(self, app: str) -> bool:
+        return (
+            self._started_at is not None
+            and self.clock() >= self._started_at + self.launch_delay
+        )
+
+    def launch(self, app: str):
+        self.launches.append(app)
+        if self._started_at is None:
+            self._started_at = self.clock()
+
+    def window_titles(self) -> List[str]:
+        if self._started_at is None:
+            return []
+        ready_at = self._started_at + self.launch_delay + self.window_delay
+        return [self.window_title] if self.clock() >= ready_at else []
+
+
+@dataclass
+class ReadinessResult:
+    """Outcome of ensure_app_ready()."""
+
+    app: str
+    already_running: bool
+    elapsed: float
+    polls: int
+
+
+def has_window(backend: AppBackend, title: str) -> bool:
+    needle = title.lower()
+    return any(needle in t.lower() for t in backend.window_titles())
+
+
+def ensure_app_ready(
+    app: str,
+    window_title: Optional[str] = None,
+    deadline: float = 60.0,
+    initial_delay: float = 0.05,
+    backoff: float = 2.0,
+    max_delay: float = 1.0,
+    backend: Optional[AppBackend] = None,
+    sleep: Callable[[float], None] = time.sleep,
+) -> ReadinessResult:
+    """
+    Make sure app is running (and shows window_title, if given).
+    Launches it only when it is not already running.
+    Raises AppNotReadyError when the deadline passes first.
+    """
+    backend = backend or get_app_backend()
+    clock = getattr(backend, "clock", time.monotonic)
+    start = clock()
+
+    def ready() -> bool:
+        if not backend.is_running(app):
+            return False
+        return window_title is None or has_window(backend, window_title)
+
+    if ready():
+        return ReadinessResult(app, already_running=True, elapsed=0.0, polls=1)
+
+    if not backend.is_running(app):
+        backend.launch(app)
+
+    delay = initial_delay
+    polls = 1
+    while True:
+        remaining = start + deadline - clock()
+        if remaining <= 0:
+            raise AppNotReadyError(f"{app} was not ready after {deadline:.0f}s")
+        sleep(min(delay, remaining))
+        delay = min(delay * backoff, max_delay)
+        polls += 1
+        if ready():
+            return ReadinessResult(
+                app, already_running=False, elapsed=clock() - start, polls=polls
+            )
+
+
+# Singleton pattern for the platform backend
+_backend: Optional[AppBackend] = None
+
+
+def get_app_backend() -> AppBackend:
+    global _backend
+    if _backend is None:
+        _backend = (
+            MacOSAppBackend() if sys.platform == "darwin" else DesktopAppBackend()
+        )
+    return _backend
+
+
+def set_app_backend(backend: Optional[AppBackend]):
+    """Replace the process-wide backend (None restores the platform default)."""
+    global _backend
+    _backend = backend
@@ -0,0 +1,340 @@
+"""
+Macro recorder for building new GUI automations.
+
+Captures mouse clicks and keystrokes with timestamps and compiles them into a
+compact macro file for the macro engine:
+
+- consecutive characters become one "type" step, modifier chords a "hotkey"
+- idle gaps shorter than idle_gap are dropped, longer ones become a capped
+  "settle" on the previous step
+- with wait_for_pixels, each click records the colour under the cursor and
+  replays as a hover followed by a wait-until pixel condition instead of a
+  fixed wait
+
+Usage:
+    python -m speech2action.gui.recorder record my_macro.json [--pixels]
+    python -m speech2action.gui.recorder replay my_macro.json [--speed 2]
+    python -m speech2action.gui.recorder track
+
+Recording stops when Esc is pressed. Recording needs pynput.
+"""
+
+import argparse
+import json
+import logging
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from speech2action.gui.backends import InputBackend, PyAutoGUIBackend
+from speech2action.gui.engine import run_macro
+
+DEFAULT_IDLE_GAP = 0.3  # seconds of inactivity kept as a wait
+DEFAULT_MAX_WAIT = 5.0  # cap for recorded fixed waits
+PIXEL_TOLERANCE = 8
+
+MODIFIERS = {"shift", "ctrl", "alt", "cmd", "command", "option"}
+
+
+@dataclass
+class RecordedEvent:
+    """One captured input event."""
+
+    time: float
+    kind: str  # "click", "key"
+    data: Dict[str, Any] = field(default_factory=dict)
+
+
+def _now(at: Optional[float]) -> float:
+    return time.monotonic() if at is None else at
+
+
+# pynput Key names (left/right/gr variants stripped) that pyautogui spells
+# differently; the rest (enter, esc, f1, home, page keys...) match as is
+PYAUTOGUI_KEYS = {
+    "cmd": "command",
+    "alt": "option",
+    "caps_lock": "capslock",
+    "page_down": "pagedown",
+    "page_up": "pageup",
+    "print_screen": "printscreen",
+    "num_lock": "numlock",
+    "scroll_lock": "scrolllock",
+    "menu": "apps",
+    "media_play_pause": "playpause",
+    "media_volume_mute": "volumemute",
+    "media_volume_down": "volumedown",
+    "media_volume_up": "volumeup",
+    "media_previous": "prevtrack",
+    "media_next": "nexttrack",
+}
+
+# macOS virtual key codes of the ANSI layout (kVK_ANSI_*)
+MAC_VK_KEYS = {
+    0: "a",
+    1: "s",
+    2: "d",
+    3: "f",
+    4: "h",
+    5: "g",
+    6: "z",
+    7: "x",
+    8: "c",
+    9: "v",
+    11: "b",
+    12: "q",
+    13: "w",
+    14: "e",
+    15: "r",
+    16: "y",
+    17: "t",
+    18: "1",
+    19: "2",
+    20: "3",
+    21: "4",
+    22: "6",
+    23: "5",
+    24: "=",
+    25: "9",
+    26: "7",
+    27: "-",
+    28: "8",
+    29: "0",
+    30: "]",
+    31: "o",
+    32: "u",
+    33: "[",
+    34: "i",
+    35: "p",
+    37: "l",
+    38: "j",
+    39: "'",
+    40: "k",
+    41: ";",
+    42: "\\",
+    43: ",",
+    44: "/",
+    45: "n",
+    46: "m",
+    47: ".",
+    50: "`",
+}
+
+
+def _key_name(key) -> str:
+    """Normalize a pynput key to a pyautogui key name."""
+    char = getattr(key, "char", None)
+    if char is not None:
+        return char
+    name = getattr(key, "name", None)
+    if name is None:  # a KeyCode without a character
+        return _vk_name(getattr(key, "vk", None)) or str(key)
+    for suffix in ("_l", "_r", "_gr"):
+        if name.endswith(suffix):
+            name = name[: -len(suffix)]
+            break
+    return PYAUTOGUI_KEYS.get(name, name)
+
+
+def _vk_name(vk: Optional[int]) -> Optional[str]:
+    """
+    The unmodified key for a virtual key code, or None. With a modifier held,
+    pynput's char is whatever the chord types ("\\x03" for ctrl+c, "ç" for
+    option+c), so chords are recorded by key position instead.
+    """
+    if vk is None:
+        return None
+    if sys.platform == "darwin":
+        return MAC_VK_KEYS.get(vk)
+    if sys.platform == "win32":
+        # VK_0..VK_9 and VK_A..VK_Z are the ASCII codes of the uppercase key
+        is_key = 0x30 <= vk <= 0x39 or 0x41 <= vk <= 0x5A
+        return chr(vk).lower() if is_key else None
+    # X11 keysyms of printable Latin-1 keys are their character codes
+    return chr(vk).lower() if 0x20 < vk < 0x7F else None
+
+
+class MacroRecorder:
+    """Records input events and compiles them into macro steps."""
+
+    def __init__(
+        self,
+        idle_gap: float = DEFAULT_IDLE_GAP,
+        max_wait: float = DEFAULT_MAX_WAIT,
+        wait_for_pixels: bool = False,
+        backend: Optional[InputBackend] = None,
+    ):
+        self.idle_gap = idle_gap
+        self.max_wait = max_wait
+        self.wait_for_pixels = wait_for_pixels
+        self.backend = backend
+        self.events: List[RecordedEvent] = []
+        self._held: List[str] = []
+        self._stopped = threading.Event()
+        self._listeners = []
+
+    # Event capture
+
+    def record_click(self, x: int, y: int, at: Optional[float] = None):
+        data = {"x": int(x), "y": int(y)}
+        if self.wait_for_pixels and self.backend is not None:
+            data["color"] = list(self.backend.pixel(int(x), int(y)))
+        self.events.append(RecordedEvent(_now(at), "click", data))
+
+    def record_key(
+        self, key: str, at: Optional[float] = None, vk: Optional[int] = None
+    ):
+        modifiers = [k for k in self._held if k in MODIFIERS]
+        data = {"key": key, "mods": modifiers}
+        if vk is not None:
+            data["vk"] = vk
+        self.events.append(RecordedEvent(_now(at), "key", data))
+
+    def _on_click(self, x, y, button, pressed):
+        if pressed:
+            self.record_click(x, y)
+
+    def _on_press(self, key):
+        name = _key_name(key)
+        if name == "esc":
+            self.stop()
+            return False
+        if name in MODIFIERS:
+            if name not in self._held:
+                self._held.append(name)
+            return
+        self.record_key(name, vk=getattr(key, "vk", None))
+
+    def _on_release(self, key):
+        name = _key_name(key)
+        if name in self._held:
+            self._held.remove(name)
+
+    def start(self):
+        """Start capturing global mouse and keyboard events."""
+        from pynput import keyboard, mouse
+
+        if self.backend is None and self.wait_for_pixels:
+            self.backend = PyAutoGUIBackend()
+        self._listeners = [
+            mouse.Listener(on_click=self._on_click),
+            keyboard.Listener(on_press=self._on_press, on_release=self._on_release),
+        ]
+        for listener in self._listeners:
+            listener.start()
+
+    def stop(self):
+        for listener in self._listeners:
+            listener.stop()
+        self._stopped.set()
+
+    def wait(self):
+        """Block until recording is stopped (Esc)."""
+        self._stopped.wait()
+
+    # Compilation
+
+    def _event_step(self, event: RecordedEvent) -> Tuple[Dict[str, Any], bool]:
+        """Return (step, is_typing) for one event."""
+        if event.kind == "click":
+            return {"click": [event.data["x"], event.data["y"]]}, False
+        key, mods = event.data["key"], event.data["mods"]
+        if mods:
+            key = _vk_name(event.data.get("vk")) or key
+            return {"hotkey": mods + [key]}, False
+        if len(key) == 1:
+            return {"type": key}, True
+        return {"press": key}, False
+
+    def to_macro(self, name: str = "recorded") -> Dict[str, Any]:
+        """Compile the recorded events into a macro dict."""
+        steps: List[Dict[str, Any]] = []
+        last_time = None
+        typing = False
+        for event in self.events:
+            gap = 0.0 if last_time is None else event.time - last_time
+            last_time = event.time
+            step, is_typing = self._event_step(event)
+
+            # Keep typing bursts as one step
+            if is_typing and typing and gap < self.idle_gap:
+                steps[-1]["type"] += step["type"]
+                continue
+            typing = is_typing
+
+            color = event.data.get("color")
+            if color is not None and gap >= self.idle_gap:
+                # Hover first so the target looks as it did when recorded
+                x, y = step["click"]
+                steps.append({"move": [x, y]})
+                step["wait_until"] = {
+                    "pixel": [x, y],
+                    "color": color,
+                    "tolerance": PIXEL_TOLERANCE,
+                    "timeout": max(2 * gap, 2.0),
+                }
+            elif steps and gap >= self.idle_gap:
+                steps[-1]["settle"] = round(min(gap, self.max_wait), 2)
+            steps.append(step)
+        return {"name": name, "steps": steps}
+
+    def save(self, path: str, name: Optional[str] = None) -> Dict[str, Any]:
+        macro = self.to_macro(name or Path(path).stem)
+        Path(path).write_text(
+            json.dumps(macro, separators=(",", ":")) + "\n", encoding="utf-8"
+        )
+        return macro
+
+
+def track_mouse():
+    """Print the mouse position every 50 ms until Ctrl+C."""
+    import pyautogui
+
+    print("Move your mouse to the desired location. Press Ctrl+C to exit.\n")
+    try:
+        while True:
+            x, y = pyautogui.position()
+            # Print coordinates on the same line
+            print(f"\rMouse position: X={x} Y={y}   ", end="")
+            sys.stdout.flush()
+            time.sleep(0.05)  # Update every 50ms
+    except KeyboardInterrupt:
+        print("\n[INFO] Exiting mouse coordinate tracker.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record and replay GUI macros")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    record = sub.add_parser("record", help="record a macro until Esc is pressed")
+    record.add_argument("path")
+    record.add_argument("--pixels", action="store_true", help="wait on pixel colours")
+    record.add_argument("--idle-gap", type=float, default=DEFAULT_IDLE_GAP)
+    record.add_argument("--max-wait", type=float, default=DEFAULT_MAX_WAIT)
+
+    replay = sub.add_parser("replay", help="replay a recorded macro")
+    replay.add_argument("path")
+    replay.add_argument("--speed", type=float, default=1.0)
+
+    sub.add_parser("track", help="print the mouse position")
+
+    args = parser.parse_args(argv)
+    if args.command == "record":
+        recorder = MacroRecorder(args.idle_gap, args.max_wait, args.pixels)
+        print("[INFO] Recording... press Esc to stop.")
+        recorder.start()
+        recorder.wait()
+        macro = recorder.save(args.path)
+        print(f"[INFO] Saved {len(macro['steps'])} steps to {args.path}")
+    elif args.command == "replay":
+        logging.basicConfig(level=logging.INFO)
+        run_macro(args.path, speed=args.speed)
+    else:
+        track_mouse()
+
+
+if __name__ == "__main__":
+    main()
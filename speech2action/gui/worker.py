@@ -0,0 +1,675 @@
+"""
+Out-of-process GUI automation worker.
+
+GUI jobs (studio actions) run in a dedicated, long-lived child process that
+the API talks to over a multiprocessing pipe, so a hung or crashing GUI step
+cannot pin an API thread or take down the server.
+
+Worker side: a receiver thread queues jobs and handles cancellation, a
+heartbeat thread reports liveness, and the main thread runs jobs one at a
+time. Cancelling a running job interrupts it at its next input call or wait.
+Every input call, screen read and wait of the running job marks progress
+(see StepProgress), and each heartbeat carries how long the job has gone
+without any, so a GUI call that hangs is caught even though the heartbeat
+thread keeps running.
+Progress events the job publishes (macro steps) are relayed to the API over
+the same pipe and republished on its event bus. Settings changes reloaded by
+the API are passed on too and applied between jobs.
+
+API side: GuiWorker submits jobs, tracks their status, and a monitor thread
+restarts the worker when it dies, stops sending heartbeats, a job's current
+step stalls for STEP_TIMEOUT or the job exceeds JOB_TIMEOUT.
+
+With several API worker processes there is still one GUI worker: jobs go
+through the shared state's job table, the API process holding the GUI host
+lock claims and runs them, and the others follow their status there (see
+GuiWorker.share()). If the host exits, another process takes over.
+"""
+
+import logging
+import multiprocessing
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from speech2action.core.events import get_event_bus, job_context
+from speech2action.core.metrics import get_metrics
+from speech2action.gui.backends import PyAutoGUIBackend
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_INTERVAL = 1.0  # seconds between worker heartbeats
+HEARTBEAT_TIMEOUT = 5.0  # restart the worker after this long without one
+STEP_TIMEOUT = 30.0  # restart the worker if a job makes no progress this long
+JOB_TIMEOUT = 300.0  # restart the worker if one job runs longer than this
+MAX_RESTART_DELAY = 30.0  # cap for the backoff between crash restarts
+SHARED_POLL_INTERVAL = 0.1  # seconds between reads of the shared job table
+
+
+class JobCancelled(Exception):
+    """Raised inside the worker when the running job is cancelled."""
+
+
+class StepProgress:
+    """When the running job last made progress, read by the heartbeat thread."""
+
+    def __init__(self):
+        self.steps = 0
+        self._since = time.monotonic()
+        self._allowance = 0.0  # length of the wait in progress
+
+    def mark(self, allowance: float = 0.0):
+        self.steps += 1
+        self._since, self._allowance = time.monotonic(), allowance
+
+    def stalled(self) -> float:
+        """Seconds without progress, not counting a wait that is due."""
+        return max(0.0, time.monotonic() - self._since - self._allowance)
+
+
+class CancellableBackend(PyAutoGUIBackend):
+    """
+    pyautogui backend whose input calls and waits abort on cancellation and
+    mark the job's progress.
+    """
+
+    def __init__(self, cancelled: threading.Event, progress: StepProgress):
+        super().__init__()
+        self.cancelled = cancelled
+        self.progress = progress
+
+    def _call(self, method, *args):
+        if self.cancelled.is_set():
+            raise JobCancelled()
+        self.progress.mark()
+        try:
+            return method(*args)
+        finally:
+            self.progress.mark()
+
+    def sleep(self, seconds: float):
+        self.progress.mark(seconds)
+        if self.cancelled.wait(seconds):
+            raise JobCancelled()
+        self.progress.mark()
+
+    def hotkey(self, *keys: str):
+        self._call(super().hotkey, *keys)
+
+    def press(self, key: str):
+        self._call(super().press, key)
+
+    def typewrite(self, text: str):
+        self._call(super().typewrite, text)
+
+    def moveTo(self, x: int, y: int):
+        self._call(super().moveTo, x, y)
+
+    def click(self, x: Optional[int] = None, y: Optional[int] = None):
+        self._call(super().click, x, y)
+
+    def pixel(self, x: int, y: int):
+        return self._call(super().pixel, x, y)
+
+    def pixelMatchesColor(self, x: int, y: int, color, tolerance: int = 0) -> bool:
+        return self._call(super().pixelMatchesColor, x, y, color, tolerance)
+
+    def locate(self, locator, name: str):
+        return self._call(super().locate, locator, name)
+
+
+# Worker process
+
+
+def _worker_main(conn, heartbeat_interval: float):
+    """Entry point of the worker process."""
+    from speech2action.actions.flstudio_automation import STUDIO_ACTIONS
+    from speech2action.config.settings import get_settings_service
+
+    send_lock = threading.Lock()
+    jobs: "queue.Queue[Optional[tuple]]" = queue.Queue()  # run and settings
+    state_lock = threading.Lock()
+    pending_ids = set()  # queued or running here
+    cancelled_ids = set()  # pending and cancelled
+    current = {"job_id": None, "event": None, "progress": None}
+
+    def send(*message):
+        with send_lock:
+            conn.send(message)
+
+    def receive():
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                jobs.put(None)
+                return
+            kind = message[0]
+            if kind == "run":
+                with state_lock:
+                    pending_ids.add(message[1])
+                jobs.put(message)
+            elif kind == "settings":
+                jobs.put(message)
+            elif kind == "cancel":
+                job_id = message[1]
+                with state_lock:
+                    if job_id in pending_ids:  # else it has finished already
+                        cancelled_ids.add(job_id)
+                    if current["job_id"] == job_id:
+                        current["event"].set()
+            elif kind == "stop":
+                jobs.put(None)
+                return
+
+    def heartbeat():
+        while True:
+            job_id, progress = current["job_id"], current["progress"]
+            stalled = progress.stalled() if progress else 0.0
+            send("heartbeat", time.time(), job_id, stalled)
+            time.sleep(heartbeat_interval)
+
+    def forget(job_id):
+        with state_lock:
+            pending_ids.discard(job_id)
+            cancelled_ids.discard(job_id)
+
+    def flush_events():
+        # Under one lock so a job's events reach the API before its "done"
+        with relay_lock:
+            while True:
+                event = events.get_nowait()
+                if event is None:
+                    return
+                send("event", event.type, event.data)
+
+    def relay_events():
+        while True:
+            events.ready()
+            flush_events()
+
+    events = get_event_bus().subscribe()
+    relay_lock = threading.Lock()
+    threading.Thread(target=receive, daemon=True).start()
+    threading.Thread(target=heartbeat, daemon=True).start()
+    threading.Thread(target=relay_events, daemon=True).start()
+
+    while True:
+        message = jobs.get()
+        if message is None:
+            return
+        if message[0] == "settings":
+            for key, value in message[1].items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+            get_settings_service().reload()
+            continue
+        _, job_id, action = message
+        with state_lock:
+            skip = job_id in cancelled_ids
+            event, progress = threading.Event(), StepProgress()
+            if not skip:
+                current.update(job_id=job_id, event=event, progress=progress)
+        if skip:
+            forget(job_id)
+            send("done", job_id, "cancelled", "Cancelled before start")
+            continue
+        send("started", job_id)
+        try:
+            with job_context(job_id):
+                backend = CancellableBackend(event, progress)
+                STUDIO_ACTIONS[action](input_backend=backend)
+            outcome = ("succeeded", f"{action} completed")
+        except JobCancelled:
+            outcome = ("cancelled", f"{action} cancelled")
+        except Exception as e:
+            outcome = ("failed", f"{action} failed: {str(e)}")
+        finally:
+            current.update(job_id=None, event=None, progress=None)
+            forget(job_id)
+        flush_events()
+        send("done", job_id, *outcome)
+
+
+# API side
+
+
+@dataclass
+class GuiJob:
+    """Status of one GUI job."""
+
+    job_id: str
+    action: str
+    status: str = "queued"  # queued, running, succeeded, failed, cancelled
+    message: str = ""
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    future: Future = field(default_factory=Future, repr=False)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "GuiJob":
+        return cls(**data)
+
+    def to_dict(self) -> Dict:
+        return {
+            "job_id": self.job_id,
+            "action": self.action,
+            "status": self.status,
+            "message": self.message,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class GuiWorker:
+    """Supervises the GUI worker process and its job queue."""
+
+    def __init__(
+        self,
+        heartbeat_interval: float = HEARTBEAT_INTERVAL,
+        heartbeat_timeout: float = HEARTBEAT_TIMEOUT,
+        job_timeout: float = JOB_TIMEOUT,
+        max_finished_jobs: int = 200,
+        step_timeout: float = STEP_TIMEOUT,
+    ):
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.job_timeout = job_timeout
+        self.step_timeout = step_timeout
+        self.max_finished_jobs = max_finished_jobs
+        self.restarts = 0
+        self.crash_streak = 0  # restarts without a heartbeat in between
+        self.last_heartbeat: Optional[float] = None
+        # (job id, seconds without progress) from the latest heartbeat
+        self.job_progress: Optional[tuple] = None
+        self._alive_seen = False
+        self._next_restart = 0.0
+        self.jobs: Dict[str, GuiJob] = {}
+        self.shared = None
+        self.is_host = False
+        self._host_lock = None
+        self._remote: Dict[str, GuiJob] = {}  # submitted here, run by the host
+        self._lock = threading.RLock()
+        self._ctx = multiprocessing.get_context("spawn")
+        self._process = None
+        self._conn = None
+        self._stopping = threading.Event()
+        self._monitor = None
+
+    # Lifecycle
+
+    def start(self):
+        with self._lock:
+            if self._process is not None:
+                return
+            self._spawn()
+            self._stopping.clear()
+            self._monitor = threading.Thread(
+                target=self._monitor_loop, name="gui-worker-monitor", daemon=True
+            )
+            self._monitor.start()
+
+    def _spawn(self):
+        parent_conn, child_conn = self._ctx.Pipe()
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(child_conn, self.heartbeat_interval),
+            name="gui-worker",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        self._process, self._conn = process, parent_conn
+        self.last_heartbeat = time.monotonic()
+        self.job_progress = None
+        self._alive_seen = False
+        threading.Thread(
+            target=self._reader_loop,
+            args=(parent_conn,),
+            name="gui-worker-reader",
+            daemon=True,
+        ).start()
+        # Resend jobs that were queued when the previous worker went away
+        for job in self.jobs.values():
+            if job.status == "queued":
+                self._send("run", job.job_id, job.action)
+        logger.info(f"GUI worker started (pid {process.pid})")
+
+    def share(self, state):
+        """
+        Run jobs for all API worker processes through the shared state. A
+        coordinator thread takes the GUI host lock when it is free, and then
+        claims and runs every worker's jobs; until then (or in the other
+        processes) it follows the status of the jobs submitted here.
+        """
+        self.shared = state
+        self._host_lock = state.host_lock()
+        threading.Thread(
+            target=self._coordinate_loop, name="gui-worker-coordinator", daemon=True
+        ).start()
+
+    def stop(self, timeout: float = 5.0):
+        with self._lock:
+            process, conn = self._process, self._conn
+            self._stopping.set()
+            self._process = self._conn = None
+            if self.is_host:
+                self.is_host = False
+                self._host_lock.release()
+        if process is not None:
+            try:
+                conn.send(("stop",))
+            except (OSError, ValueError):
+                pass
+            process.join(timeout)
+            if process.is_alive():
+                process.kill()
+            conn.close()
+        with self._lock:
+            self._abandon_jobs()
+
+    def _abandon_jobs(self):
+        """Resolve the futures of jobs that will not finish in this process."""
+        for job in list(self.jobs.values()):
+            if job.status not in ("queued", "running"):
+                continue
+            if self.shared is None:
+                self._finish(job.job_id, "cancelled", "GUI worker stopped")
+            elif not job.future.done():
+                # Left in the shared table for the next GUI host
+                job.status, job.message = "failed", "GUI host stopped"
+                job.future.set_result(job)
+        for job in self._remote.values():
+            if not job.future.done():
+                job.status, job.message = "failed", "API worker stopped"
+                job.future.set_result(job)
+        self._remote.clear()
+
+    def restart(self, reason: str):
+        logger.warning(f"Restarting GUI worker: {reason}")
+        with self._lock:
+            process, conn = self._process, self._conn
+            if process is not None:
+                process.kill()
+                process.join(1.0)
+                conn.close()
+            for job in self.jobs.values():
+                if job.status == "running":
+                    self._finish(
+                        job.job_id, "failed", f"GUI worker restarted: {reason}"
+                    )
+            self.restarts += 1
+            self._spawn()
+
+    def _schedule_restart(self, reason: str):
+        """Restart now, or after a backoff if the worker keeps crashing on startup."""
+        now = time.monotonic()
+        if self._next_restart:
+            if now >= self._next_restart:
+                self._next_restart = 0.0
+                self.restart(reason)
+            return
+        self.crash_streak = 0 if self._alive_seen else self.crash_streak + 1
+        if self.crash_streak > 1:
+            delay = min(2 ** (self.crash_streak - 1), MAX_RESTART_DELAY)
+            logger.warning(f"GUI worker keeps crashing, next restart in {delay:.0f}s")
+            self._next_restart = now + delay
+            return
+        self.restart(reason)
+
+    # Jobs
+
+    def _send(self, *message):
+        try:
+            self._conn.send(message)
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not send to GUI worker: {str(e)}")
+
+    def submit(self, action: str) -> GuiJob:
+        """Queue a studio action and return its job."""
+        job = GuiJob(job_id=uuid.uuid4().hex[:12], action=action)
+        with self._lock:
+            runs_here = self.shared is None or self.is_host
+            if self.shared is not None:
+                self.shared.add_job(job.to_dict(), os.getpid() if runs_here else None)
+            if runs_here:
+                self.start()
+                self.jobs[job.job_id] = job
+                self._send("run", job.job_id, action)
+            else:
+                self._remote[job.job_id] = job
+        get_event_bus().publish(
+            "job.queued", job_id=job.job_id, action=action, lane="gui"
+        )
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job. Returns False if it already finished."""
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is not None and job.status in ("queued", "running"):
+                self._send("cancel", job_id)
+                return True
+        # Run by the host process, which picks up the request
+        return self.shared is not None and self.shared.request_cancel(job_id)
+
+    def update_settings(self, env: Dict[str, Optional[str]]):
+        """
+        Pass changed environment variables (None: unset) to the worker process,
+        which reloads its settings before the next job. A worker started later
+        inherits them.
+        """
+        with self._lock:
+            if self._process is not None:
+                self._send("settings", env)
+
+    def get(self, job_id: str) -> Optional[GuiJob]:
+        if self.shared is None:
+            return self.jobs.get(job_id)
+        data = self.shared.get_job(job_id)
+        return GuiJob.from_dict(data) if data else None
+
+    def queue_depth(self) -> int:
+        if self.shared is not None:
+            return self.shared.active_jobs()
+        return sum(1 for j in self.jobs.values() if j.status in ("queued", "running"))
+
+    def status(self) -> Dict:
+        process = self._process
+        status = {
+            "alive": bool(process and process.is_alive()),
+            "pid": process.pid if process else None,
+            "restarts": self.restarts,
+            "heartbeat_age": (
+                time.monotonic() - self.last_heartbeat if self.last_heartbeat else None
+            ),
+            "queue_depth": self.queue_depth(),
+        }
+        if self.shared is not None:
+            status["host"] = self.is_host
+        return status
+
+    def _store(self, job: GuiJob):
+        """Record a status change in the shared job table."""
+        if self.shared is not None:
+            try:
+                self.shared.update_job(job.to_dict())
+            except sqlite3.Error as e:
+                logger.error(f"Could not store GUI job {job.job_id}: {str(e)}")
+
+    def _finish(self, job_id: str, status: str, message: str):
+        job = self.jobs.get(job_id)
+        if job is None or job.future.done():
+            return
+        job.status, job.message, job.finished_at = status, message, time.time()
+        self._store(job)
+        metrics = get_metrics()
+        if job.started_at is not None:
+            metrics.observe("queue_wait", job.action, job.started_at - job.submitted_at)
+            metrics.observe("execute", job.action, job.finished_at - job.started_at)
+        metrics.inc("orchestra_actions_total", action=job.action, status=status)
+        get_event_bus().publish(
+            "job.finished",
+            job_id=job_id,
+            action=job.action,
+            lane="gui",
+            status=status,
+            duration=round(job.finished_at - (job.started_at or job.submitted_at), 6),
+            message=message,
+        )
+        job.future.set_result(job)
+        self._prune()
+
+    def _prune(self):
+        finished = [
+            j for j in self.jobs.values() if j.status not in ("queued", "running")
+        ]
+        for job in finished[: max(0, len(finished) - self.max_finished_jobs)]:
+            del self.jobs[job.job_id]
+
+    # Threads
+
+    def _reader_loop(self, conn):
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                return
+            kind = message[0]
+            with self._lock:
+                if conn is not self._conn:
+                    return
+                if kind == "heartbeat":
+                    self.last_heartbeat = time.monotonic()
+                    self._alive_seen = True
+                    _, _, job_id, stalled = message
+                    self.job_progress = (job_id, stalled) if job_id else None
+                elif kind == "started":
+                    job = self.jobs.get(message[1])
+                    if job:
+                        job.status, job.started_at = "running", time.time()
+                        self._store(job)
+                        get_event_bus().publish(
+                            "job.started",
+                            job_id=job.job_id,
+                            action=job.action,
+                            lane="gui",
+                        )
+                elif kind == "event":
+                    _, event_type, data = message
+                    get_event_bus().publish(event_type, **data)
+                elif kind == "done":
+                    _, job_id, status, text = message
+                    self._finish(job_id, status, text)
+
+    def _monitor_loop(self):
+        while not self._stopping.wait(self.heartbeat_interval):
+            with self._lock:
+                process = self._process
+                if process is None:
+                    return
+                if not process.is_alive():
+                    reason = f"process exited with code {process.exitcode}"
+                elif time.monotonic() - self.last_heartbeat > self.heartbeat_timeout:
+                    reason = "heartbeat timed out"
+                elif (
+                    self.job_progress is not None
+                    and self.job_progress[1] > self.step_timeout
+                ):
+                    reason = (
+                        f"job {self.job_progress[0]} made no progress for "
+                        f"{self.job_progress[1]:.0f}s"
+                    )
+                else:
+                    reason = next(
+                        (
+                            f"job {j.job_id} exceeded {self.job_timeout:.0f}s"
+                            for j in self.jobs.values()
+                            if j.status == "running"
+                            and time.time() - j.started_at > self.job_timeout
+                        ),
+                        None,
+                    )
+                if reason:
+                    self._schedule_restart(reason)
+
+    def _coordinate_loop(self):
+        while not self._stopping.wait(SHARED_POLL_INTERVAL):
+            try:
+                if not self.is_host and self._host_lock.acquire(blocking=False):
+                    self._become_host()
+                if self.is_host:
+                    self._claim_jobs()
+                self._follow_remote_jobs()
+            except sqlite3.Error as e:
+                logger.warning(f"GUI job coordination failed: {str(e)}")
+
+    def _become_host(self):
+        failed = self.shared.take_over("GUI host process exited")
+        self.is_host = True
+        logger.info(f"Running GUI jobs for all API workers (pid {os.getpid()})")
+        for job_id in failed:
+            logger.warning(f"GUI job {job_id} was lost with the previous host")
+
+    def _claim_jobs(self):
+        claimed = self.shared.claim_jobs()
+        with self._lock:
+            if claimed:
+                self.start()
+            for data in claimed:
+                job = self._remote.pop(data["job_id"], None) or GuiJob.from_dict(data)
+                self.jobs[job.job_id] = job
+                self._send("run", job.job_id, job.action)
+        for job_id in self.shared.take_cancel_requests():
+            self.cancel(job_id)
+
+    def _follow_remote_jobs(self):
+        with self._lock:
+            job_ids = list(self._remote)
+        for data in self.shared.get_jobs(job_ids):
+            with self._lock:
+                job = self._remote.get(data["job_id"])
+                if job is None:
+                    continue  # claimed by this process in the meantime
+                job.status, job.message = data["status"], data["message"]
+                job.started_at, job.finished_at = (
+                    data["started_at"],
+                    data["finished_at"],
+                )
+                if job.status in ("queued", "running"):
+                    continue
+                del self._remote[job.job_id]
+            job.future.set_result(job)
+
+
+# Singleton pattern for the GUI worker
+_worker: Optional[GuiWorker] = None
+
+
+def _forward_settings(old, new, changed):
+    _worker.update_settings({name: os.environ.get(name) for name in changed})
+
+
+def get_gui_worker() -> GuiWorker:
+    global _worker
+    if _worker is None:
+        from speech2action.config.settings import get_settings_service
+
+        _worker = GuiWorker()
+        get_settings_service().subscribe(_forward_settings)
+    return _worker
+
+
+def shutdown_gui_worker():
+    if _worker is not None:
+        _worker.stop()
@@ -1,15 +1,71 @@
+import argparse
+import sys
+
 from speech2action.core.voice_listener import listen_for_command
 from speech2action.core.command_parser import parse_command
 from speech2action.core.action_dispatcher import dispatch_action
-from speech2action.actions.manager_agent import process_command
+from speech2action.actions.agent_session import open_agent_session
 from speech2action.config import settings
+from speech2action.core.batch import DEFAULT_CONCURRENCY, batch_main
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Speech-2-Action Orchestra CLI")
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="run the commands in FILE (one per line, '-' for stdin) and exit",
+    )
+    parser.add_argument(
+        "--agent",
+        action="store_true",
+        help="batch: have the agent resolve and run every command",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="batch: commands resolved at the same time",
+    )
+    parser.add_argument(
+        "--json", action="store_true", help="batch: print a JSON report"
+    )
+    return parser.parse_args(argv)
+
+
+EXIT_WORDS = ("exit", "quit", "bye")
+
 
+def print_session_report(session):
+    report = session.report()
+    if not report["commands"]:
+        return
+    line = f"⏱️ Time to result: first command {report['first_seconds']:.2f}s"
+    if report["later_p50_seconds"] is not None:
+        line += (
+            f", later commands p50 {report['later_p50_seconds']:.2f}s "
+            f"(max {report['later_max_seconds']:.2f}s)"
+        )
+    print(f"{line}; {report['speculated']}/{report['commands']} started while typing")
 
-def main():
+
+def run_batch_file(path, use_agent, concurrency, as_json):
+    if path == "-":
+        return batch_main(sys.stdin, use_agent, concurrency, as_json)
+    with open(path, encoding="utf-8") as f:
+        return batch_main(f, use_agent, concurrency, as_json)
+
+
+def main(argv=None):
     """
     Main function that handles the command orchestration loop.
     """
+    args = parse_args(argv)
+    if args.batch:
+        sys.exit(run_batch_file(args.batch, args.agent, args.concurrency, args.json))
+
     print("🎻 Speech-2-Action Orchestra 🪄")
+    settings.get_settings_service().start()  # pick up .env edits while running
     print("\nChoose your mode:")
     print("1. Standard mode (traditional parser)")
     print("2. Agent mode (OpenAI Agents SDK)")
@@ -17,30 +73,41 @@ def main():
     mode = input("Select mode (1 or 2): ")
     use_agent = mode == "2"
 
+    session = None
     if use_agent:
         print("\n🤖 Using OpenAI Agents SDK Manager\n")
+        # Warms the model connection while the instructions are read
+        session = open_agent_session()
     else:
         print("\n🧩 Using Traditional Command Parser\n")
 
     print("Type your command (spell) or 'exit' to quit:")
     print("To show all available spells, say 'list spells'")
 
+    def on_partial(text):
+        # Start the agent on the command while it is still being typed
+        if text.strip().lower() not in EXIT_WORDS:
+            session.speculate(text)
+
     while True:
-        # For now, use text input. Replace with real voice input later.
-        transcript = listen_for_command()
+        transcript = listen_for_command(on_partial if session else None)
 
-        if transcript.lower() in ["exit", "quit", "bye"]:
+        if transcript.lower() in EXIT_WORDS:
+            if session is not None:
+                print_session_report(session)
+                session.close()
             print("Goodbye!")
             break
 
         # Switch between agent and traditional mode
         if use_agent:
-            # Direct use of the agent for processing
-            result = process_command(transcript)
+            # The session's agent resolves and runs the command
+            result = session.resolve(transcript)
             if result["success"]:
                 print(result["message"])
             else:
                 print(result["message"] or "No recognized command. Try again.")
+            print(f"⏱️ {result['seconds']:.2f}s")
         else:
             # Traditional processing path
             command = parse_command(transcript)